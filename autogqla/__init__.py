@@ -1,9 +1,17 @@
 from . import objects
-from .base import create
+from .base import Registry, create, create_search_indexes
 from .schema import Schema
 from .objects.helpers import (
     make_relationship_field,
     make_relationship_resolver,
     make_pagination_field,
     make_pagination_resolver,
+    make_group_by_field,
+    make_group_by_resolver,
+    make_create_field,
+    make_create_resolver,
+    make_update_field,
+    make_update_resolver,
+    make_delete_field,
+    make_delete_resolver,
 )
@@ -1,23 +1,54 @@
 from __future__ import annotations
 
-from typing import Dict, Type
+import copy
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Set, Type
 
 import graphene
+from sqlalchemy import inspect
 from sqlalchemy.ext.declarative import DeclarativeMeta
 
 from . import fields
 from .spec import ModelSpec
 from .spec_resolver import ModelSpecResolver, ResolverCollection
 
+# the session of the execution in progress in the current thread or context
+_session: ContextVar = ContextVar('autogqla_session', default=None)
+
+
+def current_session():
+    return _session.get()
+
+
+@contextmanager
+def using_session(session) -> Iterator[None]:
+    """Makes ``session`` the session of the types' resolvers within the block, in this thread or context only."""
+    token = _session.set(session)
+    try:
+        yield
+    finally:
+        _session.reset(token)
+
 
 class BaseModel(graphene.ObjectType):
     __spec__: ModelSpec
     _models: Dict[str, Type[BaseModel]] = {}
-    session_func = None
+    # the class name, namespace and spec each model was declared with, by model name
+    _declarations: Dict[str, tuple] = {}
+    _registry: Registry
+    session_func = staticmethod(current_session)
     resolver_collection: ResolverCollection = ResolverCollection()
 
     def __init_subclass__(cls, **kwargs):
+        if cls.__dict__.get('_registry_root'):
+            return
         model = cls.__spec__.model
+        namespace = {
+            key: value for key, value in cls.__dict__.items() if key not in ('__spec__', '__dict__', '__weakref__')
+        }
+        cls._declarations[model.__name__] = (cls.__name__, namespace, copy.deepcopy(cls.__spec__))
         cls._models[model.__name__] = cls
         cls.resolver_collection.add(
             ModelSpecResolver(
@@ -37,27 +68,63 @@ class BaseModel(graphene.ObjectType):
         for graphql_object in cls._models.values():
             cls.resolver_collection.for_model(graphql_object.__spec__.model).resolve_types()
 
+        # the object types shared with another registry are already created
         for graphql_object in cls._models.values():
-            graphql_object.create()
+            resolver = cls.resolver_collection.for_model(graphql_object.__spec__.model)
+            if resolver.interface is None and resolver.subclass_resolvers():
+                graphql_object.__create_interface()
+
+        for graphql_object in cls._models.values():
+            if '_meta' not in graphql_object.__dict__:
+                graphql_object.create()
 
     @classmethod
     def _get_session(cls):
         return cls.session_func()
 
+    @classmethod
+    def _resolvers_to_root(cls, model):
+        for mapper in inspect(model).iterate_to_root():
+            if cls.resolver_collection.has_spec_for_model(mapper.class_):
+                yield cls.resolver_collection.for_model(mapper.class_)
+
+    @classmethod
+    def __create_interface(cls):
+        resolver = cls.resolver_collection.for_model(cls.__spec__.model)
+
+        def resolve_type(_interface, instance, _info):
+            # the object type of the closest mapped class with a spec
+            return next(cls._resolvers_to_root(type(instance))).node
+
+        attributes = {'resolve_type': classmethod(resolve_type)}
+        for field in cls.__create_simple_fields():
+            attributes[field.name] = field.field
+        for prefix, field in cls.__create_relationship_fields():
+            attributes[f'{prefix}{field.name}'] = field.field
+        resolver.interface = type(resolver._make_name('Interface'), (graphene.Interface,), attributes)
+
     @classmethod
     def create(cls):
         for field in cls.__create_simple_fields():
             cls.__apply(field=field)
         for prefix, field in cls.__create_relationship_fields():
             cls.__apply(field=field, prefix=prefix)
-        super().__init_subclass__()
+        interfaces = tuple(
+            resolver.interface
+            for resolver in cls._resolvers_to_root(cls.__spec__.model)
+            if resolver.interface is not None
+        )
+        super().__init_subclass__(interfaces=interfaces)
 
     @classmethod
     def __create_simple_fields(cls):
         model = cls.__spec__.model
         resolver = cls.resolver_collection.for_model(model)
+        identified = False
         for field_spec in resolver.field_specs_dict.values():
-            if field_spec.is_primary_key():
+            if field_spec.is_primary_key() and not identified:
+                # a single id, made of every primary key column
+                identified = True
                 yield fields.IdentifierField(cls._get_session, resolver=resolver, spec=field_spec)
             yield fields.SimpleField(cls._get_session, resolver=resolver, spec=field_spec)
 
@@ -87,6 +154,14 @@ class BaseModel(graphene.ObjectType):
                         'order_by': graphene.Argument(graphene.List(target_resolver.order_by_enum)),
                     })
 
+        hierarchy_spec = resolver.hierarchy_spec
+        if hierarchy_spec is not None:
+            for ancestors in (False, True):
+                yield '', fields.TreeField(cls._get_session, resolver=resolver, spec=hierarchy_spec, ancestors=ancestors, arguments={
+                    'max_depth': graphene.Int(),
+                    'where': graphene.Argument(resolver.lazy_where_input_type()),
+                })
+
     @classmethod
     def __apply(cls, field, prefix=''):
         setattr(cls, f'{prefix}{field.name}', field.field)
@@ -103,5 +178,147 @@ class BaseModel(graphene.ObjectType):
         cls.create_all()
 
 
-def create(base: DeclarativeMeta):
-    BaseModel.load_base(base=base)
+def model_signature(model) -> tuple:
+    """What the types generated for a model depend on, compared to find the models changed since a build."""
+    mapper = inspect(model)
+    return (
+        # a reloaded class is a change, even when it is mapped the same way
+        model,
+        tuple(
+            (prop.key, tuple((str(column), repr(column.type), getattr(column, 'nullable', None)) for column in prop.columns))
+            for prop in mapper.column_attrs
+        ),
+        tuple(
+            (relationship.key, relationship.mapper.class_.__name__, relationship.direction.name, relationship.uselist)
+            for relationship in mapper.relationships
+        ),
+        tuple(sorted(mapper.all_orm_descriptors.keys())),
+    )
+
+
+def _dependencies(model) -> Set[str]:
+    # the models whose types the model's types refer to: its relationships' targets, and its inheritance hierarchy
+    mapper = inspect(model)
+    names = {relationship.mapper.class_.__name__ for relationship in mapper.relationships}
+    names |= {other.class_.__name__ for other in (*mapper.iterate_to_root(), *mapper.self_and_descendants)}
+    names.discard(model.__name__)
+    return names
+
+
+def _mapped_classes(base: DeclarativeMeta) -> Dict[str, type]:
+    return {
+        base_class.__name__: base_class
+        for base_class in base._decl_class_registry.values()
+        if isinstance(base_class, type) and issubclass(base_class, base)
+    }
+
+
+class Registry:
+    """
+    The object types and resolvers generated for a set of models, which schemas are bound to.
+
+    Each registry has its own root ``BaseModel`` class (``base_model``), so models declared under it and the types
+    built for them are independent of every other registry. ``rebuild`` builds a new registry after models or specs
+    change, sharing the types of the models unaffected by the change with this one, which keeps serving meanwhile.
+    """
+
+    def __init__(self, base_model: Optional[Type[BaseModel]] = None):
+        if base_model is None:
+            base_model = type('BaseModel', (BaseModel,), {
+                '_registry_root': True,
+                '_models': {},
+                '_declarations': {},
+                'resolver_collection': ResolverCollection(),
+            })
+        self.base_model: Type[BaseModel] = base_model
+        base_model._registry = self
+        # the signatures of the models as they were when the registry was built, by model name
+        self.signatures: Dict[str, tuple] = {}
+        # the names of the models whose types were built by the last rebuild, rather than shared
+        self.rebuilt: Set[str] = set()
+
+    @property
+    def models(self) -> Dict[str, Type[BaseModel]]:
+        return self.base_model._models
+
+    @property
+    def resolver_collection(self) -> ResolverCollection:
+        return self.base_model.resolver_collection
+
+    def get_session(self):
+        return self.base_model.session_func()
+
+    def load(self, base: DeclarativeMeta) -> Registry:
+        self.base_model.load_base(base=base)
+        self.signatures = {name: model_signature(node.__spec__.model) for name, node in self.models.items()}
+        return self
+
+    def affected(self, base: DeclarativeMeta, specs: Dict[str, ModelSpec]) -> Set[str]:
+        """
+        The names of the models whose types must be rebuilt: those changed since the registry was built or given a
+        new spec, and every model whose types refer to one of them, directly or through other models.
+        """
+        models = _mapped_classes(base)
+        affected = {
+            name for name, model in models.items()
+            if name in specs or self.signatures.get(name) != model_signature(model)
+        }
+        affected |= self.signatures.keys() - models.keys()
+        dependencies = {name: _dependencies(model) for name, model in models.items()}
+        while True:
+            dependents = {name for name in models if name not in affected and dependencies[name] & affected}
+            if not dependents:
+                return affected
+            affected |= dependents
+
+    def rebuild(self, base: DeclarativeMeta, specs: Optional[Dict[type, ModelSpec]] = None) -> Registry:
+        """
+        Returns a new registry of the models of ``base``, with the types of the affected models (see ``affected``)
+        built again, from the given ``specs`` of models or else the spec they were declared with, and the others
+        shared with this registry.
+        """
+        specs = {model.__name__: spec for model, spec in (specs or {}).items()}
+        affected = self.affected(base, specs)
+        registry = Registry()
+        for name, model in _mapped_classes(base).items():
+            if name in affected:
+                registry._declare(model, self.base_model._declarations.get(name), specs.get(name))
+            else:
+                registry._share(self, name)
+        registry.load(base)
+        registry.rebuilt = affected & registry.models.keys()
+        return registry
+
+    def rebuild_in_background(self, base: DeclarativeMeta, specs: Optional[Dict[type, ModelSpec]] = None) -> Future:
+        """Rebuilds in a thread, returning the future of the new registry, while schemas bound to this one serve."""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='autogqla-rebuild')
+        future = executor.submit(self.rebuild, base, specs)
+        executor.shutdown(wait=False)
+        return future
+
+    def _declare(self, model, declaration: Optional[tuple], spec: Optional[ModelSpec]):
+        class_name, namespace, declared_spec = declaration or (model.__name__, {}, None)
+        spec = spec or copy.deepcopy(declared_spec) or ModelSpec(model=model)
+        # the model's class may have been reloaded since it was declared
+        spec.model = model
+        type(class_name, (self.base_model,), {**namespace, '__spec__': spec})
+
+    def _share(self, other: Registry, name: str):
+        self.models[name] = other.models[name]
+        self.resolver_collection.resolvers[name] = other.resolver_collection.resolvers[name]
+        self.base_model._declarations[name] = other.base_model._declarations[name]
+
+
+default_registry = Registry(BaseModel)
+
+
+def create(base: DeclarativeMeta, registry: Optional[Registry] = None) -> Registry:
+    """Builds the types of the models of ``base`` into ``registry``, by default the global one, and returns it."""
+    return (registry or default_registry).load(base)
+
+
+def create_search_indexes(bind, registry: Optional[Registry] = None):
+    with bind.begin() as connection:
+        for resolver in (registry or default_registry).resolver_collection.resolvers.values():
+            if resolver.search_index:
+                resolver.search_index.create(connection)
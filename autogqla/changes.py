@@ -0,0 +1,92 @@
+"""
+Tracking of the tables read and written through an engine, shared by live queries and table versions.
+
+A ``ChangeTracker`` only listens to the engines it is given, once the feature using it is enabled. It collects the
+tables written by each transaction and reports them once the transaction commits, and records the tables read by the
+statements executed by the current thread within ``recording``.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.util import find_tables
+
+
+class ChangeTracker:
+    """
+    Calls ``on_commit`` with the names of the tables written by every committed transaction. The tables are reported
+    from the engine's ``commit`` event, or with ``on_checkin`` from the pool's ``checkin`` event, which fires once the
+    commit is complete.
+    """
+
+    def __init__(self, on_commit: Callable[[Set[str]], None], on_checkin: bool = False):
+        self.on_commit = on_commit
+        self.on_checkin = on_checkin
+        self.engines = set()
+        self._changed_key = f'autogqla_changed_tables_{id(self)}'
+        self._committed_key = f'autogqla_committed_tables_{id(self)}'
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def listen(self, engine):
+        with self._lock:
+            if engine in self.engines:
+                return
+            self.engines.add(engine)
+        for name, listener in self._listeners():
+            event.listen(engine, name, listener)
+
+    def remove(self):
+        with self._lock:
+            engines, self.engines = self.engines, set()
+        for engine in engines:
+            for name, listener in self._listeners():
+                event.remove(engine, name, listener)
+
+    @contextmanager
+    def recording(self) -> Iterator[Set[str]]:
+        """Records the names of the tables read by the statements this thread executes within the block."""
+        previous = getattr(self._local, 'tables', None)
+        self._local.tables = set()
+        try:
+            yield self._local.tables
+        finally:
+            self._local.tables = previous
+
+    def _listeners(self):
+        listeners = [
+            ('before_execute', self._before_execute),
+            ('commit', self._commit),
+            ('rollback', self._rollback),
+        ]
+        if self.on_checkin:
+            listeners.append(('checkin', self._checkin))
+        return listeners
+
+    def _before_execute(self, conn, clauseelement, _multiparams, _params):
+        if isinstance(clauseelement, UpdateBase):
+            conn.info.setdefault(self._changed_key, set()).add(clauseelement.table.name)
+        elif isinstance(clauseelement, Select):
+            tables: Optional[Set[str]] = getattr(self._local, 'tables', None)
+            if tables is not None:
+                tables.update(table.name for table in find_tables(clauseelement, include_crud=True))
+
+    def _commit(self, conn):
+        changed = conn.info.pop(self._changed_key, None)
+        if not changed:
+            return
+        if self.on_checkin:
+            conn.info.setdefault(self._committed_key, set()).update(changed)
+        else:
+            self.on_commit(changed)
+
+    def _rollback(self, conn):
+        conn.info.pop(self._changed_key, None)
+
+    def _checkin(self, _dbapi_connection, connection_record):
+        committed = connection_record.info.pop(self._committed_key, None)
+        if committed:
+            self.on_commit(committed)
@@ -1,11 +1,12 @@
 from __future__ import annotations
-import base64
 import operator
 from functools import reduce
 
 import graphene
 
-from . import spec_resolver
+from . import global_ids, polymorphic, spec_resolver
+from .json_paths import JSONFilter, json_condition
+from .search import SearchMatch
 
 
 class StringFilter(graphene.InputObjectType):
@@ -20,6 +21,17 @@ class StringFilter(graphene.InputObjectType):
     is_null = graphene.Boolean()
 
 
+class IDFilter(graphene.InputObjectType):
+    eq = graphene.ID()
+    ne = graphene.ID()
+    in_ = graphene.List(graphene.ID, name="in")
+    not_in = graphene.List(graphene.ID)
+
+
+class SearchableStringFilter(StringFilter):
+    search = graphene.String()
+
+
 class BooleanFilter(graphene.InputObjectType):
     eq = graphene.Boolean()
     ne = graphene.Boolean()
@@ -77,6 +89,7 @@ FILTER_MAPPING = {
     graphene.Boolean: BooleanFilter,
     graphene.DateTime: DateTimeFilter,
     graphene.Date: DateFilter,
+    graphene.JSONString: JSONFilter,
 }
 
 OP_CODE_MAPPING = {
@@ -93,6 +106,7 @@ OP_CODE_MAPPING = {
     'ends_with': lambda a, b: a.like(f'%{b}'),
     'contains': lambda a, b: a.like(f'%{b}%'),
     'like': lambda a, b: a.like(b),
+    'search': lambda a, b: SearchMatch(a, b),
 }
 
 
@@ -124,7 +138,10 @@ def construct_condition(resolver: 'spec_resolver.ModelSpecResolver', filter_dict
             expressions.append(operand_expression)
 
     for attribute_name, condition in filter_dict.items():
-        if attribute_name in resolver.relationship_specs_dict:
+        if attribute_name == 'id':
+            expressions.extend(global_ids.id_condition(resolver, condition))
+
+        elif attribute_name in resolver.relationship_specs_dict:
             relationship_spec = resolver.relationship_specs_dict[attribute_name]
             condition_joins, condition_expression = construct_condition(
                 resolver.collection.for_model(relationship_spec.target_model),
@@ -136,10 +153,27 @@ def construct_condition(resolver: 'spec_resolver.ModelSpecResolver', filter_dict
 
         elif attribute_name in resolver.field_specs_dict:
             field_spec = resolver.field_specs_dict[attribute_name]
+            if field_spec.field_type is graphene.JSONString:
+                path_types = resolver.model_spec.fields.json_paths.get(field_spec.name)
+                expression = json_condition(field_spec.model_attribute, condition, path_types)
+                if expression is not None:
+                    expressions.append(expression)
+                continue
             for op_code, value in condition.items():
-                if field_spec.name == 'id':
-                    _, value = base64.b64decode(value).decode().split(':', 1)
                 expressions.append(OP_CODE_MAPPING[op_code](field_spec.model_attribute, value))
 
+        elif attribute_name in resolver.subclass_field_specs_dict:
+            expressions.append(reduce(operator.or_, [
+                polymorphic.subclass_condition(
+                    resolver.sqla_model,
+                    field_spec.source_model,
+                    reduce(operator.and_, [
+                        OP_CODE_MAPPING[op_code](field_spec.model_attribute, value)
+                        for op_code, value in condition.items()
+                    ]),
+                )
+                for field_spec in resolver.subclass_field_specs_dict[attribute_name]
+            ]))
+
     merged_expressions = (reduce(operator.and_, expressions) if expressions else None)
     return joins, merged_expressions
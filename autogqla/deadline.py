@@ -0,0 +1,80 @@
+"""
+Per-request deadlines.
+
+``Schema.execute(..., timeout=seconds)`` stores a deadline in the session, which every root
+resolver and loader batch checks before issuing its query. Once the deadline has passed, the
+remaining fields fail with a timeout error while the fields already resolved are still returned.
+Statements that are already running are bounded by a dialect-level statement timeout where the
+dialect supports one.
+"""
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+_DEADLINE = 'autogqla_deadline'
+
+
+def _sqlite_apply(connection, deadline: float):
+    # sqlite has no statement timeout, but a progress handler returning True interrupts the statement
+    connection.connection.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+
+
+def _sqlite_reset(connection):
+    connection.connection.set_progress_handler(None, 0)
+
+
+def _postgresql_apply(connection, deadline: float):
+    # SET LOCAL only lasts until the end of the transaction, so there is nothing to reset
+    connection.execute(f'SET LOCAL statement_timeout = {_remaining_ms(deadline)}')
+
+
+def _mysql_apply(connection, deadline: float):
+    connection.execute(f'SET SESSION max_execution_time = {_remaining_ms(deadline)}')
+
+
+def _mysql_reset(connection):
+    connection.execute('SET SESSION max_execution_time = 0')
+
+
+STATEMENT_TIMEOUTS = {
+    'sqlite': (_sqlite_apply, _sqlite_reset),
+    'postgresql': (_postgresql_apply, None),
+    'mysql': (_mysql_apply, _mysql_reset),
+}
+
+
+def _remaining_ms(deadline: float) -> int:
+    return max(1, int((deadline - time.monotonic()) * 1000))
+
+
+def get_deadline(session: Session) -> Optional[float]:
+    return session.info.get(_DEADLINE)
+
+
+def set_deadline(session: Session, timeout: float):
+    deadline = time.monotonic() + timeout
+    session.info[_DEADLINE] = deadline
+    connection = session.connection()
+    apply, _ = STATEMENT_TIMEOUTS.get(connection.dialect.name, (None, None))
+    if apply:
+        apply(connection, deadline)
+
+
+def clear_deadline(session: Session):
+    if session.info.pop(_DEADLINE, None) is None:
+        return
+    connection = session.connection()
+    _, reset = STATEMENT_TIMEOUTS.get(connection.dialect.name, (None, None))
+    if reset:
+        reset(connection)
+
+
+def deadline_exceeded(session: Session) -> bool:
+    deadline = get_deadline(session)
+    return deadline is not None and time.monotonic() > deadline
+
+
+def check_deadline(session: Session):
+    if deadline_exceeded(session):
+        raise Exception('query timeout exceeded')
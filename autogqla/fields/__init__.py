@@ -3,3 +3,4 @@ from .identifier_field import IdentifierField
 from .simple_field import SimpleField
 from .connections.relationship_field import RelationshipField
 from .connections.pagination_field import PaginationField
+from .connections.tree_field import TreeField
@@ -1,2 +1,3 @@
 from .relationship_field import RelationshipField
 from .pagination_field import PaginationField
+from .tree_field import TreeField
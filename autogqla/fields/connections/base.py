@@ -1,6 +1,11 @@
 from functools import partial
+from typing import Optional
+
+from sqlalchemy import false
 
 from autogqla.condition_constructor import construct_condition
+from autogqla.filter_optimizer import optimize, EMPTY
+from autogqla.search import SearchRank
 from autogqla.spec import RelationshipSpec
 from autogqla.spec_resolver import ResolverCollection, ModelSpecResolver
 
@@ -14,13 +19,52 @@ def unique_join(query, join_attr):
     return query.join(getattr(join_attr.parent.entity, join_attr.key))
 
 
-def apply_query_condition(query, resolver: ModelSpecResolver, arguments: dict):
-    where = arguments.get('where')
+def is_empty_filter(resolver: ModelSpecResolver, arguments: dict) -> bool:
+    return optimize(resolver, arguments.get('where')) is EMPTY
+
+
+def optimize_arguments(resolver: ModelSpecResolver, arguments: dict) -> Optional[dict]:
+    """Returns the arguments with their ``where`` filter optimized, or ``None`` when it can never match."""
+    where = optimize(resolver, arguments.get('where'))
+    if where is EMPTY:
+        return None
+    return {**arguments, 'where': where}
+
+
+def query_condition(resolver: ModelSpecResolver, arguments: dict, optimized: bool = False):
+    """
+    Returns the joins, filter and relevance ordering of the ``where`` argument, which is optimized unless it
+    already was (see ``optimize_arguments``).
+    """
+    where = arguments.get('where') if optimized else optimize(resolver, arguments.get('where'))
+    if where is EMPTY:
+        return [], false(), []
+
     joins, where_filter = construct_condition(resolver, where)
+    order_by = []
+    if resolver.search_index and resolver.model_spec.fields.search.order_by_relevance:
+        terms = resolver.search_terms(where)
+        if terms:
+            order_by.append(SearchRank(resolver.sqla_model, terms))
+    return joins, where_filter, order_by
+
+
+def apply_query_condition(query, resolver: ModelSpecResolver, arguments: dict, optimized: bool = False):
+    joins, where_filter, order_by = query_condition(resolver, arguments, optimized)
     if where_filter is not None:
         for join_attr in joins:
             query = unique_join(query, join_attr)
-    return query.filter(where_filter) if where_filter is not None else query
+        query = query.filter(where_filter)
+    if order_by:
+        query = query.order_by(*order_by)
+    return query
+
+
+def is_empty_query(spec: RelationshipSpec, arguments: dict, resolver_collection: ResolverCollection) -> bool:
+    node = resolver_collection.for_relationship(spec.attribute).node
+    if hasattr(node, f'query_{spec.name}'):
+        return False
+    return is_empty_filter(resolver_collection.for_model(spec.target_model), arguments)
 
 
 def create_query_function(spec: RelationshipSpec, arguments: dict, resolver_collection: ResolverCollection):
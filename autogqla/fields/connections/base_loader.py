@@ -1,42 +1,203 @@
+import operator
+import time
 from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional, List, Tuple
 
+from promise import Promise
 from promise.dataloader import DataLoader
-from sqlalchemy import orm
-from sqlalchemy.orm import Query, Load
+from sqlalchemy import Table, MetaData, Column, select, inspect, tuple_, false
+from sqlalchemy.orm import Query, Session, RelationshipProperty
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import BinaryExpression
+
+from autogqla.deadline import check_deadline
+from autogqla.polymorphic import load_subclasses
+from autogqla.profiling import get_trace
+from autogqla.strict import apply_raiseload
+
+_key_tables_metadata = MetaData()
+_LOADERS = 'autogqla_loaders'
+
+
+def loader_registry(session: Session) -> dict:
+    """Returns the loaders of a session, which are shared by every operation executed with it."""
+    return session.info.setdefault(_LOADERS, {})
+
+
+def key_table(columns) -> Table:
+    name = '_'.join(['autogqla_keys', columns[0].table.name, *(column.name for column in columns)])
+    if name not in _key_tables_metadata.tables:
+        Table(
+            name,
+            _key_tables_metadata,
+            *[Column(f'k{index}', column.type, primary_key=True) for index, column in enumerate(columns)],
+            prefixes=['TEMPORARY'],
+        )
+    return _key_tables_metadata.tables[name]
+
+
+def fill_key_table(session: Session, columns, keys) -> Table:
+    table = key_table(columns)
+    connection = session.connection()
+    table.create(connection, checkfirst=True)
+    connection.execute(table.delete())
+    connection.execute(table.insert(), [{f'k{index}': value for index, value in enumerate(key)} for key in keys])
+    return table
+
+
+def _equality_join(condition, pairs) -> bool:
+    binaries = [element for element in visitors.iterate(condition, {}) if isinstance(element, BinaryExpression)]
+    return len(binaries) == len(pairs) and all(binary.operator is operator.eq for binary in binaries)
+
+
+def foreign_key_pairs(relationship: RelationshipProperty) -> Optional[List[Tuple[Column, Column]]]:
+    """Returns the (parent column, child column) pairs of a relationship joined by column equality alone."""
+    if relationship.secondary is not None:
+        return None
+    pairs = relationship.local_remote_pairs
+    return pairs if _equality_join(relationship.primaryjoin, pairs) else None
+
+
+def association_pairs(relationship: RelationshipProperty) -> Optional[List[Tuple[Column, Column]]]:
+    """
+    Returns the (parent column, association column) pairs of a many-to-many relationship whose joins to the
+    association table are made by column equality alone.
+    """
+    if relationship.secondary is None:
+        return None
+    pairs = relationship.synchronize_pairs
+    if not _equality_join(relationship.primaryjoin, pairs):
+        return None
+    if not _equality_join(relationship.secondaryjoin, relationship.secondary_synchronize_pairs):
+        return None
+    return pairs
+
+
+def relationship_order(relationship: RelationshipProperty) -> list:
+    """Returns the ordering of a relationship's children: its ``order_by``, or else the target's primary key."""
+    return list(relationship.order_by or relationship.mapper.primary_key)
+
+
+@dataclass
+class LoaderStats:
+    batches: int = 0
+    keys: int = 0
+    skipped_keys: int = 0
 
 
 class ConnectionLoader(DataLoader):
 
-    def __init__(self, model, member, query_func, session_func, *args, **kwargs):
+    # batches larger than max_batch_size are split into several queries, and parent keys
+    # above temp_table_threshold are filtered through a temporary table rather than an IN list
+    max_batch_size: Optional[int] = None
+    temp_table_threshold: Optional[int] = None
+
+    def __init__(self, model, member, query_func, session_func, *args, empty=False, temp_table_threshold=None,
+                 **kwargs):
         super().__init__(*args, **kwargs)
+        if temp_table_threshold is not None:
+            self.temp_table_threshold = temp_table_threshold
         self.model = model
         self.member = member
         self.query_func = query_func
-        self.session = session_func()
+        self.session_func = session_func
+        # set when the filter can never match, in which case no query is issued
+        self.empty = empty
+
+        pairs = foreign_key_pairs(self.member.prop)
+        secondary_pairs = association_pairs(self.member.prop)
+        parent_mapper = inspect(self.model)
+        # set for many-to-many relationships whose children are joined to the association table alone
+        self.secondary: Optional[Table] = None
+        if pairs:
+            # children are selected by their foreign key, without joining or loading the parent
+            self.join_parent = False
+            parent_columns = [local for local, _ in pairs]
+            self.key_columns = [remote for _, remote in pairs]
+        elif secondary_pairs:
+            # children are selected through the association table and keyed on its parent columns, so a
+            # child under several parents is one row per parent, all sharing the child's instance
+            self.join_parent = False
+            self.secondary = self.member.prop.secondary
+            parent_columns = [local for local, _ in secondary_pairs]
+            self.key_columns = [remote for _, remote in secondary_pairs]
+        else:
+            self.join_parent = True
+            parent_columns = list(parent_mapper.primary_key)
+            self.key_columns = parent_columns
+        self.parent_keys = [parent_mapper.get_property_by_column(column).key for column in parent_columns]
+        self.stats = LoaderStats()
+        self._queued_at: Optional[float] = None
+
+    @property
+    def session(self) -> Session:
+        return self.session_func()
 
     @property
     def target_model(self):
         return self.member.prop.mapper.entity
 
+    def cached(self, model) -> Optional[Promise]:
+        return self._promise_cache.get(self.get_cache_key(model)) if self.cache else None
+
+    def load(self, key):
+        if self._queued_at is None:
+            self._queued_at = time.perf_counter()
+        return super().load(key)
+
+    def parent_key(self, model) -> tuple:
+        return tuple(getattr(model, key) for key in self.parent_keys)
+
+    def _key_filter(self, keys):
+        if not keys:
+            return false()
+        if self.temp_table_threshold is not None and len(keys) > self.temp_table_threshold:
+            table = fill_key_table(self.session, self.key_columns, keys)
+            values = select(list(table.c))
+        elif len(self.key_columns) == 1:
+            values = [key[0] for key in keys]
+        else:
+            values = list(keys)
+
+        if len(self.key_columns) == 1:
+            return self.key_columns[0].in_(values)
+        return tuple_(*self.key_columns).in_(values)
+
     def _make_query(self, models) -> Query:
-        ids = {model.id for model in models}
-        id_filter = self.model.id.in_(ids)
+        check_deadline(self.session)
+        keys = {self.parent_key(model) for model in models}
+        keys = [key for key in keys if None not in key]
+        self.stats.batches += 1
+        self.stats.keys += len(keys)
+        trace = get_trace(self.session)
+        if trace is not None:
+            # the event spans the time the first parent of the batch waited for the dispatch
+            now = time.perf_counter()
+            name = f'{self.model.__name__}.{self.member.key}'
+            trace.add(name, 'loader', self._queued_at or now, now, parents=len(models), keys=len(keys))
+        self._queued_at = None
 
-        query = self.session.query(self.target_model, self.model).join(self.member).filter(id_filter).options(
-            Load(self.model).load_only('id'),
-            orm.contains_eager(self.member),
-        )
+        key_labels = [column.label(f'_K_{index}') for index, column in enumerate(self.key_columns)]
+        query = self.session.query(self.target_model, *key_labels)
+        query = apply_raiseload(self.session, load_subclasses(query, self.target_model), self.target_model)
+        if self.join_parent:
+            query = query.select_from(self.model).join(self.member)
+        elif self.secondary is not None:
+            query = query.join(self.secondary, self.member.prop.secondaryjoin)
+        query = query.filter(self._key_filter(keys))
         return self.query_func(query)
 
     def _group_results(self, models, results, return_child=True):
+        key_length = len(self.key_columns)
         mapping = defaultdict(list)
         for result in results:
-            child, parent = result[:2]
-            mapping[parent.id].append(child if return_child else result)
+            child, key = result[0], tuple(result[1:1 + key_length])
+            mapping[key].append(child if return_child else result)
 
         results = []
         for model in models:
-            children = mapping[model.id]
+            children = mapping[self.parent_key(model)]
             if not self.member.prop.uselist:
                 children = children[0] if children else None
             results.append(children)
@@ -2,6 +2,7 @@ import base64
 import json
 
 import graphene
+from sqlalchemy import inspect
 
 
 class PaginationConnectionField(graphene.relay.ConnectionField):
@@ -36,8 +37,8 @@ class PaginationConnectionField(graphene.relay.ConnectionField):
             edge_type(
                 node=node[0],
                 cursor=base64.b64encode(json.dumps([
-                    node[0].id,
-                    [getattr(node, f'_O_{abs(id(prop.model.__name__))}_{abs(id(prop.key))}') for prop in attr_order_by],
+                    list(inspect(node[0]).identity),
+                    [getattr(node, prop.label) for prop in attr_order_by],
                     [prop.direction for prop in attr_order_by],
                 ], default=str).encode()).decode(),
             )
@@ -18,13 +18,18 @@ class PaginationDetails:
     def _load(s):
         return tuple(json.loads(base64.b64decode(s.encode()).decode())) if s else None
 
+    @staticmethod
+    def _pk(cursor):
+        # the values of every primary key column, or the single value of cursors made before composite keys
+        return cursor[0] if isinstance(cursor[0], list) else [cursor[0]]
+
     @property
     def before_pk(self):
-        return self.before[0] if self.before else None
+        return self._pk(self.before) if self.before else None
 
     @property
     def after_pk(self):
-        return self.after[0] if self.after else None
+        return self._pk(self.after) if self.after else None
 
     @property
     def before_value(self):
@@ -1,9 +1,10 @@
-from threading import local
+import json
 from typing import Union
 
 import graphene
 
-from .base import create_query_function
+from .base import create_query_function, is_empty_query
+from .base_loader import loader_registry
 from .pagination_connection_field import PaginationConnectionField
 from .pagination_details import PaginationDetails
 from .pagination_loader import PaginationLoader
@@ -13,8 +14,6 @@ from ...spec import RelationshipSpec
 
 class PaginationField(BaseField[RelationshipSpec]):
 
-    _loaders = local()
-
     def _name(self) -> str:
         return self.spec.name
 
@@ -36,15 +35,21 @@ class PaginationField(BaseField[RelationshipSpec]):
         ).load(instance)
 
     def loader(self, arguments, pagination) -> PaginationLoader:
-        query_func = create_query_function(
-            spec=self.spec,
-            resolver_collection=self.resolver.collection,
-            arguments=arguments,
-        )
-        return PaginationLoader(
-            pagination=pagination,
-            model=self.spec.source_model,
-            member=self.spec.model_attribute,
-            query_func=query_func,
-            session_func=self.session_func,
-        )
+        # shared by the parents paginated with the same arguments, each getting its own page of the batch
+        loaders = loader_registry(self.session_func())
+        key = self.spec.source_model_name, self.name, json.dumps(arguments, default=str), pagination
+        if key not in loaders:
+            query_func = create_query_function(
+                spec=self.spec,
+                resolver_collection=self.resolver.collection,
+                arguments=arguments,
+            )
+            loaders[key] = PaginationLoader(
+                pagination=pagination,
+                model=self.spec.source_model,
+                member=self.spec.model_attribute,
+                query_func=query_func,
+                session_func=self.session_func,
+                empty=is_empty_query(self.spec, arguments, self.resolver.collection),
+            )
+        return loaders[key]
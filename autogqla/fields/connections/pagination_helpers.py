@@ -1,7 +1,11 @@
+from typing import Sequence
+
+from sqlalchemy import func, literal_column
 from sqlalchemy.orm import Query
 
 from autogqla.fields.connections.base import unique_join
 from autogqla.fields.connections.pagination_details import PaginationDetails
+from autogqla.global_ids import primary_key_attributes
 from autogqla.spec_resolver import OrderByProperty
 
 
@@ -14,8 +18,7 @@ def order_clause(attribute, direction, reverse):
 
 def pagination_condition(cursor_props, reverse):
     [[order_by_prop, value], *remaining] = cursor_props
-    name, direction, model = order_by_prop.key, order_by_prop.direction, order_by_prop.model
-    attribute = getattr(model, name)
+    direction, attribute = order_by_prop.direction, order_by_prop.attribute
 
     if reverse:
         direction = 'ASC' if direction == 'DESC' else 'DESC'
@@ -41,7 +44,11 @@ def pagination_condition(cursor_props, reverse):
         return exp_nxt
 
 
-def paginate(model, query: Query, pagination: PaginationDetails):
+def paginate(model, query: Query, pagination: PaginationDetails, partition_by: Sequence = ()):
+    """
+    Returns a page of rows (plus one to tell whether another page follows). With ``partition_by``, the page is
+    taken separately within each group of rows sharing those columns, such as the children of each parent.
+    """
 
     if pagination.first is not None:
         reverse = False
@@ -52,31 +59,37 @@ def paginate(model, query: Query, pagination: PaginationDetails):
 
     order_by_joins = []
     order_by_statements = []
-    order_by_columns = []
     for order_by_prop in pagination.order_by:
-        attribute = getattr(order_by_prop.model, order_by_prop.key)
-        order_by_statements.append(order_clause(attribute, order_by_prop.direction, reverse))
+        order_by_statements.append(order_clause(order_by_prop.attribute, order_by_prop.direction, reverse))
         order_by_joins.extend(order_by_prop.joins)
-        order_by_columns.append(attribute)
-    order_by_statements.append(order_clause(model.id, 'ASC', reverse))
+    # the primary key breaks ties, so that the order and the cursors are unique
+    primary_key = primary_key_attributes(model)
+    order_by_statements.extend(order_clause(attribute, 'ASC', reverse) for attribute in primary_key)
 
     for join in order_by_joins:
         query = unique_join(query, join)
 
-    for column in order_by_columns:
-        query = query.add_columns(column.label(f'_O_{abs(id(column.class_.__name__))}_{abs(id(column.key))}'))
-    query = query.add_columns(model.id.label('id'))
+    for order_by_prop in pagination.order_by:
+        query = query.add_columns(order_by_prop.attribute.label(order_by_prop.label))
+    query = query.add_columns(*(attribute.label(f'_P_{index}') for index, attribute in enumerate(primary_key)))
+    key_props = [OrderByProperty(attribute.key, 'ASC', model) for attribute in primary_key]
 
     if not reverse and pagination.after:
         order_columns = list(zip(pagination.order_by, pagination.after_value))
-        order_columns.append((OrderByProperty('id', 'ASC', model), pagination.after_pk))
+        order_columns.extend(zip(key_props, pagination.after_pk))
         query = query.filter(pagination_condition(order_columns, reverse))
     if reverse and pagination.before:
         order_columns = list(zip(pagination.order_by, pagination.before_value))
-        order_columns.append((OrderByProperty('id', 'ASC', model), pagination.before_pk))
+        order_columns.extend(zip(key_props, pagination.before_pk))
         query = query.filter(pagination_condition(order_columns, reverse))
 
     limit_amount = (pagination.last if reverse else pagination.first) or 10
-    query = query.order_by(*order_by_statements).limit(limit_amount + 1)
+    query = query.order_by(None)
+    if partition_by:
+        row_number = func.row_number().over(partition_by=partition_by, order_by=order_by_statements)
+        query = query.add_columns(row_number.label('_row_number')).from_self()
+        query = query.filter(literal_column('_row_number') <= limit_amount + 1).order_by(*order_by_statements)
+    else:
+        query = query.order_by(*order_by_statements).limit(limit_amount + 1)
 
     return query.all()
@@ -12,8 +12,13 @@ class PaginationLoader(ConnectionLoader):
         self.pagination = pagination
 
     def batch_load_fn(self, models):
+        if self.empty:
+            return Promise.resolve(self._group_results(models, [], return_child=False))
+
         query = self._make_query(models=models)
-        results = paginate(self.target_model, query, self.pagination)
+        # a batch of several parents is paginated per parent, each getting its own page of children
+        partition_by = self.key_columns if len(models) > 1 else ()
+        results = paginate(self.target_model, query, self.pagination, partition_by=partition_by)
         return Promise.resolve(
             self._group_results(models, results, return_child=False)
         )
@@ -1,10 +1,10 @@
 import json
-from threading import local
 from typing import Union
 
 import graphene
 
-from .base import create_query_function
+from .base import create_query_function, is_empty_query
+from .base_loader import loader_registry
 from .relationship_loader import RelationshipLoader
 from ..base_field import BaseField
 from ...spec import RelationshipSpec
@@ -12,8 +12,6 @@ from ...spec import RelationshipSpec
 
 class RelationshipField(BaseField[RelationshipSpec]):
 
-    _loaders = local()
-
     def _name(self) -> str:
         return self.spec.name
 
@@ -23,7 +21,7 @@ class RelationshipField(BaseField[RelationshipSpec]):
             **self.arguments,
             **self.spec.props,
         }
-        target_node = self.resolver.collection.for_relationship(self.spec.attribute).node
+        target_node = self.resolver.collection.for_relationship(self.spec.attribute).lazy_output_type()
         if self.spec.attribute.uselist:
             list_field = graphene.List(graphene.NonNull(target_node))
             props = {k: v for k, v in props.items() if v is not None}
@@ -35,20 +33,21 @@ class RelationshipField(BaseField[RelationshipSpec]):
         return self.loader(arguments).load(instance)
 
     def loader(self, arguments) -> RelationshipLoader:
-        if not hasattr(self._loaders, 'loaders'):
-            self._loaders.loaders = {}
-
+        loaders = loader_registry(self.session_func())
         key = self.spec.source_model_name, self.name, json.dumps(arguments, default=str)
-        if key not in self._loaders.loaders:
+        if key not in loaders:
             query_func = create_query_function(
                 spec=self.spec,
                 resolver_collection=self.resolver.collection,
                 arguments=arguments,
             )
-            self._loaders.loaders[key] = RelationshipLoader(
+            node = self.resolver.collection.for_relationship(self.spec.attribute).node
+            loaders[key] = RelationshipLoader(
                 self.spec.source_model,
                 self.spec.model_attribute,
                 query_func=query_func,
                 session_func=self.session_func,
+                empty=is_empty_query(self.spec, arguments, self.resolver.collection),
+                unfiltered=not arguments.get('where') and not hasattr(node, f'query_{self.spec.name}'),
             )
-        return self._loaders.loaders[key]
+        return loaders[key]
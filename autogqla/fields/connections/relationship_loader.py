@@ -1,15 +1,55 @@
 from promise import Promise
+from sqlalchemy import inspect
 
-from autogqla.fields.connections.base_loader import ConnectionLoader
+from autogqla.fields.connections.base_loader import ConnectionLoader, relationship_order
 
 
 class RelationshipLoader(ConnectionLoader):
 
+    def __init__(self, *args, unfiltered=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        target_mapper = inspect(self.target_model)
+        # an unfiltered many-to-one keyed on the target's primary key can be served from the identity map
+        self.identity_lookup = (
+            unfiltered
+            and not self.join_parent
+            and not self.member.prop.uselist
+            and set(self.key_columns) == set(target_mapper.primary_key)
+        )
+        self.primary_key_positions = [
+            self.key_columns.index(column) for column in target_mapper.primary_key
+        ] if self.identity_lookup else []
+
+    def _from_identity_map(self, models) -> dict:
+        mapper = inspect(self.target_model)
+        identity_map = self.session.identity_map
+        found = {}
+        for model in models:
+            key = self.parent_key(model)
+            if None in key:
+                found[key] = None
+                continue
+            identity_key = mapper.identity_key_from_primary_key([key[i] for i in self.primary_key_positions])
+            instance = identity_map.get(identity_key)
+            if instance is not None and not inspect(instance).expired:
+                found[key] = instance
+        return found
+
     def batch_load_fn(self, models):
-        return Promise.resolve(
-            self._group_results(
-                models,
-                self._make_query(models).all(),
-                return_child=True,
-            )
-        )
\ No newline at end of file
+        if self.empty:
+            return Promise.resolve(self._group_results(models, []))
+
+        found = self._from_identity_map(models) if self.identity_lookup else {}
+        missing = [model for model in models if self.parent_key(model) not in found]
+        # distinct keys, counted like the keys of the batches
+        self.stats.skipped_keys += sum(None not in key for key in found)
+
+        loaded = iter(self._group_results(
+            missing,
+            self._make_query(missing).order_by(*relationship_order(self.member.prop)).all(),
+            return_child=True,
+        ) if missing else ())
+        return Promise.resolve([
+            found[key] if key in found else next(loaded)
+            for key in map(self.parent_key, models)
+        ])
@@ -0,0 +1,46 @@
+import json
+from functools import partial
+
+import graphene
+
+from .base import apply_query_condition, optimize_arguments
+from .base_loader import loader_registry
+from .tree_loader import TreeLoader
+from ..base_field import BaseField
+from ...spec import RelationshipSpec
+from ...tree import MAX_DEPTH
+
+
+class TreeField(BaseField[RelationshipSpec]):
+    """The ``descendants`` or ``ancestors`` of a row, through a self-referential relationship."""
+
+    def __init__(self, *args, ancestors: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ancestors = ancestors
+
+    def _name(self) -> str:
+        return 'ancestors' if self.ancestors else 'descendants'
+
+    def _make_field(self) -> graphene.Field:
+        list_field = graphene.List(graphene.NonNull(self.resolver.tree_node_type))
+        return graphene.Field(graphene.NonNull(list_field), **self.arguments)
+
+    def _execute(self, instance, info, **arguments):
+        return self.loader(arguments).load(instance)
+
+    def loader(self, arguments) -> TreeLoader:
+        loaders = loader_registry(self.session_func())
+        key = self.spec.source_model_name, self.name, json.dumps(arguments, default=str)
+        if key not in loaders:
+            max_depth = arguments.get('max_depth')
+            optimized = optimize_arguments(self.resolver, arguments)
+            loaders[key] = TreeLoader(
+                self.spec.source_model,
+                self.resolver.hierarchy,
+                self.ancestors,
+                MAX_DEPTH if max_depth is None else max_depth,
+                query_func=partial(apply_query_condition, resolver=self.resolver, arguments=optimized, optimized=True),
+                session_func=self.session_func,
+                empty=optimized is None,
+            )
+        return loaders[key]
@@ -0,0 +1,69 @@
+import time
+from collections import defaultdict
+from typing import Optional
+
+from promise import Promise
+from promise.dataloader import DataLoader
+from sqlalchemy.orm import Session
+
+from autogqla.deadline import check_deadline
+from autogqla.fields.connections.base_loader import LoaderStats
+from autogqla.polymorphic import load_subclasses
+from autogqla.profiling import get_trace
+from autogqla.strict import apply_raiseload
+from autogqla.tree import Hierarchy, split_path, start_column, tree_query
+
+
+class TreeLoader(DataLoader):
+    """Loads the descendants, or the ancestors, of a batch of rows with a single recursive query."""
+
+    def __init__(self, model, tree: Hierarchy, ancestors: bool, max_depth: int, query_func, session_func,
+                 *args, empty=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.model = model
+        self.tree = tree
+        self.ancestors = ancestors
+        self.max_depth = max_depth
+        self.query_func = query_func
+        self.session_func = session_func
+        # set when the filter can never match, in which case no query is issued
+        self.empty = empty
+        self.start_key = model.__mapper__.get_property_by_column(start_column(tree, ancestors)).key
+        self.path_type = tree.primary_key.type.python_type
+        self.stats = LoaderStats()
+        self._queued_at: Optional[float] = None
+
+    @property
+    def session(self) -> Session:
+        return self.session_func()
+
+    def load(self, key):
+        if self._queued_at is None:
+            self._queued_at = time.perf_counter()
+        return super().load(key)
+
+    def batch_load_fn(self, models):
+        keys = {getattr(model, self.start_key) for model in models} - {None}
+        if self.empty or not keys or self.max_depth < 1:
+            return Promise.resolve([[] for _ in models])
+
+        check_deadline(self.session)
+        self.stats.batches += 1
+        self.stats.keys += len(keys)
+        trace = get_trace(self.session)
+        if trace is not None:
+            now = time.perf_counter()
+            name = f'{self.model.__name__}.{"ancestors" if self.ancestors else "descendants"}'
+            trace.add(name, 'loader', self._queued_at or now, now, parents=len(models), keys=len(keys))
+        self._queued_at = None
+
+        query = tree_query(self.session, self.model, self.tree, self.ancestors, list(keys), self.max_depth)
+        query = apply_raiseload(self.session, load_subclasses(query, self.model), self.model)
+        mapping = defaultdict(list)
+        for node, start, depth, path in self.query_func(query).all():
+            mapping[start].append({
+                'node': node,
+                'depth': depth,
+                'path': [self.path_type(key) for key in split_path(path)],
+            })
+        return Promise.resolve([mapping.get(getattr(model, self.start_key), []) for model in models])
@@ -1,7 +1,7 @@
 import graphene
-from graphql_relay import to_global_id
 
 from autogqla.fields import BaseField
+from autogqla.global_ids import instance_id
 from autogqla.spec import FieldSpec
 
 
@@ -14,5 +14,4 @@ class IdentifierField(BaseField[FieldSpec]):
         return graphene.ID()
 
     def _execute(self, instance, info, **arguments):
-        value = getattr(instance, self.spec.key)
-        return to_global_id(self.resolver.model_spec.name, str(value))
+        return instance_id(self.resolver, instance)
@@ -11,8 +11,8 @@ class SimpleField(BaseField[FieldSpec]):
 
     def _make_field(self) -> graphene.Scalar:
         props = {
-            'description': self.spec.column.comment,
-            'required': not self.spec.column.nullable,
+            'description': self.spec.description,
+            'required': not self.spec.nullable,
             **self.spec.props
         }
         return self.spec.field_type(**props)
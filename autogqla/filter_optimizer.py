@@ -0,0 +1,226 @@
+"""
+Normalises ``where`` filters before they are translated into SQL.
+
+* nested ``and`` filters are flattened into a single conjunction
+* conditions on the same field are merged, and conditions on the same relationship are merged into one sub-filter
+* nested ``or`` filters are flattened, and ``or`` filters of ``eq``/``in`` conditions on one field become an ``in``
+* filters that can never match (such as ``{eq: "a", ne: "a"}`` or ``{gt: 5, lt: 3}``) are replaced by ``EMPTY``
+
+Conditions on JSON fields apply to a path each, so they are kept as they are.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import List, Optional, Union
+
+import graphene
+
+from . import spec_resolver
+
+
+class _Empty:
+
+    def __repr__(self):
+        return 'EMPTY'
+
+
+EMPTY = _Empty()
+
+_VALUE_OPS = ('eq', 'in_', 'gt', 'ge', 'lt', 'le', 'starts_with', 'ends_with', 'contains', 'like', 'search')
+
+
+def optimize(resolver: 'spec_resolver.ModelSpecResolver', filter_dict: Optional[dict]) -> Union[dict, _Empty, None]:
+    if not filter_dict:
+        return filter_dict
+    return _normalize(resolver, filter_dict)
+
+
+def _collect(resolver, filter_dict, fields, relationships, alternatives, others):
+    for key, value in filter_dict.items():
+        if value is None:
+            continue
+        if key == 'and_':
+            for item in value:
+                _collect(resolver, item, fields, relationships, alternatives, others)
+        elif key == 'or_':
+            alternatives.append(list(value))
+        elif key in resolver.relationship_specs_dict:
+            relationships.setdefault(key, []).append(value)
+        elif key in resolver.field_specs_dict and resolver.field_specs_dict[key].field_type is not graphene.JSONString:
+            fields.setdefault(key, []).extend(value.items())
+        else:
+            others.append({key: value})
+
+
+def _normalize(resolver, filter_dict):
+    fields, relationships, alternatives, others = OrderedDict(), OrderedDict(), [], []
+    _collect(resolver, filter_dict, fields, relationships, alternatives, others)
+
+    result = OrderedDict()
+    conjuncts: List[dict] = list(others)
+
+    for name, conditions in fields.items():
+        merged = _merge_field(conditions, conjuncts, name)
+        if merged is EMPTY:
+            return EMPTY
+        if merged:
+            result[name] = merged
+
+    for name, sub_filters in relationships.items():
+        target_resolver = resolver.collection.for_model(resolver.relationship_specs_dict[name].target_model)
+        merged = _normalize(target_resolver, {'and_': sub_filters})
+        if merged is EMPTY:
+            return EMPTY
+        if merged:
+            result[name] = merged
+
+    collapsed = False
+    for items in alternatives:
+        normalized = _normalize_alternatives(resolver, items)
+        if normalized is EMPTY:
+            return EMPTY
+        if normalized is None:
+            continue
+        if len(normalized) == 1:
+            conjuncts.append(normalized[0])
+            collapsed = True
+        else:
+            conjuncts.append({'or_': normalized})
+
+    if collapsed:
+        # an ``or`` reduced to a single alternative joins the conjunction, where it may merge further
+        return _normalize(resolver, {'and_': [result, *conjuncts]})
+    if conjuncts:
+        result['and_'] = conjuncts
+    return result
+
+
+def _normalize_alternatives(resolver, items) -> Union[List[dict], _Empty, None]:
+    alternatives = []
+    pending = list(items)
+    while pending:
+        normalized = _normalize(resolver, pending.pop(0))
+        if normalized is EMPTY:
+            continue
+        if not normalized:
+            # an alternative without conditions matches every row
+            return None
+        if list(normalized) == ['or_']:
+            pending = list(normalized['or_']) + pending
+            continue
+        alternatives.append(normalized)
+
+    if not alternatives:
+        # an empty ``or`` places no constraint, while alternatives that can never match leave nothing to match
+        return EMPTY if items else None
+
+    values = OrderedDict()
+    remaining = []
+    for alternative in alternatives:
+        name = next(iter(alternative))
+        if (
+                len(alternative) == 1
+                and name in resolver.field_specs_dict
+                and resolver.field_specs_dict[name].field_type is not graphene.JSONString
+                and len(alternative[name]) == 1
+                and next(iter(alternative[name])) in ('eq', 'in_')
+                # ``eq: null`` is an ``IS NULL`` test, which an ``IN`` list can never express
+                and None not in _values(alternative[name])
+        ):
+            values.setdefault(name, []).extend(_values(alternative[name]))
+        else:
+            remaining.append(alternative)
+
+    in_alternatives = [{name: {'in_': _unique(field_values)}} for name, field_values in values.items()]
+    return in_alternatives + remaining
+
+
+def _values(condition: dict) -> list:
+    [[op, value]] = condition.items()
+    return [value] if op == 'eq' else list(value)
+
+
+def _unique(values) -> list:
+    unique = []
+    for value in values:
+        if value not in unique:
+            unique.append(value)
+    return unique
+
+
+def _merge_field(conditions, conjuncts, name) -> Union[dict, _Empty]:
+    ops = OrderedDict()
+    for op, value in conditions:
+        if op not in ops or ops[op] == value:
+            ops[op] = value
+        elif op == 'eq':
+            return EMPTY
+        elif op == 'in_':
+            ops[op] = [item for item in ops[op] if item in value]
+        elif op == 'not_in':
+            ops[op] = _unique([*ops[op], *value])
+        elif op == 'ne':
+            excluded = [ops.pop(op), value]
+            if None in excluded:
+                # ``ne: null`` is an ``IS NOT NULL`` test, and a null in a ``NOT IN`` list would match nothing
+                ops[op] = None
+            ops['not_in'] = _unique([*ops.get('not_in', ()), *(item for item in excluded if item is not None)])
+        elif op == 'is_null':
+            return EMPTY
+        elif op in ('gt', 'ge'):
+            ops[op] = _compare(max, ops[op], value, conjuncts, name, op)
+        elif op in ('lt', 'le'):
+            ops[op] = _compare(min, ops[op], value, conjuncts, name, op)
+        else:
+            conjuncts.append({name: {op: value}})
+
+    return _simplify(ops)
+
+
+def _compare(function, current, value, conjuncts, name, op):
+    try:
+        return function(current, value)
+    except TypeError:
+        conjuncts.append({name: {op: value}})
+        return current
+
+
+def _simplify(ops: dict) -> Union[dict, _Empty]:
+    if ops.get('is_null') is True and any(ops.get(op) is not None for op in _VALUE_OPS):
+        return EMPTY
+    if 'in_' in ops:
+        excluded = [ops['ne']] if 'ne' in ops else []
+        ops['in_'] = [value for value in ops['in_'] if value not in excluded and value not in ops.get('not_in', ())]
+        if not ops['in_']:
+            return EMPTY
+        if len(ops['in_']) == 1 and 'eq' not in ops:
+            ops['eq'] = ops['in_'][0]
+        if 'eq' in ops:
+            if ops['eq'] not in ops.pop('in_'):
+                return EMPTY
+
+    try:
+        if 'eq' in ops:
+            value = ops['eq']
+            if ('ne' in ops and ops['ne'] == value) or value in ops.get('not_in', ()):
+                return EMPTY
+            if (
+                    ('gt' in ops and not value > ops['gt'])
+                    or ('ge' in ops and not value >= ops['ge'])
+                    or ('lt' in ops and not value < ops['lt'])
+                    or ('le' in ops and not value <= ops['le'])
+            ):
+                return EMPTY
+
+        lower = [(ops[op], op == 'ge') for op in ('gt', 'ge') if op in ops]
+        upper = [(ops[op], op == 'le') for op in ('lt', 'le') if op in ops]
+        for lower_value, lower_inclusive in lower:
+            for upper_value, upper_inclusive in upper:
+                if lower_value > upper_value:
+                    return EMPTY
+                if lower_value == upper_value and not (lower_inclusive and upper_inclusive):
+                    return EMPTY
+    except TypeError:
+        pass
+
+    return ops
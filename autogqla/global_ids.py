@@ -0,0 +1,84 @@
+"""
+Relay global ids, and the primary key conditions of ``id`` filters.
+
+The id of a row is its type name and primary key, base64 encoded as relay does. The key is the value of the primary key
+column, or for composite keys, the JSON list of the values of every primary key column. ``id`` filters decode the ids
+they are given once and become equality or ``IN`` conditions on the primary key columns, so they are index lookups.
+"""
+import binascii
+import json
+import operator
+from typing import List, Sequence
+
+from graphql_relay import from_global_id, to_global_id
+from sqlalchemy import false, inspect, tuple_
+
+
+def primary_key_columns(model) -> List:
+    return list(inspect(model).primary_key)
+
+
+def primary_key_attributes(model) -> List:
+    mapper = inspect(model)
+    return [getattr(model, mapper.get_property_by_column(column).key) for column in mapper.primary_key]
+
+
+def encode_id(type_name: str, values: Sequence) -> str:
+    if len(values) == 1:
+        return to_global_id(type_name, str(values[0]))
+    return to_global_id(type_name, json.dumps(list(values), default=str))
+
+
+def instance_id(resolver, instance) -> str:
+    mapper = inspect(resolver.sqla_model)
+    keys = [mapper.get_property_by_column(column).key for column in mapper.primary_key]
+    return encode_id(resolver.model_spec.name, [getattr(instance, key) for key in keys])
+
+
+def _type_names(resolver) -> set:
+    # the rows of a model's subclasses are filtered by their own ids too, as they share the primary key
+    return {resolver.model_spec.name, *(subclass.model_spec.name for subclass in resolver.subclass_resolvers())}
+
+
+def decode_id(resolver, global_id: str) -> tuple:
+    """Returns the primary key of a global id of the resolver's model, raising for ids of other types."""
+    columns = primary_key_columns(resolver.sqla_model)
+    try:
+        type_name, key = from_global_id(global_id)
+        values = [key] if len(columns) == 1 else json.loads(key)
+        values = tuple(column.type.python_type(value) for column, value in zip(columns, values))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise Exception(f'invalid id {global_id!r}.')
+    if type_name not in _type_names(resolver) or len(values) != len(columns):
+        raise Exception(f'{global_id!r} is not the id of a {resolver.model_spec.name}.')
+    return values
+
+
+def _key(attributes):
+    return attributes[0] if len(attributes) == 1 else tuple_(*attributes)
+
+
+def _value(attributes, values: tuple):
+    return values[0] if len(attributes) == 1 else tuple_(*values)
+
+
+def _in(attributes, keys: List[tuple]):
+    if not keys:
+        return false()
+    if len(attributes) == 1:
+        return attributes[0].in_([key[0] for key in keys])
+    return tuple_(*attributes).in_(keys)
+
+
+def id_condition(resolver, condition: dict):
+    """Returns the primary key condition of an ``IDFilter``."""
+    attributes = primary_key_attributes(resolver.sqla_model)
+    expressions = []
+    for op, value in condition.items():
+        if op in ('eq', 'ne'):
+            expression = operator.eq(_key(attributes), _value(attributes, decode_id(resolver, value)))
+            expressions.append(expression if op == 'eq' else ~expression)
+        elif op in ('in_', 'not_in'):
+            expression = _in(attributes, list(dict.fromkeys(decode_id(resolver, item) for item in value)))
+            expressions.append(expression if op == 'in_' else ~expression)
+    return expressions
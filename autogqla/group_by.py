@@ -0,0 +1,115 @@
+"""
+Grouped counts and aggregates (facets).
+
+A group by field groups the rows matching its ``where`` filter by fields of the model, or of models reached
+through many-to-one relationships, with date and datetime fields optionally truncated to a bucket. Every group has
+its key, its row count and the requested aggregates of the numeric fields, all computed by a single statement.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, and_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import DateTime
+
+from .condition_constructor import OP_CODE_MAPPING
+from .mutations import where_condition
+from .spec_resolver import ModelSpecResolver, GroupByProperty
+
+
+class DateBucket(ColumnElement):
+    """Truncation of a date or datetime to the start of its year, month or day, compiled per dialect."""
+
+    type = DateTime()
+
+    def __init__(self, attribute, bucket: str):
+        self.attribute = attribute
+        self.bucket = bucket
+
+
+_SQLITE_FORMATS = {'year': '%Y-01-01 00:00:00', 'month': '%Y-%m-01 00:00:00', 'day': '%Y-%m-%d 00:00:00'}
+_MYSQL_FORMATS = {'year': '%Y-01-01', 'month': '%Y-%m-01', 'day': '%Y-%m-%d'}
+
+
+@compiles(DateBucket)
+def _compile_bucket(element: DateBucket, compiler, **kw):
+    return compiler.process(func.date_trunc(element.bucket, element.attribute), **kw)
+
+
+@compiles(DateBucket, 'sqlite')
+def _compile_bucket_sqlite(element: DateBucket, compiler, **kw):
+    return compiler.process(func.strftime(_SQLITE_FORMATS[element.bucket], element.attribute), **kw)
+
+
+@compiles(DateBucket, 'mysql')
+def _compile_bucket_mysql(element: DateBucket, compiler, **kw):
+    return compiler.process(func.timestamp(func.date_format(element.attribute, _MYSQL_FORMATS[element.bucket])), **kw)
+
+
+def _key(value):
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def group_by(
+        session: Session,
+        resolver: ModelSpecResolver,
+        by: Sequence[GroupByProperty],
+        where: Optional[dict] = None,
+        having: Optional[dict] = None,
+        aggregates: Sequence[Tuple[str, str]] = (),
+) -> List[dict]:
+    """
+    Returns the groups of the rows matching ``where``, each a dict with its ``key`` (the values of ``by``, as
+    strings), its ``count``, and its ``aggregates`` keyed by ``(aggregate, field name)``.
+    """
+    model = resolver.sqla_model
+    entities = {(): model}
+    joins = []
+
+    def entity(path: Tuple):
+        if path not in entities:
+            parent = entity(path[:-1])
+            entities[path] = aliased(path[-1].mapper.entity)
+            # outer joined, so that rows without a related row are grouped under a null key
+            joins.append((entities[path], getattr(parent, path[-1].key)))
+        return entities[path]
+
+    key_columns = []
+    for prop in by:
+        attribute = getattr(entity(prop.joins), prop.key)
+        key_columns.append(DateBucket(attribute, prop.bucket) if prop.bucket else attribute)
+
+    count = func.count()
+    aggregate_columns = [
+        getattr(func, aggregate)(resolver.field_specs_dict[name].model_attribute)
+        for aggregate, name in aggregates
+    ]
+
+    query = session.query(*key_columns, count, *aggregate_columns).select_from(model)
+    for target, onclause in joins:
+        query = query.outerjoin(target, onclause)
+
+    condition = where_condition(session, resolver, where)
+    if condition is not None:
+        query = query.filter(condition)
+    if key_columns:
+        query = query.group_by(*key_columns)
+
+    having_conditions = [OP_CODE_MAPPING[op](count, value) for op, value in ((having or {}).get('count') or {}).items()]
+    if having_conditions:
+        query = query.having(and_(*having_conditions))
+
+    # the largest groups come first, as facets usually list them
+    query = query.order_by(count.desc(), *key_columns)
+
+    return [
+        {
+            'key': [_key(value) for value in row[:len(key_columns)]],
+            'count': row[len(key_columns)],
+            'aggregates': dict(zip(aggregates, row[len(key_columns) + 1:])),
+        }
+        for row in query.all()
+    ]
@@ -0,0 +1,136 @@
+"""
+Cached introspection results.
+
+Generated schemas have many types, and IDE clients send the introspection query often. The result of a
+document that only selects introspection fields (``__schema``, ``__type`` and ``__typename``) only depends on
+the schema, so it is computed once per document and kept along with its serialised JSON and an ETag, for a bounded
+number of recently used documents.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import graphene
+from graphql import parse, GraphQLError
+from graphql.language.ast import FragmentDefinition, FragmentSpread, InlineFragment, OperationDefinition
+
+
+@dataclass
+class IntrospectionResult:
+    data: dict
+    body: bytes
+    etag: str
+
+
+def is_introspection_document(document, operation_name: Optional[str] = None) -> bool:
+    """Returns whether the operation selects nothing but introspection fields at its root."""
+    fragments = {}
+    operations = []
+    for definition in document.definitions:
+        if isinstance(definition, FragmentDefinition):
+            fragments[definition.name.value] = definition
+        elif isinstance(definition, OperationDefinition):
+            if operation_name is None or (definition.name and definition.name.value == operation_name):
+                operations.append(definition)
+    if len(operations) != 1 or operations[0].operation != 'query':
+        return False
+
+    def introspection_only(selection_set) -> bool:
+        for selection in selection_set.selections:
+            if isinstance(selection, FragmentSpread):
+                fragment = fragments.get(selection.name.value)
+                if fragment is None or not introspection_only(fragment.selection_set):
+                    return False
+            elif isinstance(selection, InlineFragment):
+                if not introspection_only(selection.selection_set):
+                    return False
+            elif not selection.name.value.startswith('__'):
+                return False
+        return True
+
+    return introspection_only(operations[0].selection_set)
+
+
+class IntrospectionCache:
+    """
+    The results of the most recently used introspection documents, at most ``max_size`` of them. Whether recently
+    seen documents are introspection only is remembered too, so other documents are not parsed on every request.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._results: 'OrderedDict[Tuple, IntrospectionResult]' = OrderedDict()
+        self._documents: 'OrderedDict[Tuple, bool]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self._documents.clear()
+
+    def _lookup(self, entries: OrderedDict, key):
+        with self._lock:
+            if key not in entries:
+                return None
+            entries.move_to_end(key)
+            return entries[key]
+
+    def _store(self, entries: OrderedDict, key, value):
+        with self._lock:
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+
+    def get(self, schema, request_string: str, variables: Optional[dict] = None,
+            operation_name: Optional[str] = None) -> Optional[IntrospectionResult]:
+        """
+        Returns the cached result of an introspection document, executing it on first use, or ``None`` when
+        the document is not introspection only.
+        """
+        # every introspection field starts with a double underscore
+        if '__' not in request_string:
+            return None
+
+        document_key = request_string, operation_name
+        introspection = self._lookup(self._documents, document_key)
+        if introspection is None:
+            introspection = self._is_introspection(request_string, operation_name)
+            self._store(self._documents, document_key, introspection)
+        if not introspection:
+            return None
+
+        key = request_string, operation_name, json.dumps(variables, sort_keys=True, default=str)
+        result = self._lookup(self._results, key)
+        if result is None:
+            result = self._execute(schema, request_string, variables, operation_name)
+            # failed executions, such as those with invalid variables, are not kept
+            if result is not None:
+                self._store(self._results, key, result)
+        return result
+
+    @staticmethod
+    def _is_introspection(request_string: str, operation_name: Optional[str]) -> bool:
+        try:
+            document = parse(request_string)
+        except GraphQLError:
+            return False
+        return is_introspection_document(document, operation_name)
+
+    @staticmethod
+    def _execute(schema, request_string: str, variables: Optional[dict],
+                 operation_name: Optional[str]) -> Optional[IntrospectionResult]:
+        # introspection resolvers never touch the database, so no session is opened
+        result = graphene.Schema.execute(schema, request_string, variable_values=variables,
+                                         operation_name=operation_name)
+        if result.errors:
+            return None
+        body = json.dumps({'data': result.data}, separators=(',', ':')).encode()
+        return IntrospectionResult(
+            data=result.data,
+            body=body,
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+        )
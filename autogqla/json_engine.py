@@ -0,0 +1,298 @@
+"""
+Single-statement execution of read-only queries.
+
+Rather than resolving a query field by field, the whole selection is compiled into one SQL statement that
+builds the response with the database's JSON functions: ``json_object``/``json_group_array`` on SQLite and
+``json_build_object``/``json_agg`` on PostgreSQL. Nested relationships become correlated subqueries, so a
+query of any depth is answered in a single round trip, without hydrating ORM instances.
+
+Root fields made by ``make_relationship_resolver`` are compiled when their selections consist of columns,
+identifiers and (optionally filtered) relationships. ``execute`` returns ``None`` for anything else, in which
+case the query is executed by the regular loader engine.
+"""
+import json
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+import graphene
+from graphql import parse, validate, GraphQLError
+from graphql.execution import ExecutionResult
+from graphql.execution.values import get_argument_values, get_variable_values
+from graphql.language.ast import FragmentSpread, InlineFragment, OperationDefinition, FragmentDefinition
+from graphql.type import get_named_type
+from graphql_relay import to_global_id
+from sqlalchemy import select, inspect, and_, func, literal_column, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import ClauseAdapter
+
+from .base import default_registry
+from .fields.connections.base import query_condition, unique_join
+from .fields.connections.base_loader import relationship_order
+from .fields.connections.relationship_field import RelationshipField
+from .fields.identifier_field import IdentifierField
+from .fields.simple_field import SimpleField
+from .global_ids import primary_key_columns
+
+
+class Unsupported(Exception):
+    pass
+
+
+class JsonDialect:
+
+    def __init__(self, build_object: Callable, aggregate: Callable, nested: Callable):
+        self.build_object = build_object
+        self.aggregate = aggregate
+        # applied to subquery results, which the database would otherwise embed as strings
+        self.nested = nested
+
+
+DIALECTS = {
+    'sqlite': JsonDialect(
+        build_object=func.json_object,
+        aggregate=func.json_group_array,
+        nested=func.json,
+    ),
+    'postgresql': JsonDialect(
+        build_object=func.json_build_object,
+        aggregate=lambda value: func.coalesce(func.json_agg(value), literal_column("'[]'::json")),
+        nested=lambda value: value,
+    ),
+}
+
+# scalars whose JSON representation can be serialized like the column value itself
+SCALAR_TYPES = ('String', 'ID', 'Int', 'Float', 'Boolean')
+
+
+class _Context:
+
+    def __init__(self, session: Session, dialect: JsonDialect, fragments: dict, variables: dict):
+        self.session = session
+        self.dialect = dialect
+        self.fragments = fragments
+        self.variables = variables
+
+
+def _collect_fields(context: _Context, field_asts) -> 'OrderedDict[str, list]':
+    fields = OrderedDict()
+
+    def walk(selection_set):
+        for selection in selection_set.selections if selection_set else ():
+            if selection.directives:
+                raise Unsupported()
+            if isinstance(selection, FragmentSpread):
+                walk(context.fragments[selection.name.value].selection_set)
+            elif isinstance(selection, InlineFragment):
+                walk(selection.selection_set)
+            else:
+                response_name = selection.alias.value if selection.alias else selection.name.value
+                fields.setdefault(response_name, []).append(selection)
+
+    for field_ast in field_asts:
+        walk(field_ast.selection_set)
+    return fields
+
+
+def _scalar(field_def, value_converter: Optional[Callable] = None) -> Callable:
+    field_type = get_named_type(field_def.type)
+    if field_type.name not in SCALAR_TYPES:
+        raise Unsupported()
+
+    def convert(value):
+        if value is None:
+            return None
+        if value_converter:
+            value = value_converter(value)
+        return field_type.serialize(value)
+
+    return convert
+
+
+def _compile_object(context: _Context, object_type, field_asts, source) -> Tuple[object, Callable]:
+    """Compiles the selections of an object, whose columns are read from ``source``."""
+    arguments = []
+    converters = []
+    for response_name, response_asts in _collect_fields(context, field_asts).items():
+        name = response_asts[0].name.value
+        if name == '__typename':
+            converters.append((response_name, None, object_type.name))
+            continue
+
+        field_def = object_type.fields.get(name)
+        field = getattr(field_def.resolver, '__self__', None) if field_def else None
+        if type(field) in (SimpleField, IdentifierField):
+            if field.spec.is_expression:
+                column = ClauseAdapter(source).traverse(field.spec.expression)
+            else:
+                column = source.corresponding_column(field.spec.column)
+            if column is None or response_asts[0].arguments:
+                raise Unsupported()
+            if isinstance(field, IdentifierField) and len(primary_key_columns(field.resolver.sqla_model)) > 1:
+                raise Unsupported()
+            if isinstance(field, IdentifierField):
+                model_name = field.resolver.model_spec.name
+                convert = _scalar(field_def, lambda value, model_name=model_name: to_global_id(model_name, str(value)))
+            else:
+                convert = _scalar(field_def)
+            arguments.extend([response_name, column])
+            converters.append((response_name, convert, None))
+        elif type(field) is RelationshipField:
+            value, convert = _compile_relationship(context, field, field_def, response_asts, source)
+            arguments.extend([response_name, value])
+            converters.append((response_name, convert, None))
+        else:
+            raise Unsupported()
+
+    def convert_object(value):
+        return OrderedDict(
+            (response_name, constant if convert is None else convert(value[response_name]))
+            for response_name, convert, constant in converters
+        )
+
+    return context.dialect.build_object(*arguments), convert_object
+
+
+def _filter_condition(context: _Context, resolver, arguments: dict, source):
+    """Returns the condition on ``source`` that selects the rows matched by the ``where`` argument."""
+    joins, condition, _ = query_condition(resolver, arguments)
+    if condition is None or not joins:
+        return condition if condition is None else ClauseAdapter(source).traverse(condition)
+
+    # a join would repeat rows, so the matching primary keys are selected through a subquery instead
+    pk_columns = inspect(resolver.sqla_model).primary_key
+    query = context.session.query(*pk_columns)
+    for join_attr in joins:
+        query = unique_join(query, join_attr)
+    matching = query.filter(condition).subquery()
+    keys = [source.corresponding_column(column) for column in pk_columns]
+    return (keys[0] if len(keys) == 1 else tuple_(*keys)).in_(matching)
+
+
+def _compile_relationship(context: _Context, field: RelationshipField, field_def, field_asts, source):
+    arguments = get_argument_values(field_def.args, field_asts[0].arguments, context.variables)
+    node = field.resolver.collection.for_relationship(field.spec.attribute).node
+    if hasattr(node, f'query_{field.spec.name}'):
+        raise Unsupported()
+
+    prop = field.spec.model_attribute.prop
+    target_table = prop.mapper.local_table
+    if target_table is prop.parent.local_table:
+        raise Unsupported()
+
+    target = target_table.alias()
+    conditions = [prop.primaryjoin]
+    if prop.secondary is not None:
+        secondary = prop.secondary.alias()
+        conditions = [
+            ClauseAdapter(secondary).traverse(condition)
+            for condition in (prop.primaryjoin, prop.secondaryjoin)
+        ]
+    condition = ClauseAdapter(target).traverse(ClauseAdapter(source).traverse(and_(*conditions)))
+
+    target_resolver = field.resolver.collection.for_model(field.spec.target_model)
+    if query_condition(target_resolver, arguments)[2]:
+        # relevance ordering cannot be applied within an aggregate portably
+        raise Unsupported()
+    where = _filter_condition(context, target_resolver, arguments, target)
+    if where is not None:
+        condition = and_(condition, where)
+
+    value, convert = _compile_object(context, get_named_type(field_def.type), field_asts, target)
+    if prop.uselist:
+        # the children are aggregated in the order the relationship loader returns them
+        order_by = [ClauseAdapter(target).traverse(column) for column in relationship_order(prop)]
+        rows = select([value.label('value')]).where(condition).order_by(*order_by).correlate(source).alias()
+        subquery = select([context.dialect.aggregate(context.dialect.nested(rows.c.value))]).as_scalar()
+        return context.dialect.nested(subquery), lambda values: [convert(item) for item in values]
+
+    subquery = select([value]).where(condition).limit(1).as_scalar()
+    return context.dialect.nested(subquery), lambda item: None if item is None else convert(item)
+
+
+def _compile_root(context: _Context, field_def, field_asts):
+    model = getattr(field_def.resolver, 'model', None)
+    if model is None:
+        raise Unsupported()
+
+    resolver = getattr(field_def.resolver, 'registry', default_registry).resolver_collection.for_model(model)
+    arguments = get_argument_values(field_def.args, field_asts[0].arguments, context.variables)
+    table = inspect(model).local_table
+    rows = select(list(table.c))
+    where = _filter_condition(context, resolver, arguments, table)
+    if where is not None:
+        rows = rows.where(where)
+    rows = rows.order_by(*query_condition(resolver, arguments)[2]).alias()
+
+    value, convert = _compile_object(context, get_named_type(field_def.type), field_asts, rows)
+    subquery = select([context.dialect.aggregate(value)]).select_from(rows).as_scalar()
+    return context.dialect.nested(subquery), lambda values: [convert(item) for item in values]
+
+
+def _operation(document, operation_name: Optional[str]) -> Optional[OperationDefinition]:
+    operations = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, OperationDefinition)
+        and (operation_name is None or (definition.name and definition.name.value == operation_name))
+    ]
+    return operations[0] if len(operations) == 1 else None
+
+
+def compile_query(schema: graphene.Schema, session: Session, request_string: str, variables: Optional[dict] = None,
+                  operation_name: Optional[str] = None):
+    """
+    Compiles a query into a single statement, returning the statement and a function that converts its
+    result row into the response data. Raises ``Unsupported`` when the query cannot be compiled.
+    """
+    dialect = DIALECTS.get(session.get_bind().dialect.name)
+    if dialect is None:
+        raise Unsupported()
+
+    document = parse(request_string)
+    if validate(schema, document):
+        raise Unsupported()
+    operation = _operation(document, operation_name)
+    if operation is None or operation.operation != 'query':
+        raise Unsupported()
+
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinition)
+    }
+    variables = get_variable_values(schema, operation.variable_definitions or [], variables or {})
+    context = _Context(session, dialect, fragments, variables)
+
+    query_type = schema.get_query_type()
+    columns = []
+    converters = []
+    for response_name, field_asts in _collect_fields(context, [operation]).items():
+        field_def = query_type.fields.get(field_asts[0].name.value)
+        if field_def is None:
+            raise Unsupported()
+        value, convert = _compile_root(context, field_def, field_asts)
+        columns.append(value.label(response_name))
+        converters.append((response_name, convert))
+
+    def convert_row(row):
+        data = OrderedDict()
+        for index, (response_name, convert) in enumerate(converters):
+            value = row[index]
+            data[response_name] = convert(json.loads(value) if isinstance(value, (str, bytes)) else value)
+        return data
+
+    return select(columns), convert_row
+
+
+def execute(schema: graphene.Schema, session: Session, request_string: str, variables: Optional[dict] = None,
+            operation_name: Optional[str] = None) -> Optional[ExecutionResult]:
+    try:
+        statement, convert_row = compile_query(schema, session, request_string, variables, operation_name)
+    except (Unsupported, GraphQLError):
+        return None
+
+    try:
+        data = convert_row(session.execute(statement).first())
+    except Exception as error:
+        return ExecutionResult(errors=[GraphQLError(str(error), original_error=error)])
+    return ExecutionResult(data=data)
@@ -0,0 +1,215 @@
+"""
+Filtering and ordering on paths within JSON columns.
+
+JSON fields are filtered with ``JSONFilter``, whose predicates apply to the value at its dotted ``path`` (``address.city``,
+``tags.0``), and ordered by the paths declared for them with ``FieldsSpec(json_paths=...)``. Everything is compiled
+into the statement: ``json_extract`` on SQLite and MySQL, ``#>>``/``@>``/``?`` on PostgreSQL.
+
+Values are compared as the type declared for their path, or otherwise as the type of the compared value (a string,
+number or boolean). ``index_statements`` returns DDL for indexes matching the compiled expressions of the declared
+paths, for those filtered or ordered on often.
+"""
+import json
+import operator
+from typing import Dict, List, Optional, Tuple, Union
+
+import graphene
+from graphene.types.generic import GenericScalar
+from sqlalchemy import Text, and_, cast, exists, literal, literal_column, select, func, true
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import Boolean
+
+Path = Tuple[Union[str, int], ...]
+
+
+class JSONFilter(graphene.InputObjectType):
+    path = graphene.String()
+    eq = GenericScalar()
+    ne = GenericScalar()
+    gt = GenericScalar()
+    ge = GenericScalar()
+    lt = GenericScalar()
+    le = GenericScalar()
+    in_ = graphene.List(GenericScalar, name="in")
+    contains = GenericScalar()
+    has_key = graphene.String()
+    is_null = graphene.Boolean()
+
+
+def parse_path(path: Optional[str]) -> Path:
+    return tuple(int(part) if part.isdigit() else part for part in path.split('.')) if path else ()
+
+
+def _path_string(path: Path) -> str:
+    return '$' + ''.join(f'[{part}]' if isinstance(part, int) else f'."{part}"' for part in path)
+
+
+def typed_path(column, path: Path, path_type: type):
+    """The value at ``path``, as a SQL value of ``path_type`` (``str``, ``int``, ``float`` or ``bool``)."""
+    element = column[path]
+    if path_type is bool:
+        return element.as_boolean()
+    if path_type is int:
+        return element.as_integer()
+    if path_type is float:
+        return element.as_float()
+    return element.as_string()
+
+
+def _value_type(value) -> type:
+    if isinstance(value, bool):
+        return bool
+    return float if isinstance(value, (int, float)) else str
+
+
+class JSONContains(ColumnElement):
+    """Whether the JSON value at ``path`` contains ``value``, as PostgreSQL's ``@>`` defines it."""
+
+    type = Boolean()
+
+    def __init__(self, column, path: Path, value):
+        self.column = column
+        self.path = path
+        self.value = value
+
+    def get_children(self, **kwargs):
+        return [self.column]
+
+    def _copy_internals(self, clone=None, **kwargs):
+        self.column = clone(self.column, **kwargs)
+
+
+class JSONHasKey(ColumnElement):
+    """Whether the JSON value at ``path`` is an object with the ``key``."""
+
+    type = Boolean()
+
+    def __init__(self, column, path: Path, key: str):
+        self.column = column
+        self.path = path
+        self.key = key
+
+    def get_children(self, **kwargs):
+        return [self.column]
+
+    def _copy_internals(self, clone=None, **kwargs):
+        self.column = clone(self.column, **kwargs)
+
+
+def _at(column, path: Path):
+    return column[path] if path else column
+
+
+def _expand_contains(column, path: Path, value):
+    # containment spelled out with json_extract and json_each, for dialects without a containment operator
+    if isinstance(value, dict):
+        return and_(true(), *[_expand_contains(column, path + (key,), item) for key, item in value.items()])
+    if isinstance(value, list):
+        conditions = []
+        for item in value:
+            if isinstance(item, (dict, list)):
+                raise Exception('contains only matches scalar array items on this database.')
+            items = func.json_each(column, _path_string(path)).alias('autogqla_items')
+            conditions.append(exists(
+                select([literal_column('1')]).select_from(items).where(literal_column('autogqla_items.value') == item)
+            ))
+        return and_(true(), *conditions)
+    return typed_path(column, path, _value_type(value)) == value
+
+
+@compiles(JSONContains)
+def _compile_contains(element: JSONContains, compiler, **kw):
+    return compiler.process(_expand_contains(element.column, element.path, element.value), **kw)
+
+
+@compiles(JSONContains, 'postgresql')
+def _compile_contains_postgresql(element: JSONContains, compiler, **kw):
+    value = cast(literal(json.dumps(element.value), Text), postgresql.JSONB)
+    return compiler.process(cast(_at(element.column, element.path), postgresql.JSONB).contains(value), **kw)
+
+
+@compiles(JSONContains, 'mysql')
+def _compile_contains_mysql(element: JSONContains, compiler, **kw):
+    return compiler.process(func.json_contains(_at(element.column, element.path), json.dumps(element.value)), **kw)
+
+
+@compiles(JSONHasKey)
+def _compile_has_key(element: JSONHasKey, compiler, **kw):
+    path = _path_string(element.path + (element.key,))
+    return compiler.process(func.json_type(element.column, path).isnot(None), **kw)
+
+
+@compiles(JSONHasKey, 'postgresql')
+def _compile_has_key_postgresql(element: JSONHasKey, compiler, **kw):
+    target = cast(_at(element.column, element.path), postgresql.JSONB)
+    return compiler.process(target.has_key(element.key), **kw)
+
+
+@compiles(JSONHasKey, 'mysql')
+def _compile_has_key_mysql(element: JSONHasKey, compiler, **kw):
+    path = _path_string(element.path + (element.key,))
+    return compiler.process(func.json_contains_path(element.column, 'one', path), **kw)
+
+
+_COMPARISONS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'lt': operator.lt,
+    'le': operator.le,
+    'in_': lambda a, b: a.in_(b),
+    'is_null': lambda a, b: a.is_(None) if b else a.isnot(None),
+}
+
+
+def json_condition(column, condition: dict, path_types: Optional[Dict[str, type]] = None):
+    """Returns the condition of a ``JSONFilter`` on a JSON column, given the types declared for its paths."""
+    path_string = condition.get('path')
+    path = parse_path(path_string)
+    expressions = []
+    for op, value in condition.items():
+        if op == 'path':
+            continue
+        if op == 'contains':
+            expressions.append(JSONContains(column, path, value))
+        elif op == 'has_key':
+            expressions.append(JSONHasKey(column, path, value))
+        else:
+            if not path:
+                raise Exception(f'the {op} JSON filter requires a path.')
+            compared = (value or [None])[0] if op == 'in_' else value
+            path_type = (path_types or {}).get(path_string) or _value_type(compared)
+            expressions.append(_COMPARISONS[op](typed_path(column, path, path_type), value))
+    return and_(*expressions) if expressions else None
+
+
+_GENERATED_COLUMN_TYPES = {str: 'VARCHAR(255)', int: 'BIGINT', float: 'DOUBLE', bool: 'BOOLEAN'}
+
+
+def index_statements(resolver, dialect) -> List[str]:
+    """
+    Returns the DDL of an index for every declared JSON path of the resolver's model, on the same expression its
+    filters and orderings compile to. MySQL cannot index expressions of JSON, so the path is first extracted into a
+    generated column, which the optimizer substitutes for the matching expression.
+    """
+    table = resolver.sqla_model.__table__
+    statements = []
+    for field_name, path_types in resolver.model_spec.fields.json_paths.items():
+        column = resolver.field_specs_dict[field_name].column
+        for path_string, path_type in path_types.items():
+            path = parse_path(path_string)
+            name = f'{column.name}__{"_".join(str(part) for part in path)}'
+            expression = typed_path(literal_column(column.name, column.type), path, path_type)
+            sql = str(expression.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+            if dialect.name == 'mysql':
+                statements.append(
+                    f'ALTER TABLE {table.name} ADD COLUMN {name} {_GENERATED_COLUMN_TYPES[path_type]} '
+                    f'GENERATED ALWAYS AS ({sql}) VIRTUAL'
+                )
+                statements.append(f'CREATE INDEX ix_{table.name}_{name} ON {table.name} ({name})')
+            else:
+                statements.append(f'CREATE INDEX ix_{table.name}_{name} ON {table.name} (({sql}))')
+    return statements
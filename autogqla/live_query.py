@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set
+
+from graphql import parse
+from graphql.language import ast
+
+from .changes import ChangeTracker
+
+logger = logging.getLogger(__name__)
+
+
+def json_patch(old, new, path='') -> List[dict]:
+    """Returns the RFC 6902 operations required to turn ``old`` into ``new``."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations = []
+        for key in old:
+            if key not in new:
+                operations.append({'op': 'remove', 'path': f'{path}/{key}'})
+        for key, value in new.items():
+            if key not in old:
+                operations.append({'op': 'add', 'path': f'{path}/{key}', 'value': value})
+            else:
+                operations.extend(json_patch(old[key], value, f'{path}/{key}'))
+        return operations
+
+    if isinstance(old, list) and isinstance(new, list):
+        operations = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            operations.extend(json_patch(old_item, new_item, f'{path}/{index}'))
+        for index in range(len(old) - 1, len(new) - 1, -1):
+            operations.append({'op': 'remove', 'path': f'{path}/{index}'})
+        for index in range(len(old), len(new)):
+            operations.append({'op': 'add', 'path': f'{path}/{index}', 'value': new[index]})
+        return operations
+
+    if old != new:
+        return [{'op': 'replace', 'path': path, 'value': new}]
+    return []
+
+
+def _walk(node):
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+    elif isinstance(node, ast.Node):
+        yield node
+        for slot in node.__slots__:
+            if slot != 'loc':
+                yield from _walk(getattr(node, slot, None))
+
+
+def split_document(document: ast.Document, operation_name: Optional[str] = None) -> Dict[str, ast.Document]:
+    """Splits an operation into one document per root field, keyed by the root field's response key."""
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, ast.FragmentDefinition)
+    }
+    operations = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, ast.OperationDefinition)
+        and (operation_name is None or (definition.name and definition.name.value == operation_name))
+    ]
+    if len(operations) != 1:
+        raise Exception('live queries require exactly one operation to be selected.')
+    [operation] = operations
+
+    documents = OrderedDict()
+    for selection in operation.selection_set.selections:
+        if not isinstance(selection, ast.Field):
+            raise Exception('live queries do not support fragments on the root type.')
+
+        used_fragments = OrderedDict()
+        pending = [selection]
+        while pending:
+            for node in _walk(pending.pop()):
+                if isinstance(node, ast.FragmentSpread) and node.name.value not in used_fragments:
+                    used_fragments[node.name.value] = fragments[node.name.value]
+                    pending.append(fragments[node.name.value])
+
+        used_variables = {
+            node.name.value
+            for node in _walk([selection, *used_fragments.values()])
+            if isinstance(node, ast.Variable)
+        }
+        sub_operation = ast.OperationDefinition(
+            operation=operation.operation,
+            name=operation.name,
+            variable_definitions=[
+                definition
+                for definition in operation.variable_definitions or ()
+                if definition.variable.name.value in used_variables
+            ],
+            directives=operation.directives,
+            selection_set=ast.SelectionSet(selections=[selection]),
+        )
+        key = (selection.alias or selection.name).value
+        documents[key] = ast.Document(definitions=[sub_operation, *used_fragments.values()])
+    return documents
+
+
+class LiveQueryUpdate:
+
+    def __init__(self, data: dict, patch: List[dict], errors: Optional[list] = None):
+        self.data = data
+        self.patch = patch
+        self.errors = errors or []
+
+
+class LiveQuery:
+
+    def __init__(self, manager: LiveQueryManager, documents: Dict[str, ast.Document], variables: Optional[dict],
+                 callback: Optional[Callable[[LiveQueryUpdate], None]] = None):
+        self.manager = manager
+        self.documents = documents
+        self.variables = variables
+        self.callback = callback
+        self.data: Optional[dict] = None
+        self.errors: Dict[str, list] = {}
+        self.dependencies: Dict[str, Set[str]] = {}
+        self._loop = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._backlog: List[Optional[LiveQueryUpdate]] = []
+
+    def _execute(self, keys) -> dict:
+        data = {}
+        for key in keys:
+            with self.manager.recording() as tables:
+                result = self.manager.schema.execute(self.documents[key], variable_values=self.variables)
+            self.dependencies[key] = tables
+            self.errors[key] = list(result.errors or ())
+            data[key] = result.data.get(key) if result.data else None
+        return data
+
+    def start(self):
+        self.data = self._execute(self.documents)
+
+    def refresh(self, tables: Set[str]):
+        keys = [key for key in self.documents if self.dependencies.get(key, set()) & tables]
+        if not keys:
+            return
+
+        data = {**self.data, **self._execute(keys)}
+        patch = json_patch(self.data, data)
+        self.data = data
+        if patch:
+            errors = [error for key in self.documents for error in self.errors[key]]
+            self._deliver(LiveQueryUpdate(data=data, patch=patch, errors=errors))
+
+    def _deliver(self, update: Optional[LiveQueryUpdate]):
+        if update is not None and self.callback:
+            self.callback(update)
+        if self._queue is not None:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, update)
+        else:
+            self._backlog.append(update)
+
+    def close(self):
+        self.manager.unregister(self)
+        self._deliver(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> LiveQueryUpdate:
+        if self._queue is None:
+            self._loop = asyncio.get_event_loop()
+            self._queue = asyncio.Queue()
+            for update in self._backlog:
+                self._queue.put_nowait(update)
+            self._backlog = []
+
+        update = await self._queue.get()
+        if update is None:
+            raise StopAsyncIteration
+        return update
+
+
+class LiveQueryManager:
+    """Tracks the tables read by each live query and re-runs its root fields once a commit changes them."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.live_queries: List[LiveQuery] = []
+        # the refreshes are queued from the checkin event, as the commit event fires before the commit is complete
+        self._changes = ChangeTracker(self._dispatch, on_checkin=True)
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        # the tables of completed commits, refreshed by the worker thread rather than the committing one
+        self._pending: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def register(self, request_string, variables=None, operation_name=None, callback=None) -> LiveQuery:
+        self._listen(self.schema.session_factory)
+        document = parse(request_string) if isinstance(request_string, str) else request_string
+        live_query = LiveQuery(self, split_document(document, operation_name), variables, callback)
+        live_query.start()
+        with self._lock:
+            self.live_queries.append(live_query)
+        return live_query
+
+    def unregister(self, live_query: LiveQuery):
+        with self._lock:
+            if live_query in self.live_queries:
+                self.live_queries.remove(live_query)
+            if not self.live_queries:
+                self._remove_listeners()
+                self._stop()
+
+    def join(self):
+        """Waits until the live queries have been refreshed for every commit completed so far."""
+        self._pending.join()
+
+    def recording(self):
+        return self._changes.recording()
+
+    def notify(self, tables: Set[str]):
+        if not tables or getattr(self._local, 'refreshing', False):
+            return
+
+        self._local.refreshing = True
+        try:
+            with self._lock:
+                live_queries = list(self.live_queries)
+            for live_query in live_queries:
+                live_query.refresh(tables)
+        finally:
+            self._local.refreshing = False
+
+    def _dispatch(self, tables: Set[str]):
+        # the commits of the refreshes themselves, which only read, are not dispatched again
+        if getattr(self._local, 'refreshing', False):
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='autogqla-live-queries', daemon=True)
+                self._worker.start()
+        self._pending.put(tables)
+
+    def _stop(self):
+        if self._worker is not None:
+            self._pending.put(None)
+            self._worker = None
+
+    def _run(self):
+        while True:
+            tables = self._pending.get()
+            try:
+                if tables is None:
+                    return
+                self.notify(tables)
+            except Exception:
+                # a failing callback must not stop the refreshes of later commits
+                logger.exception('live query refresh failed')
+            finally:
+                self._pending.task_done()
+
+    def _listen(self, session_factory):
+        session = session_factory()
+        try:
+            engine = session.get_bind()
+        finally:
+            session.close()
+        self._changes.listen(engine)
+
+    def _remove_listeners(self):
+        self._changes.remove()
@@ -0,0 +1,142 @@
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+from sqlalchemy import inspect, tuple_, false
+from sqlalchemy.orm import Session
+
+from .condition_constructor import construct_condition
+from .fields.connections.base import unique_join
+from .filter_optimizer import optimize, EMPTY
+from .polymorphic import load_subclasses
+from .spec_resolver import ModelSpecResolver
+from .strict import apply_raiseload
+
+
+def supports_returning(session: Session, model) -> bool:
+    return bool(session.get_bind(mapper=inspect(model)).dialect.implicit_returning)
+
+
+def primary_key_condition(model, primary_keys):
+    pk_columns = inspect(model).primary_key
+    if len(pk_columns) == 1:
+        return pk_columns[0].in_([pk[0] for pk in primary_keys])
+    return tuple_(*pk_columns).in_([tuple(pk) for pk in primary_keys])
+
+
+def _query(session: Session, model):
+    return apply_raiseload(session, load_subclasses(session.query(model), model), model)
+
+
+def load_by_primary_keys(session: Session, model, primary_keys) -> list:
+    if not primary_keys:
+        return []
+    return _query(session, model).populate_existing().filter(primary_key_condition(model, primary_keys)).all()
+
+
+def where_condition(session: Session, resolver: ModelSpecResolver, where: Optional[dict]):
+    where = optimize(resolver, where)
+    if where is EMPTY:
+        return false()
+
+    joins, condition = construct_condition(resolver, where)
+    if condition is None or not joins:
+        return condition
+
+    # relationship filters cannot be joined into an UPDATE/DELETE, so the
+    # matching primary keys are selected through a subquery instead
+    pk_columns = inspect(resolver.sqla_model).primary_key
+    query = session.query(*pk_columns)
+    for join_attr in joins:
+        query = unique_join(query, join_attr)
+    subquery = query.filter(condition).subquery()
+    if len(pk_columns) == 1:
+        return pk_columns[0].in_(subquery)
+    return tuple_(*pk_columns).in_(subquery)
+
+
+def _column_values(resolver: ModelSpecResolver, values: dict) -> dict:
+    return {
+        resolver.field_specs_dict[name].column.key: value
+        for name, value in values.items()
+    }
+
+
+def _select_primary_keys(session: Session, model, condition) -> List[Tuple]:
+    query = session.query(*inspect(model).primary_key)
+    if condition is not None:
+        query = query.filter(condition)
+    return [tuple(row) for row in query.all()]
+
+
+def bulk_insert(session: Session, resolver: ModelSpecResolver, values: List[dict], returning=False):
+    model = resolver.sqla_model
+    table = inspect(model).local_table
+
+    # executemany requires every row to provide the same columns
+    groups = defaultdict(list)
+    for item in values:
+        row = _column_values(resolver, item)
+        groups[tuple(sorted(row))].append(row)
+
+    if not returning:
+        for rows in groups.values():
+            session.execute(table.insert(), rows)
+        return len(values), []
+
+    if supports_returning(session, model):
+        instances = []
+        for rows in groups.values():
+            result = session.execute(table.insert().values(rows).returning(*table.c))
+            instances.extend(_query(session, model).populate_existing().instances(result))
+        return len(values), instances
+
+    primary_keys = []
+    for rows in groups.values():
+        for row in rows:
+            primary_keys.append(tuple(session.execute(table.insert().values(row)).inserted_primary_key))
+    return len(values), load_by_primary_keys(session, model, primary_keys)
+
+
+def bulk_update(session: Session, resolver: ModelSpecResolver, where: dict, values: dict, returning=False):
+    model = resolver.sqla_model
+    table = inspect(model).local_table
+    condition = where_condition(session, resolver, where)
+    statement = table.update().values(_column_values(resolver, values))
+    if condition is not None:
+        statement = statement.where(condition)
+
+    if not returning:
+        return session.execute(statement).rowcount, []
+
+    if supports_returning(session, model):
+        result = session.execute(statement.returning(*table.c))
+        instances = list(_query(session, model).populate_existing().instances(result))
+        return len(instances), instances
+
+    primary_keys = _select_primary_keys(session, model, condition)
+    affected = session.execute(statement).rowcount
+    return affected, load_by_primary_keys(session, model, primary_keys)
+
+
+def bulk_delete(session: Session, resolver: ModelSpecResolver, where: dict, returning=False):
+    model = resolver.sqla_model
+    table = inspect(model).local_table
+    condition = where_condition(session, resolver, where)
+    statement = table.delete()
+    if condition is not None:
+        statement = statement.where(condition)
+
+    if not returning:
+        return session.execute(statement).rowcount, []
+
+    if supports_returning(session, model):
+        result = session.execute(statement.returning(*table.c))
+        instances = list(_query(session, model).instances(result))
+        return len(instances), instances
+
+    query = _query(session, model)
+    if condition is not None:
+        query = query.filter(condition)
+    instances = query.all()
+    affected = session.execute(statement).rowcount
+    return affected, instances
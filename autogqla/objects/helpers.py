@@ -1,14 +1,57 @@
+from typing import Optional
+
 import graphene
+from graphql.execution.values import get_argument_values
+from graphql.language.ast import FragmentSpread, InlineFragment
+from graphql.type import get_named_type
 
-from autogqla.base import BaseModel
-from autogqla.fields.connections.base import apply_query_condition
+from autogqla.base import Registry, default_registry
+from autogqla.deadline import check_deadline
+from autogqla.fields.connections.base import apply_query_condition, optimize_arguments
 from autogqla.fields.connections.pagination_connection_field import PaginationConnectionField
 from autogqla.fields.connections.pagination_details import PaginationDetails
 from autogqla.fields.connections.pagination_helpers import paginate
+from autogqla.group_by import group_by
+from autogqla.mutations import bulk_insert, bulk_update, bulk_delete
+from autogqla.polymorphic import load_subclasses
+from autogqla.prefetch import prefetch
+from autogqla.spec_resolver import AGGREGATES
+from autogqla.strict import apply_raiseload
+
+
+def _selected_fields(info):
+    def walk(selection_set):
+        for selection in selection_set.selections if selection_set else ():
+            if isinstance(selection, FragmentSpread):
+                yield from walk(info.fragments[selection.name.value].selection_set)
+            elif isinstance(selection, InlineFragment):
+                yield from walk(selection.selection_set)
+            else:
+                yield selection
+
+    for field_ast in info.field_asts:
+        yield from walk(field_ast.selection_set)
+
+
+def _selects_field(info, name) -> bool:
+    return any(selection.name.value == name for selection in _selected_fields(info))
 
 
-def make_pagination_field(model):
-    resolver = BaseModel.resolver_collection.for_model(model)
+def _selected_aggregates(info):
+    group_type = get_named_type(info.return_type)
+    aggregates = []
+    for selection in _selected_fields(info):
+        if selection.name.value in AGGREGATES:
+            arguments = get_argument_values(
+                group_type.fields[selection.name.value].args, selection.arguments, info.variable_values,
+            )
+            if (selection.name.value, arguments['field']) not in aggregates:
+                aggregates.append((selection.name.value, arguments['field']))
+    return aggregates
+
+
+def make_pagination_field(model, registry: Optional[Registry] = None):
+    resolver = (registry or default_registry).resolver_collection.for_model(model)
     return PaginationConnectionField(
         resolver.connection_type,
         where=graphene.Argument(resolver.where_input_type),
@@ -16,35 +59,143 @@ def make_pagination_field(model):
     )
 
 
-def make_pagination_resolver(model):
-    def execute(_, _info, first=None, last=None, before=None, after=None, order_by=None, **arguments):
+def make_pagination_resolver(model, registry: Optional[Registry] = None):
+    registry = registry or default_registry
+
+    def execute(_, info, first=None, last=None, before=None, after=None, order_by=None, **arguments):
         pagination = PaginationDetails(before, after, first, last, tuple(order_by or ()))
-        session = BaseModel.session_func()
-        resolver = BaseModel.resolver_collection.for_model(model)
-        query = session.query(model)
+        session = registry.get_session()
+        check_deadline(session)
+        resolver = registry.resolver_collection.for_model(model)
+        arguments = optimize_arguments(resolver, arguments)
+        if arguments is None:
+            return []
+        query = apply_raiseload(session, load_subclasses(session.query(model), model), model)
 
-        query = apply_query_condition(query=query, resolver=resolver, arguments=arguments)
-        return paginate(model, query, pagination)
+        query = apply_query_condition(query=query, resolver=resolver, arguments=arguments, optimized=True)
+        results = paginate(model, query, pagination)
+        prefetch(session, info, [result[0] for result in results], path=('edges', 'node'))
+        return results
 
     return execute
 
 
-def make_relationship_field(model):
-    resolver = BaseModel.resolver_collection.for_model(model)
+def make_relationship_field(model, registry: Optional[Registry] = None):
+    resolver = (registry or default_registry).resolver_collection.for_model(model)
     return graphene.List(
-        graphene.NonNull(resolver.node),
+        graphene.NonNull(resolver.lazy_output_type()),
         required=True,
         where=graphene.Argument(resolver.where_input_type),
     )
 
 
-def make_relationship_resolver(model):
-    def execute(_, _info, **arguments):
-        session = BaseModel.session_func()
-        resolver = BaseModel.resolver_collection.for_model(model)
-        query = session.query(model)
+def make_relationship_resolver(model, registry: Optional[Registry] = None):
+    registry = registry or default_registry
+
+    def execute(_, info, **arguments):
+        session = registry.get_session()
+        check_deadline(session)
+        resolver = registry.resolver_collection.for_model(model)
+        arguments = optimize_arguments(resolver, arguments)
+        if arguments is None:
+            return []
+        query = apply_raiseload(session, load_subclasses(session.query(model), model), model)
+
+        query = apply_query_condition(query=query, resolver=resolver, arguments=arguments, optimized=True)
+        results = query.all()
+        prefetch(session, info, results)
+        return results
+
+    # lets the single statement engine recognise the root fields it can compile
+    execute.model = model
+    execute.registry = registry
+    return execute
+
+
+def make_group_by_field(model, registry: Optional[Registry] = None):
+    resolver = (registry or default_registry).resolver_collection.for_model(model)
+    return graphene.List(
+        graphene.NonNull(resolver.group_type),
+        required=True,
+        by=graphene.Argument(graphene.NonNull(graphene.List(graphene.NonNull(resolver.group_by_enum)))),
+        where=graphene.Argument(resolver.where_input_type),
+        having=graphene.Argument(resolver.having_input_type),
+    )
+
+
+def make_group_by_resolver(model, registry: Optional[Registry] = None):
+    registry = registry or default_registry
+
+    def execute(_, info, by, where=None, having=None):
+        session = registry.get_session()
+        check_deadline(session)
+        resolver = registry.resolver_collection.for_model(model)
+        return group_by(session, resolver, by, where, having, aggregates=_selected_aggregates(info))
+
+    return execute
+
+
+def make_create_field(model, registry: Optional[Registry] = None):
+    resolver = (registry or default_registry).resolver_collection.for_model(model)
+    return graphene.Field(
+        graphene.NonNull(resolver.mutation_result_type),
+        values=graphene.Argument(graphene.NonNull(graphene.List(graphene.NonNull(resolver.input_type)))),
+    )
+
+
+def make_create_resolver(model, registry: Optional[Registry] = None):
+    registry = registry or default_registry
+
+    def execute(_, info, values):
+        session = registry.get_session()
+        check_deadline(session)
+        resolver = registry.resolver_collection.for_model(model)
+        affected, returning = bulk_insert(session, resolver, values, returning=_selects_field(info, 'returning'))
+        return resolver.mutation_result_type(affected=affected, returning=returning)
+
+    return execute
+
+
+def make_update_field(model, registry: Optional[Registry] = None):
+    resolver = (registry or default_registry).resolver_collection.for_model(model)
+    return graphene.Field(
+        graphene.NonNull(resolver.mutation_result_type),
+        where=graphene.Argument(graphene.NonNull(resolver.where_input_type)),
+        set=graphene.Argument(graphene.NonNull(resolver.set_input_type)),
+    )
+
+
+def make_update_resolver(model, registry: Optional[Registry] = None):
+    registry = registry or default_registry
+
+    def execute(_, info, where, **arguments):
+        session = registry.get_session()
+        check_deadline(session)
+        resolver = registry.resolver_collection.for_model(model)
+        affected, returning = bulk_update(
+            session, resolver, where, arguments['set'], returning=_selects_field(info, 'returning'),
+        )
+        return resolver.mutation_result_type(affected=affected, returning=returning)
+
+    return execute
+
+
+def make_delete_field(model, registry: Optional[Registry] = None):
+    resolver = (registry or default_registry).resolver_collection.for_model(model)
+    return graphene.Field(
+        graphene.NonNull(resolver.mutation_result_type),
+        where=graphene.Argument(graphene.NonNull(resolver.where_input_type)),
+    )
+
+
+def make_delete_resolver(model, registry: Optional[Registry] = None):
+    registry = registry or default_registry
 
-        query = apply_query_condition(query=query, resolver=resolver, arguments=arguments)
-        return query.all()
+    def execute(_, info, where):
+        session = registry.get_session()
+        check_deadline(session)
+        resolver = registry.resolver_collection.for_model(model)
+        affected, returning = bulk_delete(session, resolver, where, returning=_selects_field(info, 'returning'))
+        return resolver.mutation_result_type(affected=affected, returning=returning)
 
     return execute
@@ -0,0 +1,39 @@
+"""
+Inheritance hierarchies (joined and single table).
+
+A model with mapped subclasses is exposed through an interface, implemented by the object types of the model
+and of every subclass, so lists of the base model can select subclass fields with fragments. Subclass columns
+are loaded for a whole list at once with ``selectin_polymorphic``, one statement per subclass, rather than per
+row, and the subclass fields can be filtered through the base model's ``where`` filter.
+"""
+from typing import List
+
+from sqlalchemy import inspect, select, tuple_
+from sqlalchemy.orm import Query, selectin_polymorphic
+
+
+def subclasses(model) -> List:
+    return [mapper.class_ for mapper in inspect(model).self_and_descendants if mapper.class_ is not model]
+
+
+def load_subclasses(query: Query, model) -> Query:
+    """Loads the subclass columns of the polymorphic rows returned by the query, one statement per subclass."""
+    descendants = subclasses(model)
+    if not descendants:
+        return query
+    return query.options(selectin_polymorphic(model, descendants))
+
+
+def subclass_condition(model, subclass, condition):
+    """Selects the rows of ``model`` whose ``subclass`` row matches the condition on the subclass columns."""
+    pk_columns = inspect(model).primary_key
+    subclass_mapper = inspect(subclass)
+    # selected from the subclass' own table, and never correlated, as single table subclasses share the table
+    # of the outer query
+    matching = select(list(subclass_mapper.local_table.primary_key)).where(condition).correlate(None)
+    if subclass_mapper._single_table_criterion is not None:
+        # the rows of a single table subclass are told apart from the others in the table by their discriminator
+        matching = matching.where(subclass_mapper._single_table_criterion)
+    if len(pk_columns) == 1:
+        return pk_columns[0].in_(matching)
+    return tuple_(*pk_columns).in_(matching)
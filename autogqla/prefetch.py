@@ -0,0 +1,118 @@
+"""
+Lookahead prefetching of relationship trees.
+
+Without prefetching, the loader of each nesting level only dispatches once the level above it has been
+resolved. The root resolvers instead walk the selection set up front and load every nested relationship
+level by level, priming the loaders so that the nested resolvers are served from memory.
+
+Pagination fields are not prefetched (their limit applies per batch), and neither is anything below them, nor
+fields excluded by ``@skip`` or ``@include``. Prefetching is also skipped for batched operations, whose loaders are
+already shared across operations, and stops once the deadline of the operation has passed, leaving the nested
+resolvers to report the timeout against their own fields.
+"""
+from contextlib import contextmanager
+from typing import List, Optional, Sequence
+
+from graphql.execution.utils import should_include_node
+from graphql.execution.values import get_argument_values
+from graphql.language.ast import FragmentSpread, InlineFragment
+from graphql.type import get_named_type
+from sqlalchemy.orm import Session
+
+from .deadline import deadline_exceeded
+from .fields.connections.relationship_field import RelationshipField
+
+enabled = True
+
+_DISABLED = 'autogqla_prefetch_disabled'
+
+
+@contextmanager
+def disabled(session: Optional[Session]):
+    if session is None:
+        yield
+        return
+    session.info[_DISABLED] = True
+    try:
+        yield
+    finally:
+        session.info.pop(_DISABLED, None)
+
+
+def _sub_fields(info, field_asts) -> list:
+    fields = []
+
+    def walk(selection_set):
+        for selection in selection_set.selections if selection_set else ():
+            # the directives are evaluated as the executor's collect_fields does
+            if not should_include_node(info, selection.directives):
+                continue
+            if isinstance(selection, FragmentSpread):
+                walk(info.fragments[selection.name.value].selection_set)
+            elif isinstance(selection, InlineFragment):
+                walk(selection.selection_set)
+            else:
+                fields.append(selection)
+
+    for field_ast in field_asts:
+        walk(field_ast.selection_set)
+    return fields
+
+
+def _unique(instances) -> list:
+    return list({id(instance): instance for instance in instances}.values())
+
+
+def prefetch(session: Session, info, instances: Sequence, path: Sequence[str] = ()):
+    """
+    Prefetches the relationships selected below the current root field for the given instances.
+    ``path`` names the fields leading from the root field to the instances, such as ``('edges', 'node')``.
+    """
+    if not enabled or not instances or session.info.get(_DISABLED):
+        return
+
+    object_type = get_named_type(info.return_type)
+    field_asts = info.field_asts
+    for name in path:
+        object_type = get_named_type(object_type.fields[name].type)
+        field_asts = [field_ast for field_ast in _sub_fields(info, field_asts) if field_ast.name.value == name]
+
+    _prefetch(session, info, object_type, field_asts, _unique(instances))
+
+
+def _prefetch(session: Session, info, object_type, field_asts, parents: List):
+    for field_ast in _sub_fields(info, field_asts):
+        if deadline_exceeded(session):
+            return
+        field_def = object_type.fields.get(field_ast.name.value)
+        field = getattr(field_def.resolver, '__self__', None) if field_def else None
+        if not isinstance(field, RelationshipField):
+            continue
+
+        arguments = get_argument_values(field_def.args, field_ast.arguments, info.variable_values)
+        loader = field.loader(arguments)
+        results = {}
+        missing = []
+        for parent in parents:
+            promise = loader.cached(parent)
+            if promise is not None and promise.is_fulfilled:
+                results[id(parent)] = promise.get()
+            else:
+                missing.append(parent)
+        # split like the loader splits its queued keys, each batch applying its temporary table threshold
+        size = loader.max_batch_size or max(len(missing), 1)
+        for start in range(0, len(missing), size):
+            batch = missing[start:start + size]
+            for parent, result in zip(batch, loader.batch_load_fn(batch).get()):
+                loader.prime(parent, result)
+                results[id(parent)] = result
+
+        children = []
+        for result in results.values():
+            if isinstance(result, list):
+                children.extend(result)
+            elif result is not None:
+                children.append(result)
+
+        if children:
+            _prefetch(session, info, get_named_type(field_def.type), [field_ast], _unique(children))
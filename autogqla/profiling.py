@@ -0,0 +1,203 @@
+"""
+Sampled request profiling.
+
+A ``Profiler`` set with ``Schema.set_profiler`` profiles a sample of the executed operations. For each of
+them it records a ``Trace`` with:
+
+* the time spent resolving every field, keyed by its GraphQL path (including the wait for its loader)
+* every loader batch, with the number of parents and the time the first of them waited for the dispatch
+* every SQL statement, so that time spent in SQL can be told apart from time spent in graphene
+
+Traces can be exported as Chrome trace-event JSON (``chrome://tracing``, Perfetto), and the profiler
+aggregates the resolve times of every field into histograms. Operations that are not sampled run without
+middleware or any other profiling overhead.
+"""
+import bisect
+import json
+import random
+import time
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional
+
+from promise import Promise
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_TRACE = 'autogqla_trace'
+
+# upper bounds of the histogram buckets, in milliseconds
+BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+
+class Histogram:
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.mean * 1000,
+            'buckets': OrderedDict((str(bound), count) for bound, count in zip(BUCKETS, self.counts)),
+        }
+
+
+class Trace:
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.events: List[dict] = []
+        self.field_times: Dict[str, List[float]] = {}
+        self.sql_time = 0.0
+        self.current_path: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    @property
+    def graphene_time(self) -> float:
+        return self.duration - self.sql_time
+
+    def add(self, name: str, category: str, start: float, end: float, **args):
+        self.events.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - self.start) * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': 1,
+            'tid': 1,
+            'args': args,
+        })
+
+    def chrome_trace(self) -> dict:
+        return {'traceEvents': self.events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, fp):
+        json.dump(self.chrome_trace(), fp)
+
+
+def get_trace(session: Optional[Session]) -> Optional[Trace]:
+    return session.info.get(_TRACE) if session is not None else None
+
+
+class ProfilingMiddleware:
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+
+    def resolve(self, next_, root, info, **arguments):
+        path = '.'.join(map(str, info.path))
+        field = f'{info.parent_type.name}.{info.field_name}'
+        start = time.perf_counter()
+        previous, self.trace.current_path = self.trace.current_path, path
+        try:
+            result = next_(root, info, **arguments)
+        finally:
+            self.trace.current_path = previous
+
+        def record(value):
+            end = time.perf_counter()
+            self.trace.add(path, 'resolve', start, end, field=field)
+            self.trace.field_times.setdefault(field, []).append(end - start)
+            return value
+
+        def record_error(error):
+            record(None)
+            raise error
+
+        if isinstance(result, Promise):
+            return result.then(record, record_error)
+        return record(result)
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, context, _executemany):
+    if _TRACE in conn.info:
+        context._autogqla_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, _cursor, statement, _parameters, context, _executemany):
+    trace = conn.info.get(_TRACE)
+    start = getattr(context, '_autogqla_start', None)
+    if trace is None or start is None:
+        return
+    end = time.perf_counter()
+    trace.sql_time += end - start
+    trace.add(statement.split('\n', 1)[0][:80], 'sql', start, end, statement=statement, path=trace.current_path)
+
+
+_LISTENERS = (
+    ('before_cursor_execute', _before_cursor_execute),
+    ('after_cursor_execute', _after_cursor_execute),
+)
+
+
+@contextmanager
+def trace_session(session: Session):
+    """Records a trace of the statements executed by the session, and of the fields resolved with its middleware."""
+    trace = Trace()
+    # the statement listeners are only attached to the traced connection, for the time of the trace
+    connection = session.connection()
+    session.info[_TRACE] = connection.info[_TRACE] = trace
+    for name, listener in _LISTENERS:
+        event.listen(connection, name, listener)
+    try:
+        yield trace
+    finally:
+        for name, listener in _LISTENERS:
+            event.remove(connection, name, listener)
+        session.info.pop(_TRACE, None)
+        connection.info.pop(_TRACE, None)
+        trace.end = time.perf_counter()
+        trace.add('execute', 'request', trace.start, trace.end, sql_ms=trace.sql_time * 1000)
+
+
+def with_middleware(execute_kwargs: dict, trace: Optional[Trace]) -> dict:
+    """Returns the execute arguments with the profiling middleware of ``trace`` added."""
+    if trace is None:
+        return execute_kwargs
+    return {**execute_kwargs, 'middleware': [*(execute_kwargs.get('middleware') or ()), ProfilingMiddleware(trace)]}
+
+
+class Profiler:
+
+    def __init__(self, sample_rate: float = 1.0, max_traces: int = 100):
+        self.sample_rate = sample_rate
+        self.traces: Deque[Trace] = deque(maxlen=max_traces)
+        self.histograms: Dict[str, Histogram] = {}
+
+    def sample(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def record(self, trace: Trace):
+        self.traces.append(trace)
+        for field, times in trace.field_times.items():
+            histogram = self.histograms.setdefault(field, Histogram())
+            for seconds in times:
+                histogram.observe(seconds)
+
+    def chrome_trace(self) -> dict:
+        """Returns every kept trace as one Chrome trace, each in its own process row."""
+        events = []
+        for pid, trace in enumerate(self.traces, start=1):
+            offset = (trace.start - self.traces[0].start) * 1e6
+            events.extend({**item, 'pid': pid, 'ts': item['ts'] + offset} for item in trace.events)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def field_histograms(self) -> Dict[str, dict]:
+        return {field: histogram.to_dict() for field, histogram in sorted(self.histograms.items())}
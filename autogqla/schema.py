@@ -1,30 +1,292 @@
-from typing import Union, Optional
+import json
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from typing import Union, Optional, List, Iterator, Sequence
 
 import graphene
+from graphql import parse, GraphQLError
+from graphql.execution import ExecutionResult
+from graphql.execution.values import coerce_value
+from graphql.utils.get_operation_ast import get_operation_ast
+from graphql.utils.introspection_query import introspection_query
+from promise import Promise
 from sqlalchemy.orm import scoped_session, sessionmaker
 
-from autogqla.base import BaseModel
+from autogqla import export, json_engine, prefetch, serializer, strict
+from autogqla.base import Registry, default_registry, using_session
+from autogqla.deadline import set_deadline, clear_deadline
+from autogqla.introspection import IntrospectionCache, IntrospectionResult
+from autogqla.live_query import LiveQuery, LiveQueryManager
+from autogqla.profiling import Profiler, trace_session, with_middleware
+from autogqla.versions import TableVersions, VersionedResult, document_key
 
 SessionFactory = Union[scoped_session, sessionmaker]
 
 
+@lru_cache(maxsize=256)
+def _operation_type(request_string: str, operation_name: Optional[str]) -> Optional[str]:
+    try:
+        operation = get_operation_ast(parse(request_string), operation_name)
+    except GraphQLError:
+        return None
+    return operation.operation if operation else None
+
+
+def _is_mutation(request_string=None, *_args, operation_name=None, **_kwargs) -> bool:
+    if isinstance(request_string, str):
+        return _operation_type(request_string, operation_name) == 'mutation'
+    operation = get_operation_ast(request_string, operation_name) if request_string is not None else None
+    return operation is not None and operation.operation == 'mutation'
+
+
 class Schema(graphene.Schema):
 
     session_factory: Optional[SessionFactory] = None
+    profiler: Optional[Profiler] = None
+    strict_mode: Optional[str] = None
+    compiled_serializer: bool = False
+    versions: Optional[TableVersions] = None
+    _live_query_manager: Optional[LiveQueryManager] = None
+    _introspection_cache: Optional[IntrospectionCache] = None
+
+    def __init__(self, *args, registry: Optional[Registry] = None, **kwargs):
+        """``registry`` is the registry the schema's types were built by, the global one by default."""
+        self.registry: Registry = registry or default_registry
+        super().__init__(*args, **kwargs)
+
+    def build_typemap(self):
+        super().build_typemap()
+        # the object types of an inheritance hierarchy are only reachable through its interface
+        implementations = [
+            implementation
+            for resolver in self.registry.resolver_collection.resolvers.values()
+            if resolver.interface is not None and resolver.interface._meta.name in self._type_map
+            for implementation in [resolver.node, *(subclass.node for subclass in resolver.subclass_resolvers())]
+            if implementation._meta.name not in self._type_map
+        ]
+        if implementations:
+            self.types = [*(self.types or ()), *implementations]
+            self.build_typemap()
 
     def set_session_factory(self, session_factory: SessionFactory):
         self.session_factory = session_factory
 
-    def execute(self, *args, **kwargs):
+    def set_compiled_serializer(self, enabled: bool):
+        """Completes objects whose selections are all plain columns with compiled functions (see ``autogqla.serializer``)."""
+        if enabled:
+            serializer.install()
+        self.compiled_serializer = enabled
+
+    def set_profiler(self, profiler: Optional[Profiler]):
+        self.profiler = profiler
+
+    def set_strict_mode(self, mode: Optional[str]):
+        """Enables N+1 detection (see ``autogqla.strict``) with ``'warn'`` or ``'raise'``, or disables it with ``None``."""
+        if mode not in strict.MODES:
+            raise Exception(f'unknown strict mode {mode!r}')
+        self.strict_mode = mode
+
+    def set_versions(self, versions: Optional[TableVersions]):
+        """Enables ETags and ``if_none_match`` on queries (see ``autogqla.versions``)."""
+        self.versions = versions
+
+    @contextmanager
+    def _trace(self, session):
+        sampled = self.profiler is not None and session is not None and self.profiler.sample()
+        if not sampled and not (self.strict_mode and session):
+            yield None
+            return
+
+        with trace_session(session) as trace, strict.strict_session(session, self.strict_mode):
+            yield trace
+        if sampled:
+            self.profiler.record(trace)
+
+    def _check_statements(self, trace):
+        """Reports the N+1 patterns of strict mode, once the transaction has ended."""
+        if self.strict_mode and trace is not None:
+            strict.check_statements(trace, self.strict_mode)
+
+    def live_query(self, request_string, variables=None, operation_name=None, callback=None) -> LiveQuery:
+        if self._live_query_manager is None:
+            self._live_query_manager = LiveQueryManager(self)
+        return self._live_query_manager.register(request_string, variables, operation_name, callback)
+
+    def introspect(self, request_string: str = introspection_query, variables: Optional[dict] = None,
+                   operation_name: Optional[str] = None) -> Optional[IntrospectionResult]:
+        """
+        Returns the cached result of an introspection only document (the standard introspection query by
+        default), with its serialised JSON body and an ETag, or ``None`` for any other document.
+        """
+        if self._introspection_cache is None:
+            self._introspection_cache = IntrospectionCache()
+        return self._introspection_cache.get(self, request_string, variables, operation_name)
+
+    def _cached_introspection(self, request_string=None, variables=None, variable_values=None,
+                              operation_name=None, context=None, context_value=None, **kwargs):
+        if any(value is not None for value in kwargs.values()) or not isinstance(request_string, str):
+            return None
+        cached = self.introspect(request_string, variable_values or variables, operation_name)
+        return ExecutionResult(data=cached.data) if cached else None
+
+    @contextmanager
+    def _session_scope(self, timeout: Optional[float] = None):
         session = self.session_factory() if self.session_factory else None
-        if session:
-            BaseModel.session_func = lambda: session
+        if session and timeout is not None:
+            set_deadline(session, timeout)
         try:
-            return super().execute(*args, **kwargs)
+            with using_session(session) if session else nullcontext():
+                yield session
         finally:
             if session:
-                BaseModel.session_func = None
+                if timeout is not None:
+                    clear_deadline(session)
                 if isinstance(self.session_factory, scoped_session):
                     session.remove()
                 elif isinstance(self.session_factory, sessionmaker):
                     session.close()
+
+    @staticmethod
+    def _end_transaction(session, results: List[ExecutionResult], mutation: bool):
+        """Commits the session of mutations that completed without errors, and rolls back everything else."""
+        if session:
+            clear_deadline(session)
+            if mutation and not any(result.errors for result in results):
+                session.commit()
+            else:
+                session.rollback()
+
+    def execute(self, *args, timeout: Optional[float] = None, engine: str = 'loader',
+                if_none_match: Optional[str] = None, **kwargs):
+        """
+        Executes an operation. With a ``timeout`` (in seconds), queries that have not started by the
+        deadline are not issued and their fields fail with a timeout error, while running statements
+        are bounded by the database's statement timeout where the dialect supports one.
+
+        With ``engine='json'``, queries are compiled into a single SQL statement that returns the finished
+        response when possible (see ``autogqla.json_engine``), and are otherwise executed by the loaders.
+
+        Introspection only documents are served from a cache (see ``introspect``) without opening a session.
+
+        With versions set, query results are ``VersionedResult`` with an ETag, and a query repeated with
+        ``if_none_match`` equal to its current ETag is answered "not modified" without being executed.
+        """
+        cached = self._cached_introspection(*args, **kwargs)
+        if cached is not None:
+            return cached
+
+        key = self._version_key(*args, **kwargs) if self.versions else None
+        if key and if_none_match is not None and self.versions.current_etag(key) == if_none_match:
+            return VersionedResult(etag=if_none_match, not_modified=True)
+
+        with self._session_scope(timeout) as session:
+            with self._record_versions(session, key) as versioning:
+                with self._trace(session) as trace:
+                    result = None
+                    if engine == 'json' and session:
+                        result = self._execute_json_engine(session, *args, **kwargs)
+                    if result is None:
+                        result = super().execute(*args, **with_middleware(kwargs, trace))
+                self._end_transaction(session, [result], _is_mutation(*args, **kwargs))
+                self._check_statements(trace)
+        if versioning is not None and not result.errors:
+            return VersionedResult.from_result(result, self.versions.record(key, *versioning))
+        return result
+
+    def _version_key(self, request_string=None, variables=None, variable_values=None, operation_name=None,
+                     **_kwargs):
+        if not isinstance(request_string, str):
+            return None
+        key = document_key(request_string, variable_values or variables, operation_name)
+        if key in self.versions.dependencies:
+            return key
+        try:
+            operation = get_operation_ast(parse(request_string), operation_name)
+        except GraphQLError:
+            return None
+        # only queries can be answered without being executed
+        if operation is None or operation.operation != 'query':
+            return None
+        return key
+
+    @contextmanager
+    def _record_versions(self, session, key: Optional[str]):
+        if key is None or session is None:
+            yield None
+            return
+        # the counters follow the engines of the sessions they are first used with
+        self.versions.listen(session.get_bind())
+        versions = self.versions.snapshot()
+        with self.versions.recording() as tables:
+            yield tables, versions
+
+    def _execute_json_engine(self, session, request_string=None, variables=None, variable_values=None,
+                             operation_name=None, context=None, context_value=None, **kwargs):
+        if any(value is not None for value in kwargs.values()) or not isinstance(request_string, str):
+            return None
+        return json_engine.execute(self, session, request_string, variable_values or variables, operation_name)
+
+    def execute_batch(self, operations: List[dict], timeout: Optional[float] = None) -> List[ExecutionResult]:
+        """
+        Executes several operations with one session and one set of loaders. The operations are resolved
+        together, so keys requested by different operations are loaded by the same batch query.
+        Each operation is a dict with a ``query`` and optional ``variables`` and ``operationName``.
+        """
+        def execute_all(trace):
+            return Promise.all([
+                Promise.resolve(super(Schema, self).execute(
+                    operation['query'],
+                    variable_values=operation.get('variables'),
+                    operation_name=operation.get('operationName'),
+                    return_promise=True,
+                    **with_middleware({}, trace),
+                ))
+                for operation in operations
+            ])
+
+        with self._session_scope(timeout) as session:
+            # started from within a single promise job, so that no loader dispatches its batch
+            # before every operation has requested its keys
+            with prefetch.disabled(session), self._trace(session) as trace:
+                results = Promise.resolve(trace).then(execute_all).get()
+            mutation = any(_is_mutation(operation['query'], operation.get('operationName')) for operation in operations)
+            self._end_transaction(session, results, mutation)
+            self._check_statements(trace)
+            return results
+
+    def export(self, model, where: Optional[dict] = None, order_by: Sequence[str] = (),
+               columns: Optional[Sequence[str]] = None, format: str = 'csv', batch_size: int = 1000) -> Iterator[bytes]:
+        """
+        Streams the rows of ``model`` matching ``where`` as CSV, NDJSON or Arrow IPC chunks (see ``autogqla.export``).
+        ``where`` and ``order_by`` take the same values as the generated fields' variables, for example
+        ``{'name': {'startsWith': 'A'}}`` and ``['NAME_ASC']``, and ``columns`` the names of the model's fields.
+        """
+        resolver = self.registry.resolver_collection.for_model(model)
+        if where is not None:
+            coerced = coerce_value(self.get_type(resolver.where_input_type._meta.name), where)
+            if coerced is None:
+                raise Exception(f'invalid {resolver.model_spec.name} filter: {where!r}')
+            where = coerced
+        order_by_enum = resolver.order_by_enum._meta.enum
+        order_by = [order_by_enum[name].value for name in order_by]
+
+        session = self.session_factory()
+        try:
+            yield from export.export(session, resolver, where, order_by, columns, format, batch_size)
+        finally:
+            if isinstance(self.session_factory, scoped_session):
+                self.session_factory.remove()
+            else:
+                session.close()
+
+    def execute_json(self, payload: Union[str, bytes, dict, list]) -> Union[dict, list]:
+        """Executes a GraphQL-over-HTTP request body, which may be a single operation or an array of them."""
+        if isinstance(payload, (str, bytes)):
+            payload = json.loads(payload)
+        if isinstance(payload, dict):
+            cached = self.introspect(payload['query'], payload.get('variables'), payload.get('operationName'))
+            if cached is not None:
+                return {'data': cached.data}
+        operations = payload if isinstance(payload, list) else [payload]
+        responses = [result.to_dict() for result in self.execute_batch(operations)]
+        return responses if isinstance(payload, list) else responses[0]
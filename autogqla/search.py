@@ -0,0 +1,169 @@
+from typing import Dict, List
+
+from sqlalchemy import event, inspect, literal_column, select, table, column, func, and_, false
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import Boolean, Float
+
+SEARCH_CONFIG = 'english'
+
+
+def search_table_name(model) -> str:
+    return f'{inspect(model).local_table.name}_search'
+
+
+def _primary_key(model):
+    pk_columns = inspect(model).primary_key
+    if len(pk_columns) != 1:
+        raise Exception(f'full-text search on {model.__name__} requires a single column primary key.')
+    return pk_columns[0]
+
+
+def _tokens(term: str) -> List[str]:
+    return ['"{}"'.format(token.replace('"', '""')) for token in (term or '').split()]
+
+
+def _fts_query(terms: Dict[str, str]) -> str:
+    return ' AND '.join(f'{name} : ({" ".join(_tokens(term))})' for name, term in terms.items())
+
+
+class SearchMatch(ColumnElement):
+    """Full-text match of a column against a search term, compiled per dialect."""
+
+    type = Boolean()
+
+    def __init__(self, attribute, term: str):
+        self.attribute = attribute
+        self.term = term
+
+
+class SearchRank(ColumnElement):
+    """Relevance of a row for a set of search terms, where smaller values are more relevant."""
+
+    type = Float()
+
+    def __init__(self, model, terms: Dict[str, str]):
+        self.model = model
+        self.terms = terms
+
+
+@compiles(SearchMatch)
+def _compile_match(element: SearchMatch, compiler, **kw):
+    tokens = (element.term or '').split()
+    if not tokens:
+        return compiler.process(false(), **kw)
+    return compiler.process(and_(*[element.attribute.contains(token) for token in tokens]), **kw)
+
+
+@compiles(SearchMatch, 'sqlite')
+def _compile_match_sqlite(element: SearchMatch, compiler, **kw):
+    if not _tokens(element.term):
+        return compiler.process(false(), **kw)
+    model = element.attribute.class_
+    fts = table(search_table_name(model), column('rowid'))
+    fts_query = _fts_query({element.attribute.key: element.term})
+    matches = select([fts.c.rowid]).where(literal_column(fts.name).op('MATCH')(fts_query))
+    return compiler.process(_primary_key(model).in_(matches), **kw)
+
+
+@compiles(SearchMatch, 'postgresql')
+def _compile_match_postgresql(element: SearchMatch, compiler, **kw):
+    vector = func.to_tsvector(SEARCH_CONFIG, element.attribute)
+    query = func.plainto_tsquery(SEARCH_CONFIG, element.term)
+    return compiler.process(vector.op('@@')(query), **kw)
+
+
+@compiles(SearchRank)
+def _compile_rank(element: SearchRank, compiler, **kw):
+    return '0'
+
+
+@compiles(SearchRank, 'sqlite')
+def _compile_rank_sqlite(element: SearchRank, compiler, **kw):
+    fts = table(search_table_name(element.model), column('rowid'), column('rank'))
+    fts_query = _fts_query(element.terms)
+    rank = select([fts.c.rank]).where(
+        literal_column(fts.name).op('MATCH')(fts_query) & (fts.c.rowid == _primary_key(element.model))
+    )
+    return compiler.process(rank.as_scalar(), **kw)
+
+
+@compiles(SearchRank, 'postgresql')
+def _compile_rank_postgresql(element: SearchRank, compiler, **kw):
+    ranks = [
+        func.ts_rank(
+            func.to_tsvector(SEARCH_CONFIG, getattr(element.model, key)),
+            func.plainto_tsquery(SEARCH_CONFIG, term),
+        )
+        for key, term in element.terms.items()
+    ]
+    # negated so that, as with the sqlite rank, ascending order returns the most relevant rows first
+    return compiler.process(-sum(ranks[1:], ranks[0]), **kw)
+
+
+# the index listening to each model's table, of which there is one even when several registries build the model
+_listening: Dict[type, 'SearchIndex'] = {}
+
+
+class SearchIndex:
+    """
+    Creates the full-text index of a model's searchable columns. On SQLite, triggers on the model's table keep the
+    index in sync with every write, including the Core statements of the bulk mutations.
+    """
+
+    def __init__(self, model, keys: List[str]):
+        self.model = model
+        self.keys = keys
+        self.table_name = search_table_name(model)
+        self.column_names = [getattr(model, key).property.columns[0].name for key in keys]
+        self.fts = table(self.table_name, column('rowid'), *[column(key) for key in keys])
+
+    def listen(self):
+        previous = _listening.get(self.model)
+        if previous is not None:
+            previous.remove()
+        event.listen(inspect(self.model).local_table, 'after_create', self._after_create)
+        _listening[self.model] = self
+
+    def remove(self):
+        event.remove(inspect(self.model).local_table, 'after_create', self._after_create)
+        if _listening.get(self.model) is self:
+            del _listening[self.model]
+
+    def _triggers(self) -> List[str]:
+        model_table = inspect(self.model).local_table.name
+        key = _primary_key(self.model).name
+        keys = ', '.join(self.keys)
+        new_values = ', '.join(f'new.{name}' for name in self.column_names)
+        assignments = ', '.join(f'{key_name} = new.{name}' for key_name, name in zip(self.keys, self.column_names))
+        return [
+            f'CREATE TRIGGER IF NOT EXISTS {self.table_name}_insert AFTER INSERT ON {model_table} BEGIN '
+            f'INSERT INTO {self.table_name} (rowid, {keys}) VALUES (new.{key}, {new_values}); END',
+            f'CREATE TRIGGER IF NOT EXISTS {self.table_name}_update AFTER UPDATE ON {model_table} BEGIN '
+            f'UPDATE {self.table_name} SET rowid = new.{key}, {assignments} WHERE rowid = old.{key}; END',
+            f'CREATE TRIGGER IF NOT EXISTS {self.table_name}_delete AFTER DELETE ON {model_table} BEGIN '
+            f'DELETE FROM {self.table_name} WHERE rowid = old.{key}; END',
+        ]
+
+    def create(self, connection):
+        model_table = inspect(self.model).local_table
+        if connection.dialect.name == 'sqlite':
+            connection.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table_name} USING fts5({", ".join(self.keys)})'
+            )
+            connection.execute(f'DELETE FROM {self.table_name}')
+            connection.execute(self.fts.insert().from_select(
+                ['rowid', *self.keys],
+                select([_primary_key(self.model), *[model_table.c[name] for name in self.column_names]]),
+            ))
+            for trigger in self._triggers():
+                connection.execute(trigger)
+        elif connection.dialect.name == 'postgresql':
+            for name in self.column_names:
+                connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS ix_{model_table.name}_{name}_search ON {model_table.name} '
+                    f"USING gin (to_tsvector('{SEARCH_CONFIG}', {name}))"
+                )
+
+    def _after_create(self, target, connection, **kw):
+        self.create(connection)
@@ -0,0 +1,123 @@
+"""
+Fast path for completing objects whose selections are all plain columns.
+
+graphql-core resolves and completes every scalar of every row through its generic field
+machinery. For schemas that opt in with ``Schema.set_compiled_serializer(True)``, when every
+selection of an autogqla object is backed by a ``SimpleField`` or an ``IdentifierField`` (and no
+middleware is installed), the object is instead completed by a row-to-dict function built once
+per (type, selection) pair. The functions of the most recently used selections are kept, at
+most ``max_compiled`` of them.
+
+graphql-core has no per-schema hook for completing objects, so opting in replaces its
+``complete_object_value`` with one that defers to the original for every other schema.
+"""
+import threading
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Callable, Optional
+
+from graphql.execution import executor
+from graphql.type import GraphQLNonNull
+from graphql_relay import to_global_id
+
+from .base import BaseModel
+from .fields.identifier_field import IdentifierField
+from .fields.simple_field import SimpleField
+from .global_ids import primary_key_columns
+
+max_compiled = 512
+
+_FALLBACK = object()
+_compiled: 'OrderedDict[tuple, Optional[Callable]]' = OrderedDict()
+_lock = threading.Lock()
+_complete_object_value = executor.complete_object_value
+
+
+def _typename(type_name: str):
+    return lambda _row: type_name
+
+
+def _identifier(field: IdentifierField):
+    getter = attrgetter(field.spec.key)
+    type_name = field.resolver.model_spec.name
+
+    def value(row):
+        key = getter(row)
+        return None if key is None else to_global_id(type_name, str(key))
+
+    return value
+
+
+def _compile(return_type, subfield_asts) -> Optional[Callable]:
+    fields = []
+    for response_name, field_asts in subfield_asts.items():
+        field_ast = field_asts[0]
+        name = field_ast.name.value
+        if name == '__typename':
+            fields.append((response_name, _typename(return_type.name), None, False))
+            continue
+
+        field_def = return_type.fields.get(name)
+        field = getattr(field_def.resolver, '__self__', None) if field_def else None
+        if field_ast.arguments or type(field) not in (SimpleField, IdentifierField):
+            return None
+        if isinstance(field, IdentifierField) and len(primary_key_columns(field.resolver.sqla_model)) > 1:
+            return None
+
+        field_type = field_def.type
+        required = isinstance(field_type, GraphQLNonNull)
+        getter = _identifier(field) if isinstance(field, IdentifierField) else attrgetter(field.spec.key)
+        fields.append((response_name, getter, (field_type.of_type if required else field_type).serialize, required))
+
+    def serialize(row):
+        completed = OrderedDict()
+        for response_name, getter, serialize_value, required in fields:
+            value = getter(row)
+            if serialize_value is not None and value is not None:
+                value = serialize_value(value)
+                if value is None:
+                    return _FALLBACK
+            elif value is None and required:
+                return _FALLBACK
+            completed[response_name] = value
+        # rows that would raise an error take the regular path, so that errors are reported identically
+        return completed
+
+    return serialize
+
+
+def compiled_serializer(return_type, subfield_asts) -> Optional[Callable]:
+    key = return_type, tuple((name, field_asts[0].name.value) for name, field_asts in subfield_asts.items())
+    with _lock:
+        if key in _compiled:
+            _compiled.move_to_end(key)
+            return _compiled[key]
+    serialize = _compile(return_type, subfield_asts)
+    with _lock:
+        _compiled[key] = serialize
+        while len(_compiled) > max_compiled:
+            _compiled.popitem(last=False)
+    return serialize
+
+
+def complete_object_value(exe_context, return_type, field_asts, info, path, result):
+    graphene_type = getattr(return_type, 'graphene_type', None)
+    if (
+            getattr(exe_context.schema, 'compiled_serializer', False)
+            and not exe_context.middleware
+            and not return_type.is_type_of
+            and isinstance(graphene_type, type)
+            and issubclass(graphene_type, BaseModel)
+    ):
+        serialize = compiled_serializer(return_type, exe_context.get_sub_fields(return_type, field_asts))
+        if serialize is not None:
+            completed = serialize(result)
+            if completed is not _FALLBACK:
+                return completed
+
+    return _complete_object_value(exe_context, return_type, field_asts, info, path, result)
+
+
+def install():
+    """Routes the completion of objects through ``complete_object_value``, for the schemas that opt in."""
+    executor.complete_object_value = complete_object_value
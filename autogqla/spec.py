@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Dict, Optional, List, TypeVar, Generic, Union
 
 from sqlalchemy import Column
-from sqlalchemy.orm import RelationshipProperty, ColumnProperty
+from sqlalchemy.orm import RelationshipProperty, ColumnProperty, Mapper
 
 T = TypeVar('T')
 
@@ -61,7 +61,19 @@ class AttributeSpec(Generic[T]):
         return self.source_model.__name__
 
 
-class FieldSpec(AttributeSpec[ColumnProperty]):
+class HybridAttribute:
+    """Stands in for the ``ColumnProperty`` of a hybrid property, which the mapper has no property for."""
+
+    def __init__(self, key: str, parent: Mapper):
+        self.key = key
+        self.parent = parent
+
+    @property
+    def expression(self):
+        return getattr(self.parent.entity, self.key).expression
+
+
+class FieldSpec(AttributeSpec[Union[ColumnProperty, HybridAttribute]]):
 
     def __init__(
             self,
@@ -73,11 +85,29 @@ class FieldSpec(AttributeSpec[ColumnProperty]):
         self.field_type = field_type
 
     def is_primary_key(self):
-        return self.column.primary_key
+        return not self.is_expression and self.column.primary_key
+
+    @property
+    def column(self) -> Optional[Column]:
+        if isinstance(self.attribute, ColumnProperty):
+            return self.attribute.columns[0]
+
+    @property
+    def expression(self):
+        return self.attribute.expression
+
+    @property
+    def is_expression(self) -> bool:
+        """Whether the field is a SQL expression (a hybrid property or ``column_property``) rather than a column."""
+        return not isinstance(self.column, Column)
+
+    @property
+    def description(self) -> Optional[str]:
+        return None if self.is_expression else self.column.comment
 
     @property
-    def column(self) -> Column:
-        return self.attribute.columns[0]
+    def nullable(self) -> bool:
+        return self.is_expression or self.column.nullable
 
 
 class RelationshipSpec(AttributeSpec[RelationshipProperty]):
@@ -127,11 +157,18 @@ class FieldsSpec(AttributeCollectionSpec[FieldSpec]):
     def __init__(
             self,
             order_by: Optional[Union[OrderBySpec, List[str]]] = None,
+            search: Optional[Union[SearchSpec, List[str]]] = None,
+            group_by: Optional[Union[GroupBySpec, List[str]]] = None,
+            json_paths: Optional[Dict[str, Dict[str, type]]] = None,
             *args,
             **kwargs
     ):
         super().__init__(*args, **kwargs)
         self.order_by: OrderBySpec = OrderBySpec.create(order_by)
+        self.search: SearchSpec = SearchSpec.create(search)
+        self.group_by: GroupBySpec = GroupBySpec.create(group_by)
+        # the paths of JSON fields to order by, and the types their values are compared as, by field name
+        self.json_paths: Dict[str, Dict[str, type]] = json_paths or {}
 
 
 class RelationshipsSpec(AttributeCollectionSpec[RelationshipSpec]):
@@ -180,6 +217,26 @@ class WhereSpec(IncludeExclude):
     pass
 
 
+class GroupBySpec(IncludeExclude):
+    pass
+
+
+class SearchSpec(IncludeExclude):
+
+    def __init__(
+            self,
+            include: List[str] = None,
+            exclude: List[str] = None,
+            order_by_relevance: bool = False,
+    ):
+        super().__init__(include=include, exclude=exclude)
+        self.order_by_relevance = order_by_relevance
+
+    def should_include(self, name) -> bool:
+        # full-text search is opt-in, as every searchable field is backed by an index
+        return bool(name in self.include)
+
+
 class FilterableSpec(IncludeExclude):
     pass
 
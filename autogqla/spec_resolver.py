@@ -1,15 +1,18 @@
 from __future__ import annotations
 import enum
 from dataclasses import dataclass, field
-from typing import Dict, Tuple, Any
+from typing import Dict, Tuple, Any, Optional, List
 
 import graphene
 import sqlalchemy
 from sqlalchemy import inspect
+from sqlalchemy.ext.hybrid import HYBRID_PROPERTY
 from sqlalchemy.orm import Mapper, ColumnProperty, RelationshipProperty
 
-from . import condition_constructor
-from .spec import ModelSpec, FieldSpec, RelationshipSpec
+from . import condition_constructor, polymorphic, tree
+from .json_paths import parse_path, typed_path
+from .search import SearchIndex
+from .spec import ModelSpec, FieldSpec, RelationshipSpec, HybridAttribute
 
 
 @dataclass(frozen=True, order=True)
@@ -18,6 +21,37 @@ class OrderByProperty:
     direction: str
     model: Any
     joins: Tuple = field(default_factory=tuple)
+    # the path ordered by within a JSON field, and the type its values are compared as
+    path: Tuple = field(default_factory=tuple)
+    path_type: Optional[type] = None
+
+    @property
+    def attribute(self):
+        attribute = getattr(self.model, self.key)
+        return typed_path(attribute, self.path, self.path_type) if self.path else attribute
+
+    @property
+    def label(self) -> str:
+        """The name the ordered value is selected as, which the cursors of paginated fields are made from."""
+        label = f'_O_{abs(id(self.model.__name__))}_{abs(id(self.key))}'
+        return f'{label}_{"_".join(str(part) for part in self.path)}' if self.path else label
+
+
+@dataclass(frozen=True)
+class GroupByProperty:
+    key: str
+    model: Any
+    joins: Tuple = field(default_factory=tuple)
+    bucket: Optional[str] = None
+
+
+# truncations offered for grouping date and datetime fields
+DATE_BUCKETS = ('year', 'month', 'day')
+
+# how many many-to-one relationships can be followed to a grouping field
+GROUP_BY_DEPTH = 2
+
+AGGREGATES = ('sum', 'avg', 'min', 'max')
 
 
 class ResolverCollection:
@@ -64,15 +98,30 @@ class ModelSpecResolver:
 
     def __init__(self, model_spec, node, collection: ResolverCollection):
         self.node = node
+        # the interface of the model's inheritance hierarchy, when it has subclasses
+        self.interface = None
         self.model_spec: ModelSpec = model_spec
         self.model_spec.name = self.model_spec.name or self.node.__name__
         self._resolved_attributes = False
         self._resolved_types = False
         self.field_specs_dict: Dict[str, FieldSpec] = {}
+        # fields of the subclasses, which can be filtered on through this model
+        self.subclass_field_specs_dict: Dict[str, List[FieldSpec]] = {}
         self.relationship_specs_dict: Dict[str, RelationshipSpec] = {}
+        # the self-referential relationship the descendants and ancestors fields follow, if any
+        self.hierarchy: Optional[tree.Hierarchy] = None
+        self.hierarchy_spec: Optional[RelationshipSpec] = None
+        self.tree_node_type = None
         self.where_input_type = None
         self.order_by_enum = None
+        self.group_by_enum = None
+        self.group_type = None
+        self.having_input_type = None
         self.connection_type = None
+        self.input_type = None
+        self.set_input_type = None
+        self.mutation_result_type = None
+        self.search_index: Optional[SearchIndex] = None
         self.collection: ResolverCollection = collection
 
     @property
@@ -83,11 +132,25 @@ class ModelSpecResolver:
     def model_mapper(self) -> Mapper:
         return inspect(self.sqla_model).mapper
 
+    @property
+    def output_type(self):
+        return self.interface or self.node
+
+    def lazy_output_type(self):
+        return lambda: self.output_type
+
+    def subclass_resolvers(self) -> List[ModelSpecResolver]:
+        return [
+            self.collection.for_model(subclass)
+            for subclass in polymorphic.subclasses(self.sqla_model)
+            if self.collection.has_spec_for_model(subclass)
+        ]
+
     def make_fields(self):
         return [
             field.field_type(**{
-                'description': field.column.comment,
-                'required': not field.column.nullable,
+                'description': field.description,
+                'required': not field.nullable,
                 **field.props
             })
             for field in self.field_specs_dict.values()
@@ -96,23 +159,73 @@ class ModelSpecResolver:
     def _build_fields(self):
         column: ColumnProperty
         for column in self.model_mapper.column_attrs:
-            name = column.key
             is_pk = column.columns[0].primary_key
-            if not is_pk and not self.model_spec.fields.should_include(name):
-                continue
-
-            spec = self.model_spec.fields.specs.get(name) or FieldSpec()
-            spec.attribute = column
-            if is_pk:
-                spec.name = 'internal_id'
-            elif not spec.name:
-                spec.name = name
-
-            if not spec.field_type:
-                sqla_type = type(column.columns[0].type)
-                spec.field_type = self.FIELD_MAPPING[sqla_type]
+            if is_pk or self.model_spec.fields.should_include(column.key):
+                self._add_field(column, is_pk)
+
+        # hybrid properties are exposed like columns, through their SQL expression
+        for name, descriptor in self.model_mapper.all_orm_descriptors.items():
+            if descriptor.extension_type is HYBRID_PROPERTY and self.model_spec.fields.should_include(name):
+                self._add_field(HybridAttribute(name, self.model_mapper))
+
+    def _add_field(self, attribute, is_pk: bool = False):
+        name = attribute.key
+        spec = self.model_spec.fields.specs.get(name) or FieldSpec()
+        spec.attribute = attribute
+        if is_pk:
+            spec.name = 'internal_id'
+        elif not spec.name:
+            spec.name = name
+
+        if not spec.field_type:
+            if not spec.is_expression:
+                spec.field_type = self.FIELD_MAPPING[type(spec.column.type)]
+            else:
+                spec.field_type = self._expression_field_type(spec)
+                if not spec.field_type:
+                    # expressions without a SQL form or a known type need an explicit field_type
+                    return
+
+        self.field_specs_dict[spec.name] = spec
+
+    def _expression_field_type(self, spec: FieldSpec):
+        try:
+            expression = spec.expression
+        except Exception:
+            return None
+        return self.FIELD_MAPPING.get(type(getattr(expression, 'type', None)))
+
+    def _build_subclass_fields(self):
+        columns = set()
+        for resolver in self.subclass_resolvers():
+            for name, field_spec in resolver.field_specs_dict.items():
+                if name in self.field_specs_dict or not resolver.model_spec.fields.where.should_include(name):
+                    continue
+                # inherited by the subclass' own subclasses
+                if field_spec.column is not None and field_spec.column in columns:
+                    continue
+                columns.add(field_spec.column)
+                self.subclass_field_specs_dict.setdefault(name, []).append(field_spec)
 
-            self.field_specs_dict[spec.name] = spec
+    def _build_search_index(self):
+        keys = []
+        for field_spec in self.field_specs_dict.values():
+            if self.model_spec.fields.search.should_include(field_spec.name):
+                if field_spec.field_type is not graphene.String:
+                    raise Exception(
+                        f'full-text search on {self.sqla_model.__name__}.{field_spec.name} requires a string field.'
+                    )
+                keys.append(field_spec.key)
+        if keys:
+            self.search_index = SearchIndex(self.sqla_model, keys)
+            self.search_index.listen()
+
+    def search_terms(self, where: Optional[dict]) -> Dict[str, str]:
+        return {
+            self.field_specs_dict[name].key: condition['search']
+            for name, condition in (where or {}).items()
+            if name in self.field_specs_dict and (condition or {}).get('search')
+        }
 
     def _build_relationships(self):
         relationship: RelationshipProperty
@@ -131,6 +244,10 @@ class ModelSpecResolver:
 
             self.relationship_specs_dict[relationship_spec.name] = relationship_spec
 
+            if self.hierarchy is None:
+                self.hierarchy = tree.hierarchy(relationship)
+                self.hierarchy_spec = relationship_spec if self.hierarchy else None
+
     def lazy_where_input_type(self):
         return lambda: self.where_input_type
 
@@ -143,7 +260,7 @@ class ModelSpecResolver:
         attributes = {
             'and_': graphene.List(lambda: self.where_input_type, name='and'),
             'or_': graphene.List(lambda: self.where_input_type, name='or'),
-            'id': condition_constructor.StringFilter(),
+            'id': condition_constructor.IDFilter(),
         }
 
         for relationship in self.relationship_specs_dict.values():
@@ -155,7 +272,16 @@ class ModelSpecResolver:
 
         for field in self.field_specs_dict.values():
             if self.model_spec.fields.where.should_include(field.name):
-                attributes[field.name] = graphene.Field(condition_constructor.FILTER_MAPPING[field.field_type])
+                if self.model_spec.fields.search.should_include(field.name):
+                    filter_type = condition_constructor.SearchableStringFilter
+                else:
+                    filter_type = condition_constructor.FILTER_MAPPING[field.field_type]
+                attributes[field.name] = graphene.Field(filter_type)
+
+        for field_name, field_specs in self.subclass_field_specs_dict.items():
+            if field_name not in attributes:
+                filter_type = condition_constructor.FILTER_MAPPING[field_specs[0].field_type]
+                attributes[field_name] = graphene.Field(filter_type)
 
         self.where_input_type = type(name, (graphene.InputObjectType,), attributes)
 
@@ -175,6 +301,16 @@ class ModelSpecResolver:
                     direction='DESC',
                     model=self.sqla_model,
                 )
+                for path, path_type in self.model_spec.fields.json_paths.get(field_spec.name, {}).items():
+                    name = f'{field_spec.name.upper()}__{path.replace(".", "_").upper()}'
+                    for direction in ('ASC', 'DESC'):
+                        enum_items[f'{name}_{direction}'] = OrderByProperty(
+                            key=field_spec.attribute.key,
+                            direction=direction,
+                            model=self.sqla_model,
+                            path=parse_path(path),
+                            path_type=path_type,
+                        )
 
         for relationship in self.relationship_specs_dict.values():
             resolver = self.collection.for_relationship(relationship.attribute)
@@ -197,12 +333,70 @@ class ModelSpecResolver:
             enum.Enum(self._make_name('OrderEnum'), enum_items)
         )
 
+    def _group_by_items(self, joins: Tuple = (), prefix: str = '') -> Dict[str, GroupByProperty]:
+        items = {}
+        for field_spec in self.field_specs_dict.values():
+            if not self.model_spec.fields.group_by.should_include(field_spec.name):
+                continue
+            name = f'{prefix}{field_spec.name.upper()}'
+            items[name] = GroupByProperty(key=field_spec.key, model=self.sqla_model, joins=joins)
+            if field_spec.field_type in (graphene.DateTime, graphene.Date):
+                for bucket in DATE_BUCKETS:
+                    items[f'{name}_BY_{bucket.upper()}'] = GroupByProperty(
+                        key=field_spec.key,
+                        model=self.sqla_model,
+                        joins=joins,
+                        bucket=bucket,
+                    )
+
+        if len(joins) < GROUP_BY_DEPTH:
+            visited = {self.sqla_model, *(join.parent.entity for join in joins)}
+            for relationship in self.relationship_specs_dict.values():
+                # grouping across one-to-many relationships would count a row once per related row
+                if relationship.attribute.uselist or relationship.target_model in visited:
+                    continue
+                resolver = self.collection.for_relationship(relationship.attribute)
+                items.update(resolver._group_by_items(
+                    joins + (relationship.attribute,),
+                    f'{prefix}{relationship.name.upper()}__',
+                ))
+        return items
+
+    def _build_group_by_types(self):
+        if self.group_by_enum:
+            return
+
+        self.group_by_enum = graphene.Enum.from_enum(
+            enum.Enum(self._make_name('GroupByEnum'), self._group_by_items())
+        )
+        self.having_input_type = type(self._make_name('Having'), (graphene.InputObjectType,), {
+            'count': graphene.Field(condition_constructor.IntFilter),
+        })
+
+        attributes = {
+            'key': graphene.List(graphene.String, required=True),
+            'count': graphene.Int(required=True),
+        }
+        numeric_fields = {
+            field_spec.name.upper(): field_spec.name
+            for field_spec in self.field_specs_dict.values()
+            if field_spec.field_type in (graphene.Int, graphene.Float) and not field_spec.is_primary_key()
+        }
+        if numeric_fields:
+            aggregate_enum = graphene.Enum(self._make_name('AggregateField'), list(numeric_fields.items()))
+            for aggregate in AGGREGATES:
+                attributes[aggregate] = graphene.Float(field=graphene.Argument(graphene.NonNull(aggregate_enum)))
+                attributes[f'resolve_{aggregate}'] = (
+                    lambda root, _info, field, aggregate=aggregate: root['aggregates'].get((aggregate, field))
+                )
+        self.group_type = type(self._make_name('Group'), (graphene.ObjectType,), attributes)
+
     def _build_connection_type(self):
         if self.connection_type:
             return
 
         class Meta:
-            node = graphene.NonNull(self.node)
+            node = graphene.NonNull(self.lazy_output_type())
 
         cls = type(
             self._make_name('Connection'),
@@ -212,17 +406,68 @@ class ModelSpecResolver:
 
         self.connection_type = graphene.NonNull(cls)
 
+    def _build_tree_node_type(self):
+        if self.tree_node_type or not self.hierarchy:
+            return
+
+        primary_key_type = next(
+            field_spec.field_type for field_spec in self.field_specs_dict.values() if field_spec.is_primary_key()
+        )
+        self.tree_node_type = type(self._make_name('TreeNode'), (graphene.ObjectType,), {
+            'node': graphene.Field(graphene.NonNull(self.lazy_output_type())),
+            'depth': graphene.Int(required=True),
+            'path': graphene.List(graphene.NonNull(primary_key_type), required=True),
+        })
+
+    def _build_input_types(self):
+        if self.input_type:
+            return
+
+        input_attributes = {}
+        set_attributes = {}
+        for field_spec in self.field_specs_dict.values():
+            if field_spec.is_expression:
+                continue
+            column = field_spec.column
+            required = not (
+                column.nullable
+                or column.primary_key
+                or column.default is not None
+                or column.server_default is not None
+            )
+            input_attributes[field_spec.name] = field_spec.field_type(required=required)
+            if not column.primary_key:
+                set_attributes[field_spec.name] = field_spec.field_type()
+
+        self.input_type = type(self._make_name('Input'), (graphene.InputObjectType,), input_attributes)
+        self.set_input_type = type(self._make_name('SetInput'), (graphene.InputObjectType,), set_attributes)
+
+    def _build_mutation_result_type(self):
+        if self.mutation_result_type:
+            return
+
+        self.mutation_result_type = type(self._make_name('MutationResult'), (graphene.ObjectType,), {
+            'affected': graphene.Int(required=True),
+            'returning': graphene.List(graphene.NonNull(self.lazy_output_type()), required=True),
+        })
+
     def resolve_attributes(self):
         if not self._resolved_attributes:
             self._build_fields()
+            self._build_search_index()
             self._build_relationships()
         self._resolved_attributes = True
 
     def resolve_types(self):
         if not self._resolved_types:
+            self._build_subclass_fields()
             self._build_where_input_type()
             self._build_order_by_enum()
+            self._build_group_by_types()
             self._build_connection_type()
+            self._build_tree_node_type()
+            self._build_input_types()
+            self._build_mutation_result_type()
         self._resolved_types = True
 
     def _make_name(self, suffix):
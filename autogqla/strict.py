@@ -0,0 +1,78 @@
+"""
+Strict mode, which detects N+1 query patterns.
+
+Relationships accessed directly by custom resolvers or ``query_<name>`` hooks are lazy loaded, one
+statement per row. In strict mode (``Schema.set_strict_mode('warn' | 'raise')``):
+
+* everything autogqla loads has ``raiseload('*', sql_only=True)`` applied (in ``'raise'`` mode), so a
+  lazy load that would issue SQL fails instead
+* the statements executed while resolving each field are counted per GraphQL path, with list indexes
+  collapsed, and a field that executes statements for more than one row of a list is reported with an
+  ``NPlusOneWarning`` or an exception
+"""
+import re
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session, Query, Load
+
+from .profiling import Trace
+
+_STRICT = 'autogqla_strict'
+MODES = (None, 'warn', 'raise')
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+def raises_on_lazy_load(session: Optional[Session]) -> bool:
+    return session is not None and session.info.get(_STRICT) == 'raise'
+
+
+@contextmanager
+def strict_session(session: Session, mode: Optional[str]):
+    if mode is None:
+        yield
+        return
+    session.info[_STRICT] = mode
+    try:
+        yield
+    finally:
+        session.info.pop(_STRICT, None)
+
+
+def apply_raiseload(session: Session, query: Query, entity) -> Query:
+    """Makes lazy loads of the entity's relationships raise rather than issue SQL, in strict mode."""
+    if raises_on_lazy_load(session):
+        return query.options(Load(entity).raiseload('*', sql_only=True))
+    return query
+
+
+def statements_per_path(trace: Trace) -> Dict[str, Counter]:
+    """
+    Counts the statements executed while resolving each field. Paths are keyed with their list indexes
+    replaced by ``*``, and map to the number of statements executed for each of their rows.
+    """
+    counts = {}
+    for item in trace.events:
+        path = item['args'].get('path') if item['cat'] == 'sql' else None
+        if path:
+            counts.setdefault(re.sub(r'(?<=\.)\d+(?=\.|$)', '*', path), Counter())[path] += 1
+    return counts
+
+
+def check_statements(trace: Trace, mode: str):
+    # statements executed for more than one row of a list grow with the number of rows
+    repeated = {path: rows for path, rows in statements_per_path(trace).items() if len(rows) > 1}
+    if not repeated:
+        return
+
+    message = 'statements executed per row (N+1): ' + ', '.join(
+        f'{path} ({sum(rows.values())} statements for {len(rows)} rows)' for path, rows in sorted(repeated.items())
+    )
+    if mode == 'raise':
+        raise Exception(message)
+    warnings.warn(message, NPlusOneWarning, stacklevel=4)
@@ -0,0 +1,51 @@
+"""
+Test helpers. Import the fixture into a ``conftest.py`` to fail tests whose queries issue more statements
+than expected::
+
+    from autogqla.testing import max_statements  # noqa: F401
+
+    def test_countries(schema, max_statements):
+        with max_statements(2):
+            schema.execute('{ countries { name states { name } } }')
+"""
+from contextlib import contextmanager
+from typing import List
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class StatementCounter:
+    """Records the statements executed by any engine while active."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, _conn, _cursor, statement, *_):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(Engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *_):
+        event.remove(Engine, 'before_cursor_execute', self._record)
+
+
+@pytest.fixture
+def max_statements():
+    @contextmanager
+    def check(limit: int):
+        with StatementCounter() as counter:
+            yield counter
+        assert counter.count <= limit, '\n\n'.join([
+            f'{counter.count} statements executed, expected at most {limit}:',
+            *counter.statements,
+        ])
+
+    return check
@@ -0,0 +1,101 @@
+"""
+Recursive fields for self-referential relationships.
+
+A model with a self-referential relationship, such as a category tree or an org chart, gets ``descendants`` and
+``ancestors`` fields. Each loads every row reachable from a batch of starting rows with a single recursive CTE,
+rather than one batch per level through nested relationship fields, along with the row's depth (1 for the children,
+or the parent) and path (the primary keys of the rows from the first step up to and including the row).
+"""
+import operator
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import unquote
+
+from sqlalchemy import Column, Text, cast, func, literal, select
+from sqlalchemy.orm import Query, RelationshipProperty, Session
+from sqlalchemy.orm.interfaces import MANYTOONE, ONETOMANY
+from sqlalchemy.sql.elements import BinaryExpression
+
+# how deep the fields follow the hierarchy when no maxDepth is given, which also bounds cyclic data
+MAX_DEPTH = 100
+
+
+@dataclass(frozen=True)
+class Hierarchy:
+    # the column referenced by the children, usually the primary key, and the referencing column
+    parent_column: Column
+    child_column: Column
+    primary_key: Column
+
+
+def hierarchy(relationship: RelationshipProperty) -> Optional[Hierarchy]:
+    """Returns the hierarchy of a self-referential relationship joined by a single column equality."""
+    if relationship.mapper is not relationship.parent or relationship.secondary is not None:
+        return None
+    join = relationship.primaryjoin
+    if not isinstance(join, BinaryExpression) or join.operator is not operator.eq:
+        return None
+    primary_key = relationship.parent.primary_key
+    if len(primary_key) != 1 or len(relationship.local_remote_pairs) != 1:
+        return None
+    [(local, remote)] = relationship.local_remote_pairs
+    if relationship.direction is ONETOMANY:
+        parent_column, child_column = local, remote
+    elif relationship.direction is MANYTOONE:
+        parent_column, child_column = remote, local
+    else:
+        return None
+    if parent_column.table is not primary_key[0].table or child_column.table is not primary_key[0].table:
+        return None
+    return Hierarchy(parent_column, child_column, primary_key[0])
+
+
+def start_column(tree: Hierarchy, ancestors: bool) -> Column:
+    """The column of a starting row whose value the rows of its first step are matched on."""
+    return tree.child_column if ancestors else tree.parent_column
+
+
+def _path_key(column):
+    # percent-encoded, so that keys containing the path separator are kept whole
+    return func.replace(func.replace(cast(column, Text), '%', '%25'), '/', '%2F')
+
+
+def split_path(path: str) -> List[str]:
+    """The primary keys of a path selected by ``tree_query``, as strings."""
+    return [unquote(key) for key in path.split('/')]
+
+
+def tree_query(session: Session, model, tree: Hierarchy, ancestors: bool, keys, max_depth: int) -> Query:
+    """
+    Selects ``(row, start key, depth, path)`` for every row reachable within ``max_depth`` steps from the rows
+    whose start column (see ``start_column``) is in ``keys``, the path being the primary keys joined by ``/`` (see
+    ``split_path``).
+    """
+    match, link = (tree.parent_column, tree.child_column) if ancestors else (tree.child_column, tree.parent_column)
+    primary_key = tree.primary_key
+
+    anchor = select([
+        match.label('start'),
+        primary_key.label('node'),
+        link.label('link'),
+        literal(1).label('depth'),
+        _path_key(primary_key).label('path'),
+    ]).where(match.in_(keys)).cte('autogqla_tree', recursive=True)
+
+    step = primary_key.table.alias()
+    rows = anchor.union_all(
+        select([
+            anchor.c.start,
+            step.c[primary_key.key].label('node'),
+            step.c[link.key].label('link'),
+            (anchor.c.depth + 1).label('depth'),
+            (anchor.c.path + '/' + _path_key(step.c[primary_key.key])).label('path'),
+        ]).where(step.c[match.key] == anchor.c.link).where(anchor.c.depth < max_depth)
+    )
+
+    primary_key_attribute = getattr(model, model.__mapper__.get_property_by_column(primary_key).key)
+    return (
+        session.query(model, rows.c.start, rows.c.depth, rows.c.path)
+        .join(rows, primary_key_attribute == rows.c.node)
+        .order_by(rows.c.depth, primary_key_attribute)
+    )
@@ -0,0 +1,105 @@
+"""
+Per-table version counters and conditional (ETag) responses.
+
+``TableVersions`` keeps a counter per table, bumped whenever a transaction that inserted, updated or deleted rows
+of the table commits. With versions set on the schema (``Schema.set_versions``), each executed query records the
+tables it read, and its result carries an ETag derived from the document and the versions of those tables. When a
+request repeats the document with ``if_none_match`` equal to the current ETag, ``Schema.execute`` answers "not
+modified" from the recorded tables, without opening a session or running any resolver.
+
+The default counters only see the commits made through this process, on the engines of the schemas they are set on,
+which they start listening to once a query executes with them. Deployments with several processes writing to
+the database should subclass ``TableVersions`` to keep the counters in a shared store.
+"""
+import hashlib
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, Optional
+
+from graphql.execution import ExecutionResult
+
+from .changes import ChangeTracker
+
+
+class VersionedResult(ExecutionResult):
+    """An execution result with its ETag, or a "not modified" answer without data."""
+
+    __slots__ = 'etag', 'not_modified'
+
+    def __init__(self, *args, etag: Optional[str] = None, not_modified: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.etag = etag
+        self.not_modified = not_modified
+
+    @classmethod
+    def from_result(cls, result: ExecutionResult, etag: Optional[str]) -> 'VersionedResult':
+        return cls(result.data, result.errors, result.invalid, result.extensions, etag=etag)
+
+
+def document_key(request_string: str, variables: Optional[dict] = None, operation_name: Optional[str] = None) -> str:
+    payload = json.dumps([request_string, variables, operation_name], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class TableVersions:
+    """
+    The version counters of the tables, and the tables read by the most recently executed documents (at most
+    ``max_documents`` of them). The counters only follow the engines of the schemas versions are set on.
+    """
+
+    def __init__(self, max_documents: int = 1024):
+        # distinguishes the counters of this process from those of other processes, or of earlier runs
+        self.epoch = uuid.uuid4().hex
+        self.versions: Dict[str, int] = {}
+        self.max_documents = max_documents
+        self.dependencies: 'OrderedDict[str, FrozenSet[str]]' = OrderedDict()
+        self._changes = ChangeTracker(self.bump)
+        self._lock = threading.Lock()
+
+    def listen(self, engine):
+        self._changes.listen(engine)
+
+    def remove(self):
+        self._changes.remove()
+
+    def recording(self):
+        """Records the names of the tables read by the statements this thread executes within the block."""
+        return self._changes.recording()
+
+    def bump(self, tables: Iterable[str]):
+        with self._lock:
+            for table in tables:
+                self.versions[table] = self.versions.get(table, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.versions)
+
+    def etag(self, key: str, tables: Iterable[str], versions: Optional[Dict[str, int]] = None) -> str:
+        versions = self.versions if versions is None else versions
+        payload = ';'.join([self.epoch, key, *(f'{table}:{versions.get(table, 0)}' for table in sorted(tables))])
+        return f'"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+    def current_etag(self, key: str) -> Optional[str]:
+        """Returns the ETag a repeated execution of the document would have, or ``None`` when not recorded."""
+        with self._lock:
+            tables = self.dependencies.get(key)
+        return None if tables is None else self.etag(key, tables)
+
+    def record(self, key: str, tables: Iterable[str], versions: Dict[str, int]) -> Optional[str]:
+        """
+        Records the tables read by an execution that started with ``versions``, returning its ETag. Executions
+        that saw a table change (including their own writes) have no ETag, as their data may predate it.
+        """
+        tables = frozenset(tables)
+        with self._lock:
+            if any(self.versions.get(table, 0) != versions.get(table, 0) for table in tables):
+                self.dependencies.pop(key, None)
+                return None
+            self.dependencies[key] = tables
+            self.dependencies.move_to_end(key)
+            while len(self.dependencies) > self.max_documents:
+                self.dependencies.popitem(last=False)
+        return self.etag(key, tables, versions)
@@ -0,0 +1,58 @@
+"""Compares the parent key strategies of ``ConnectionLoader`` for large batches.
+
+Run with ``python -m benchmarks.batch_loading``.
+"""
+import time
+
+from promise import Promise
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from autogqla.fields.connections.relationship_loader import RelationshipLoader
+from tests.model import Base, Country, State
+
+STRATEGIES = {
+    'in': dict(max_batch_size=None, temp_table_threshold=None),
+    'chunked (1000)': dict(max_batch_size=1000, temp_table_threshold=None),
+    'temp table': dict(max_batch_size=None, temp_table_threshold=1000),
+}
+
+
+def load(session, countries, max_batch_size, temp_table_threshold):
+    loader = RelationshipLoader(
+        Country,
+        Country.states,
+        query_func=lambda query: query,
+        session_func=lambda: session,
+        max_batch_size=max_batch_size,
+        temp_table_threshold=temp_table_threshold,
+    )
+    # loaded from within a promise callback, like the fields of an execution, so that the loads are queued and
+    # dispatched together
+    return Promise.resolve(None).then(lambda _: Promise.all([loader.load(country) for country in countries])).get()
+
+
+def main():
+    for parents in (1_000, 10_000, 100_000):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.add_all(Country(name=f'Country {i}', states=[State(name=f'State {i}')]) for i in range(parents))
+        session.commit()
+        countries = session.query(Country).all()
+
+        for name, options in STRATEGIES.items():
+            start = time.perf_counter()
+            try:
+                load(session, countries, **options)
+                outcome = f'{time.perf_counter() - start:.3f}s'
+            except OperationalError as e:
+                session.rollback()
+                outcome = f'failed ({e.orig})'
+            print(f'{parents:>7} parents  {name:<15} {outcome}')
+        session.close()
+
+
+if __name__ == '__main__':
+    main()
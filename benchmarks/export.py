@@ -0,0 +1,67 @@
+"""Compares reading every place by paging through a pagination field and by the bulk export.
+
+Run with ``python -m benchmarks.export``.
+"""
+import time
+
+import graphene
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import autogqla
+from tests.model import Base, Suburb, Place
+
+SUBURBS = 100
+PLACES = 500
+PAGE_SIZE = 100
+QUERY = '''query ($after: String) {
+    paginatePlaces(first: %d, after: $after) {
+        edges { cursor node { id name address } }
+        pageInfo { hasNextPage }
+    }
+}''' % PAGE_SIZE
+
+
+def main():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    session = session_factory()
+    session.add_all(
+        Suburb(name=f'Suburb {s}', places=[
+            Place(name=f'Place {s}.{p}', address=f'{p} Main St') for p in range(PLACES)
+        ])
+        for s in range(SUBURBS)
+    )
+    session.commit()
+    session.close()
+
+    autogqla.create(Base)
+
+    class Query(graphene.ObjectType):
+        paginate_places = autogqla.make_pagination_field(Place)
+        resolve_paginate_places = autogqla.make_pagination_resolver(Place)
+
+    schema = autogqla.Schema(query=Query)
+    schema.set_session_factory(session_factory)
+
+    start = time.perf_counter()
+    rows, after = 0, None
+    while True:
+        page = schema.execute(QUERY, variable_values={'after': after}).data['paginatePlaces']
+        rows += len(page['edges'])
+        if not page['pageInfo']['hasNextPage']:
+            break
+        after = page['edges'][-1]['cursor']
+    elapsed = time.perf_counter() - start
+    print(f'{"paginate":<8} {elapsed:.3f}s {rows / elapsed:>10.0f} rows/s')
+
+    for format in autogqla.export.FORMATS:
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in schema.export(Place, columns=['internalId', 'name', 'address'], format=format))
+        elapsed = time.perf_counter() - start
+        print(f'{format:<8} {elapsed:.3f}s {rows / elapsed:>10.0f} rows/s ({size / 1e6:.1f} MB)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Compares a nested list query executed by the loaders and by the single statement JSON engine.
+
+Run with ``python -m benchmarks.json_engine``.
+"""
+import time
+
+import graphene
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import autogqla
+from tests.model import Base, Country, State, Suburb, Place
+
+COUNTRIES = 50
+STATES = 20
+SUBURBS = 10
+PLACES = 5
+QUERY = '{ countries { id name states { name suburbs { name places { name address } } } } }'
+
+
+def main():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    # correlated subqueries look children up by their foreign key
+    for table, column in (('state', 'country_id'), ('suburb', 'state_id'), ('place', 'suburb_id')):
+        engine.execute(f'CREATE INDEX ix_{table}_{column} ON {table} ({column})')
+    session_factory = sessionmaker(bind=engine)
+    session = session_factory()
+    session.add_all(
+        Country(name=f'Country {c}', states=[
+            State(name=f'State {c}.{s}', suburbs=[
+                Suburb(name=f'Suburb {c}.{s}.{u}', places=[
+                    Place(name=f'Place {c}.{s}.{u}.{p}', address=f'{p} Main St') for p in range(PLACES)
+                ])
+                for u in range(SUBURBS)
+            ])
+            for s in range(STATES)
+        ])
+        for c in range(COUNTRIES)
+    )
+    session.commit()
+    session.close()
+
+    autogqla.create(Base)
+
+    class Query(graphene.ObjectType):
+        countries = autogqla.make_relationship_field(Country)
+        resolve_countries = autogqla.make_relationship_resolver(Country)
+
+    schema = autogqla.Schema(query=Query)
+    schema.set_session_factory(session_factory)
+
+    results = {}
+    for engine_name in ('loader', 'json'):
+        start = time.perf_counter()
+        results[engine_name] = schema.execute(QUERY, engine=engine_name).to_dict()
+        print(f'{engine_name:<8} {time.perf_counter() - start:.3f}s')
+    assert results['loader'] == results['json']
+
+
+if __name__ == '__main__':
+    main()
@@ -1,32 +1,64 @@
+import graphene
 import pytest
 from graphene import Schema
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from autogqla import create, Schema
-from tests.model import Base, build_models
+from autogqla import create, create_search_indexes, Schema
+from autogqla.base import BaseModel
+from autogqla.spec import ModelSpec, FieldsSpec, SearchSpec
+from autogqla.testing import max_statements  # noqa: F401
+from tests import model
+from tests.model import Base, build_models, build_tags
 
 
 @pytest.fixture(scope='session', autouse=True)
 def session_maker():
-    engine = create_engine('sqlite://')
+    # a single connection to the in-memory database, which live query refreshes reach from their own thread
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
     Base.metadata.create_all(engine)
     yield sessionmaker(bind=engine)
 
 
 @pytest.fixture(scope='session', autouse=True)
 def init(session_maker):
+    class Place(BaseModel):
+        __spec__ = ModelSpec(
+            model=model.Place,
+            fields=FieldsSpec(search=SearchSpec(include=['name', 'address'], order_by_relevance=True)),
+        )
+
+        # custom resolvers which load data per row
+        suburb_name = graphene.String()
+        neighbour_count = graphene.Int()
+
+        def resolve_suburb_name(root, _info):
+            return root.suburb.name
+
+        def resolve_neighbour_count(root, _info):
+            session = BaseModel.session_func()
+            return session.query(model.Place).filter(model.Place.suburb_id == root.suburb_id).count() - 1
+
+    class Category(BaseModel):
+        __spec__ = ModelSpec(
+            model=model.Category,
+            fields=FieldsSpec(json_paths={'details': {'rating': float, 'origin.country': str}}),
+        )
+
     create(Base)
+    create_search_indexes(session_maker.kw['bind'])
     session = session_maker()
     session.add_all(build_models())
+    session.add_all(build_tags({place.name: place for place in session.query(model.Place)}))
     session.commit()
     session.close()
 
 
 @pytest.fixture(autouse=True)
 def schema(session_maker):
-    from tests.query import Query
+    from tests.query import Query, Mutation
 
-    schema = Schema(query=Query)
+    schema = Schema(query=Query, mutation=Mutation)
     schema.set_session_factory(session_factory=session_maker)
     return schema
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from typing import List
+from datetime import datetime
+from typing import Dict, List
 
-from sqlalchemy import Integer, Column, String, ForeignKey
+from sqlalchemy import Integer, Column, String, DateTime, ForeignKey, ForeignKeyConstraint, JSON, Table, func
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship, column_property
 
 Base = declarative_base()
 
@@ -16,6 +18,7 @@ class Country(Base):
     name = Column(String(100), nullable=False)
 
     states: List[State] = relationship('State', back_populates='country', uselist=True)
+    vehicles: List[Vehicle] = relationship('Vehicle', back_populates='country', uselist=True)
 
 
 class State(Base):
@@ -47,29 +50,155 @@ class Place(Base):
     suburb_id = Column(Integer, ForeignKey('suburb.id'))
     name = Column(String(100), nullable=False)
     address = Column(String(100), nullable=True)
+    name_length = column_property(func.length(name, type_=Integer))
 
     suburb: Suburb = relationship('Suburb', back_populates='places')
+    tags: List[Tag] = relationship('Tag', secondary='place_tag', back_populates='places', uselist=True)
 
 
-def build_models() -> List[Country]:
+place_tag = Table(
+    'place_tag',
+    Base.metadata,
+    Column('place_id', Integer, ForeignKey('place.id'), primary_key=True),
+    Column('tag_id', Integer, ForeignKey('tag.id'), primary_key=True),
+)
+
+
+class Tag(Base):
+    __tablename__ = 'tag'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False)
+
+    places: List[Place] = relationship('Place', secondary='place_tag', back_populates='tags', uselist=True)
+
+
+class Currency(Base):
+    __tablename__ = 'currency'
+
+    code = Column(String(3), primary_key=True)
+    name = Column(String(100), nullable=False)
+
+    denominations: List[Denomination] = relationship('Denomination', back_populates='currency', uselist=True)
+
+
+class Denomination(Base):
+    __tablename__ = 'denomination'
+
+    currency_code = Column(String(3), ForeignKey('currency.code'), primary_key=True)
+    value = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+
+    currency: Currency = relationship('Currency', back_populates='denominations')
+    coins: List[Coin] = relationship('Coin', back_populates='denomination', uselist=True)
+
+
+class Coin(Base):
+    __tablename__ = 'coin'
+    __table_args__ = (
+        ForeignKeyConstraint(['currency_code', 'value'], ['denomination.currency_code', 'denomination.value']),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    currency_code = Column(String(3), nullable=False)
+    value = Column(Integer, nullable=False)
+    year = Column(Integer, nullable=False)
+    minted_at = Column(DateTime, nullable=True)
+
+    denomination: Denomination = relationship('Denomination', back_populates='coins')
+
+    @hybrid_property
+    def age(self):
+        return 2020 - self.year
+
+
+class Vehicle(Base):
+    __tablename__ = 'vehicle'
+    __mapper_args__ = {'polymorphic_on': 'kind', 'polymorphic_identity': 'vehicle'}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    country_id = Column(Integer, ForeignKey('country.id'))
+    kind = Column(String(20), nullable=False)
+    name = Column(String(100), nullable=False)
+
+    country: Country = relationship('Country', back_populates='vehicles')
+
+
+class Car(Vehicle):
+    __tablename__ = 'car'
+    __mapper_args__ = {'polymorphic_identity': 'car'}
+
+    id = Column(Integer, ForeignKey('vehicle.id'), primary_key=True)
+    doors = Column(Integer, nullable=False)
+
+
+class Boat(Vehicle):
+    # single table inheritance
+    __mapper_args__ = {'polymorphic_identity': 'boat'}
+
+    length = Column(Integer, nullable=True)
+
+
+class Category(Base):
+    __tablename__ = 'category'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    parent_id = Column(Integer, ForeignKey('category.id'), nullable=True)
+    name = Column(String(100), nullable=False)
+    details = Column(JSON, nullable=True)
+
+    parent: Category = relationship('Category', back_populates='children', remote_side=[id])
+    children: List[Category] = relationship('Category', back_populates='parent', uselist=True)
+
+
+def build_models() -> List[Base]:
+    market = Place(name='Queen Victoria Market', address='Queen St, Melbourne VIC 3000')
+    opera_house = Place(name='Sydney Opera House', address='Bennelong Point, Sydney NSW 2000')
+    central_park = Place(name='Central Park', address='Manhattan, New York City, United States')
     return [
-        Country(name='Australia', states=[
+        Country(name='Australia', vehicles=[
+            Car(name='Holden', doors=4),
+            Boat(name='Ferry', length=40),
+            Vehicle(name='Tram'),
+        ], states=[
             State(name='Victoria', suburbs=[
-                Suburb(name='Melbourne', places=[
-                    Place(name='Queen Victoria Market', address='Queen St, Melbourne VIC 3000'),
-                ])
+                Suburb(name='Melbourne', places=[market])
             ]),
             State(name='New South Wales', suburbs=[
-                Suburb(name='Sydney', places=[
-                    Place(name='Sydney Opera House', address='Bennelong Point, Sydney NSW 2000'),
-                ])
+                Suburb(name='Sydney', places=[opera_house])
             ])
         ]),
-        Country(name='United States', states=[
+        Country(name='United States', vehicles=[Car(name='Jeep', doors=2)], states=[
             State(name='New York', suburbs=[
-                Suburb(name='Manhattan', places=[
-                    Place(name='Central Park', address='Manhattan, New York City, United States')
-                ])
+                Suburb(name='Manhattan', places=[central_park])
             ])
         ]),
+        Currency(code='AUD', name='Australian Dollar', denominations=[
+            Denomination(value=1, name='One Dollar', coins=[
+                Coin(year=1984, minted_at=datetime(1984, 5, 14, 9, 30)),
+                Coin(year=2000, minted_at=datetime(2000, 5, 2, 16, 0)),
+            ]),
+            Denomination(value=2, name='Two Dollars', coins=[Coin(year=1988)]),
+        ]),
+        Category(name='Coins', details={'rating': 4.5, 'origin': {'country': 'AU'}, 'labels': ['metal', 'round']}, children=[
+            Category(name='Australian', details={'rating': 3, 'origin': {'country': 'AU'}, 'labels': ['metal']}, children=[
+                Category(name='Dollars', details={'rating': 5, 'origin': {'country': 'AU'}, 'labels': ['gold']}),
+                Category(name='Cents', details={'rating': 2}),
+            ]),
+            Category(name='American', details={'origin': {'country': 'US'}, 'labels': ['metal']}),
+        ]),
+        Category(name='Banknotes'),
+    ]
+
+
+def build_tags(places: Dict[str, Place]) -> List[Tag]:
+    """The tags of the places built by ``build_models``, added once the places are, which keeps the places' order."""
+    market, opera_house, central_park = (
+        places[name] for name in ('Queen Victoria Market', 'Sydney Opera House', 'Central Park')
+    )
+    return [
+        Tag(name='landmark', places=[market, opera_house, central_park]),
+        Tag(name='heritage', places=[market, opera_house]),
+        Tag(name='market', places=[market]),
+        Tag(name='park', places=[central_park]),
     ]
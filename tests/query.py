@@ -1,7 +1,7 @@
 import graphene
 
 import autogqla
-from tests.model import Country, State
+from tests.model import Country, State, Place, Currency, Coin, Vehicle, Tag, Category
 
 
 class Query(graphene.ObjectType):
@@ -16,3 +16,44 @@ class Query(graphene.ObjectType):
 
     paginate_states = autogqla.objects.helpers.make_pagination_field(State)
     resolve_paginate_states = autogqla.objects.helpers.make_pagination_resolver(State)
+
+    places = autogqla.objects.helpers.make_relationship_field(Place)
+    resolve_places = autogqla.objects.helpers.make_relationship_resolver(Place)
+
+    places_group_by = autogqla.make_group_by_field(Place)
+    resolve_places_group_by = autogqla.make_group_by_resolver(Place)
+
+    coins_group_by = autogqla.make_group_by_field(Coin)
+    resolve_coins_group_by = autogqla.make_group_by_resolver(Coin)
+
+    tags = autogqla.objects.helpers.make_relationship_field(Tag)
+    resolve_tags = autogqla.objects.helpers.make_relationship_resolver(Tag)
+
+    categories = autogqla.objects.helpers.make_relationship_field(Category)
+    resolve_categories = autogqla.objects.helpers.make_relationship_resolver(Category)
+
+    paginate_categories = autogqla.objects.helpers.make_pagination_field(Category)
+    resolve_paginate_categories = autogqla.objects.helpers.make_pagination_resolver(Category)
+
+    vehicles = autogqla.objects.helpers.make_relationship_field(Vehicle)
+    resolve_vehicles = autogqla.objects.helpers.make_relationship_resolver(Vehicle)
+
+    currencies = autogqla.objects.helpers.make_relationship_field(Currency)
+    resolve_currencies = autogqla.objects.helpers.make_relationship_resolver(Currency)
+
+    coins = autogqla.objects.helpers.make_relationship_field(Coin)
+    resolve_coins = autogqla.objects.helpers.make_relationship_resolver(Coin)
+
+    paginate_coins = autogqla.objects.helpers.make_pagination_field(Coin)
+    resolve_paginate_coins = autogqla.objects.helpers.make_pagination_resolver(Coin)
+
+
+class Mutation(graphene.ObjectType):
+    create_places = autogqla.make_create_field(Place)
+    resolve_create_places = autogqla.make_create_resolver(Place)
+
+    update_places = autogqla.make_update_field(Place)
+    resolve_update_places = autogqla.make_update_resolver(Place)
+
+    delete_places = autogqla.make_delete_field(Place)
+    resolve_delete_places = autogqla.make_delete_resolver(Place)
@@ -0,0 +1,131 @@
+import re
+
+import pytest
+from graphene import Schema
+from sqlalchemy.orm import sessionmaker
+
+from autogqla import prefetch
+from autogqla.fields.connections.base_loader import ConnectionLoader, loader_registry
+from autogqla.testing import StatementCounter
+
+
+@pytest.fixture
+def sessions(schema: Schema, session_maker):
+    created = []
+
+    class RecordingSessionMaker(sessionmaker):
+
+        def __call__(self, **local_kw):
+            created.append(super().__call__(**local_kw))
+            return created[-1]
+
+    schema.set_session_factory(RecordingSessionMaker(bind=session_maker.kw['bind']))
+    return created
+
+
+QUERY = ''' {
+    countries {
+        name
+        states {
+            name
+            suburbs {
+                name
+            }
+        }
+    }
+}'''
+
+EXPECTED = {
+    'countries': [
+        {
+            'name': 'Australia',
+            'states': [
+                {'name': 'Victoria', 'suburbs': [{'name': 'Melbourne'}]},
+                {'name': 'New South Wales', 'suburbs': [{'name': 'Sydney'}]},
+            ]
+        },
+        {
+            'name': 'United States',
+            'states': [
+                {'name': 'New York', 'suburbs': [{'name': 'Manhattan'}]},
+            ]
+        },
+    ]
+}
+
+
+def _batches(statements):
+    # the table of each relationship query, with the number of keys in its IN list, or 'temp' for a temporary table
+    batches = []
+    for statement in statements:
+        match = re.search(r'FROM (state|suburb)\s+WHERE', statement)
+        if match:
+            batches.append((match.group(1), 'temp' if 'autogqla_keys' in statement else statement.count('?')))
+    return batches
+
+
+@pytest.mark.parametrize('prefetched', [True, False])
+@pytest.mark.parametrize('max_batch_size, temp_table_threshold, batches', [
+    (1, None, [('state', 1), ('state', 1), ('suburb', 1), ('suburb', 1), ('suburb', 1)]),
+    (None, 0, [('state', 'temp'), ('suburb', 'temp')]),
+    (2, 1, [('state', 'temp'), ('suburb', 'temp'), ('suburb', 1)]),
+    (None, None, [('state', 2), ('suburb', 3)]),
+])
+def test_batching_strategies(schema: Schema, monkeypatch, max_batch_size, temp_table_threshold, batches, prefetched):
+    monkeypatch.setattr(ConnectionLoader, 'max_batch_size', max_batch_size)
+    monkeypatch.setattr(ConnectionLoader, 'temp_table_threshold', temp_table_threshold)
+    # the root resolver prefetches the states and suburbs, or else the nested fields load them
+    monkeypatch.setattr(prefetch, 'enabled', prefetched)
+    with StatementCounter() as counter:
+        result = schema.execute(QUERY)
+    assert not result.errors
+    assert result.data == EXPECTED
+    assert _batches(counter.statements) == batches
+
+
+def test_many_to_one_skips_loaded_keys(schema: Schema, sessions):
+    result = schema.execute(''' {
+        countries {
+            states {
+                name
+                country {
+                    name
+                }
+            }
+        }
+    }''')
+    assert not result.errors
+    assert result.data['countries'][0]['states'][0] == {'name': 'Victoria', 'country': {'name': 'Australia'}}
+
+    loader = loader_registry(sessions[-1])['State', 'country', '{}']
+    assert loader.stats.keys == 0
+    # the three states are in two countries
+    assert loader.stats.skipped_keys == 2
+
+
+def test_execute_batch_shares_loaders(schema: Schema, sessions):
+    results = schema.execute_batch([
+        {'query': '{ countries(where: {name: {eq: "Australia"}}) { states { name } } }'},
+        {'query': 'query ($name: String) { countries(where: {name: {eq: $name}}) { states { name } } }',
+         'variables': {'name': 'United States'}},
+    ])
+    assert [result.data for result in results] == [
+        {'countries': [{'states': [{'name': 'Victoria'}, {'name': 'New South Wales'}]}]},
+        {'countries': [{'states': [{'name': 'New York'}]}]},
+    ]
+    assert len(sessions) == 1
+
+    loader = loader_registry(sessions[0])['Country', 'states', '{}']
+    assert loader.stats.batches == 1
+    assert loader.stats.keys == 2
+
+
+def test_execute_json(schema: Schema):
+    assert schema.execute_json('{"query": "{ countries(where: {name: {eq: \\"Australia\\"}}) { name } }"}') == {
+        'data': {'countries': [{'name': 'Australia'}]},
+    }
+    assert schema.execute_json([{'query': '{ countries { name } }'}, {'query': '{ unknown }'}]) == [
+        {'data': {'countries': [{'name': 'Australia'}, {'name': 'United States'}]}},
+        {'errors': [{'message': 'Cannot query field "unknown" on type "Query".',
+                     'locations': [{'line': 1, 'column': 3}]}]},
+    ]
@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+
+import pytest
+from graphene import Schema
+
+from tests.model import Place, Coin
+
+
+def test_export_csv(schema: Schema):
+    chunks = list(schema.export(
+        Place,
+        where={'suburb': {'state': {'country': {'name': {'eq': 'Australia'}}}}},
+        order_by=['NAME_DESC'],
+        columns=['name', 'nameLength'],
+        batch_size=1,
+    ))
+    assert len(chunks) == 2
+    assert list(csv.reader(io.StringIO(b''.join(chunks).decode()))) == [
+        ['name', 'nameLength'],
+        ['Sydney Opera House', '18'],
+        ['Queen Victoria Market', '21'],
+    ]
+
+
+def test_export_ndjson(schema: Schema):
+    chunks = schema.export(Coin, where={'mintedAt': {'isNull': False}}, order_by=['YEAR_DESC'], format='ndjson')
+    rows = [json.loads(line) for line in b''.join(chunks).decode().splitlines()]
+    assert [(row['year'], row['age'], row['mintedAt']) for row in rows] == [
+        (2000, 20, '2000-05-02T16:00:00'),
+        (1984, 36, '1984-05-14T09:30:00'),
+    ]
+    assert set(rows[0]) == {'internalId', 'currencyCode', 'value', 'year', 'mintedAt', 'age'}
+
+
+def test_export_arrow(schema: Schema):
+    pa = pytest.importorskip('pyarrow')
+    data = b''.join(schema.export(Coin, order_by=['YEAR_ASC'], columns=['year', 'mintedAt'], format='arrow'))
+    table = pa.ipc.open_stream(data).read_all()
+    assert table.column('year').to_pylist() == [1984, 1988, 2000]
+
+
+def test_export_errors(schema: Schema):
+    with pytest.raises(Exception, match='unknown Place fields: colour'):
+        list(schema.export(Place, columns=['name', 'colour']))
+    with pytest.raises(Exception, match='unknown export format'):
+        list(schema.export(Place, format='xml'))
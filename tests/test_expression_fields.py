@@ -0,0 +1,53 @@
+from graphene import Schema
+
+from autogqla.testing import StatementCounter
+
+
+def test_hybrid_property_field(schema: Schema):
+    with StatementCounter() as counter:
+        result = schema.execute('{ coins(where: {age: {gt: 33}}) { year age } }')
+    assert not result.errors
+    assert result.data == {'coins': [{'year': 1984, 'age': 36}]}
+    # filtered in SQL
+    assert '- coin.year >' in counter.statements[0]
+
+
+def test_hybrid_property_keyset_pagination(schema: Schema):
+    query = '''query ($after: String) {
+        paginateCoins(first: 2, after: $after, orderBy: [AGE_DESC]) {
+            edges { cursor node { age } }
+            pageInfo { hasNextPage }
+        }
+    }'''
+    first = schema.execute(query)
+    assert not first.errors
+    assert [edge['node']['age'] for edge in first.data['paginateCoins']['edges']] == [36, 32]
+    assert first.data['paginateCoins']['pageInfo']['hasNextPage']
+
+    cursor = first.data['paginateCoins']['edges'][-1]['cursor']
+    second = schema.execute(query, variable_values={'after': cursor})
+    assert not second.errors
+    assert [edge['node']['age'] for edge in second.data['paginateCoins']['edges']] == [20]
+    assert not second.data['paginateCoins']['pageInfo']['hasNextPage']
+
+
+def test_column_property_field(schema: Schema):
+    result = schema.execute('{ places(where: {nameLength: {lt: 20}}) { name nameLength } }')
+    assert not result.errors
+    assert result.data == {'places': [
+        {'name': 'Sydney Opera House', 'nameLength': 18},
+        {'name': 'Central Park', 'nameLength': 12},
+    ]}
+
+
+def test_expression_fields_are_not_inputs(schema: Schema):
+    input_type = schema.get_type('PlaceInput')
+    assert 'nameLength' not in input_type.fields
+    assert 'name' in input_type.fields
+
+
+def test_expression_fields_in_json_engine(schema: Schema):
+    query = '{ coins(where: {age: {lt: 35}}) { year age } }'
+    assert schema.execute(query, engine='json').data == schema.execute(query).data == {
+        'coins': [{'year': 2000, 'age': 20}, {'year': 1988, 'age': 32}],
+    }
@@ -0,0 +1,180 @@
+import pytest
+from graphene import Schema
+from sqlalchemy import event
+
+from autogqla.base import BaseModel
+from autogqla.condition_constructor import construct_condition
+from autogqla.fields.connections.base import unique_join
+from autogqla.filter_optimizer import optimize, EMPTY
+from tests.model import Country, State
+
+
+@pytest.fixture
+def statements(session_maker):
+    executed = []
+
+    def before_cursor_execute(_conn, _cursor, statement, *_):
+        executed.append(statement)
+
+    engine = session_maker.kw['bind']
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def country_resolver():
+    return BaseModel.resolver_collection.for_model(Country)
+
+
+def test_flattens_and_merges_fields():
+    where = {'and_': [{'name': {'ne': 'Canada'}}, {'and_': [{'name': {'starts_with': 'A'}}]}]}
+    assert optimize(country_resolver(), where) == {'name': {'ne': 'Canada', 'starts_with': 'A'}}
+
+
+def test_merges_relationship_filters():
+    where = {'and_': [{'states': {'name': {'ne': 'Victoria'}}}, {'states': {'name': {'ne': 'Texas'}}}]}
+    assert optimize(country_resolver(), where) == {'states': {'name': {'not_in': ['Victoria', 'Texas']}}}
+
+
+def test_or_of_equalities_becomes_in():
+    where = {'or_': [{'name': {'eq': 'Australia'}}, {'or_': [{'name': {'in_': ['Canada', 'Australia']}}]}]}
+    assert optimize(country_resolver(), where) == {'name': {'in_': ['Australia', 'Canada']}}
+
+
+def test_or_with_unconditional_alternative_is_dropped():
+    where = {'name': {'eq': 'Australia'}, 'or_': [{}, {'name': {'eq': 'Canada'}}]}
+    assert optimize(country_resolver(), where) == {'name': {'eq': 'Australia'}}
+
+
+def test_single_in_becomes_eq():
+    assert optimize(country_resolver(), {'name': {'in_': ['Australia']}}) == {'name': {'eq': 'Australia'}}
+
+
+@pytest.mark.parametrize('where', [
+    {'name': {'eq': 'Australia', 'ne': 'Australia'}},
+    {'and_': [{'name': {'eq': 'Australia'}}, {'name': {'eq': 'Canada'}}]},
+    {'name': {'in_': ['Australia'], 'not_in': ['Australia']}},
+    {'name': {'in_': []}},
+    {'name': {'is_null': True, 'eq': 'Australia'}},
+    {'internal_id': {'gt': 5, 'lt': 3}},
+    {'internal_id': {'ge': 3, 'lt': 3}},
+    {'states': {'internal_id': {'eq': 1, 'gt': 1}}},
+    {'or_': [{'name': {'in_': []}}, {'internal_id': {'lt': 1, 'gt': 1}}]},
+])
+def test_contradictions(where):
+    assert optimize(country_resolver(), where) is EMPTY
+
+
+@pytest.mark.parametrize('where', [
+    '{name: {eq: "Australia", ne: "Australia"}}',
+    '{and: [{name: {eq: "Australia"}}, {name: {eq: "United States"}}]}',
+    '{states: {name: {in: []}}}',
+])
+def test_contradiction_issues_no_query(schema: Schema, statements, where):
+    result = schema.execute(f''' {{
+        countries(where: {where}) {{
+            name
+        }}
+        paginateCountries(first: 10, where: {where}) {{
+            edges {{
+                node {{
+                    name
+                }}
+            }}
+        }}
+    }}''')
+    assert not result.errors
+    assert result.data == {'countries': [], 'paginateCountries': {'edges': []}}
+    assert statements == []
+
+
+def test_contradiction_on_child_issues_no_child_query(schema: Schema, statements):
+    result = schema.execute(''' {
+        countries {
+            name
+            states: paginateStates(first: 10, where: {name: {eq: "Victoria", ne: "Victoria"}}) {
+                edges {
+                    node {
+                        name
+                    }
+                }
+            }
+        }
+    }''')
+    assert not result.errors
+    assert result.data == {
+        'countries': [
+            {'name': 'Australia', 'states': {'edges': []}},
+            {'name': 'United States', 'states': {'edges': []}},
+        ]
+    }
+    assert len(statements) == 1
+
+
+def query_names(session, resolver, where):
+    query = session.query(State.name)
+    joins, condition = construct_condition(resolver, where)
+    for join_attr in joins:
+        query = unique_join(query, join_attr)
+    if condition is not None:
+        query = query.filter(condition)
+    return sorted(name for name, in query)
+
+
+@pytest.mark.parametrize('where', [
+    {'or_': [{'name': {'eq': 'Victoria'}}, {'name': {'eq': 'New York'}}, {'or_': [{'name': {'in_': ['Victoria']}}]}]},
+    {'and_': [{'name': {'ne': 'Victoria'}}, {'and_': [{'name': {'ne': 'Texas'}}]}]},
+    {'country': {'name': {'eq': 'Australia'}}, 'and_': [{'country': {'name': {'in_': ['Australia']}}}]},
+    {'or_': [{'name': {'eq': 'Victoria'}}, {'country': {'name': {'eq': 'United States'}}}]},
+    {'name': {'in_': ['Victoria', 'New York'], 'ne': 'Victoria'}},
+    {'internal_id': {'ge': 1, 'gt': 2, 'lt': 4, 'le': 5}},
+    {'and_': [{'name': {'ne': None}}, {'name': {'ne': 'Victoria'}}]},
+    {'and_': [{'name': {'ne': 'Victoria'}}, {'name': {'ne': None}}, {'name': {'ne': 'Texas'}}]},
+    {'or_': []},
+])
+def test_optimized_filter_is_equivalent(session_maker, where):
+    resolver = BaseModel.resolver_collection.for_model(State)
+    optimized = optimize(resolver, where)
+    assert optimized is not EMPTY
+
+    session = session_maker()
+    try:
+        assert query_names(session, resolver, optimized) == query_names(session, resolver, where)
+    finally:
+        session.close()
+
+
+def test_eq_null_is_kept(schema: Schema):
+    assert optimize(country_resolver(), {'name': {'eq': None}}) == {'name': {'eq': None}}
+    # an ``IN`` list never matches null, so the null alternative stays on its own
+    where = {'or_': [{'name': {'eq': None}}, {'name': {'eq': 'Canada'}}, {'name': {'eq': 'Australia'}}]}
+    assert optimize(country_resolver(), where) == {
+        'and_': [{'or_': [{'name': {'in_': ['Canada', 'Australia']}}, {'name': {'eq': None}}]}],
+    }
+
+    query = 'query ($where: CategoryWhereFilter) { categories(where: $where) { name } }'
+    result = schema.execute(query, variable_values={'where': {'parentId': {'eq': None}}})
+    assert not result.errors
+    assert result.data == {'categories': [{'name': 'Coins'}, {'name': 'Banknotes'}]}
+
+    where = {'or': [{'parentId': {'eq': None}}, {'name': {'eq': 'Cents'}}]}
+    result = schema.execute(query, variable_values={'where': where})
+    assert not result.errors
+    assert result.data == {'categories': [{'name': 'Coins'}, {'name': 'Banknotes'}, {'name': 'Cents'}]}
+
+
+def test_ne_null_is_kept(schema: Schema):
+    where = {'and_': [{'name': {'ne': None}}, {'name': {'ne': 'Australia'}}]}
+    assert optimize(country_resolver(), where) == {'name': {'ne': None, 'not_in': ['Australia']}}
+
+    query = 'query ($n: String) { countries(where: {and: [{name: {ne: $n}}, {name: {ne: "Australia"}}]}) { name } }'
+    result = schema.execute(query, variable_values={'n': None})
+    assert not result.errors
+    assert result.data == {'countries': [{'name': 'United States'}]}
+
+
+def test_empty_or_is_no_constraint(schema: Schema):
+    assert optimize(country_resolver(), {'or_': []}) == {}
+    result = schema.execute('{ countries(where: {or: []}) { name } }')
+    assert not result.errors
+    assert result.data == {'countries': [{'name': 'Australia'}, {'name': 'United States'}]}
@@ -0,0 +1,62 @@
+from graphene import Schema
+from graphql_relay import to_global_id
+
+from autogqla.testing import StatementCounter
+
+
+def _ids(schema, query):
+    result = schema.execute(query)
+    assert not result.errors, result.errors
+    return result.data
+
+
+def test_filter_by_id(schema: Schema):
+    countries = _ids(schema, '{ countries { id name } }')['countries']
+    australia = countries[0]
+
+    with StatementCounter() as counter:
+        result = schema.execute('{ countries(where: {id: {eq: "%s"}}) { name } }' % australia['id'])
+    assert not result.errors
+    assert result.data == {'countries': [{'name': 'Australia'}]}
+    assert 'WHERE country.id = ?' in counter.statements[0]
+
+    ids = ', '.join(f'"{country["id"]}"' for country in countries)
+    result = schema.execute('{ countries(where: {id: {in: [%s]}}) { name } }' % ids)
+    assert [country['name'] for country in result.data['countries']] == ['Australia', 'United States']
+
+    result = schema.execute('{ countries(where: {id: {notIn: ["%s"]}}) { name } }' % australia['id'])
+    assert result.data == {'countries': [{'name': 'United States'}]}
+
+    result = schema.execute('{ countries(where: {id: {ne: "%s"}}) { name } }' % australia['id'])
+    assert result.data == {'countries': [{'name': 'United States'}]}
+
+
+def test_filter_by_id_of_other_type(schema: Schema):
+    result = schema.execute('{ countries(where: {id: {eq: "%s"}}) { name } }' % to_global_id('State', '1'))
+    assert result.errors
+    assert 'is not the id of a Country' in result.errors[0].message
+
+    result = schema.execute('{ countries(where: {id: {eq: "not an id"}}) { name } }')
+    assert result.errors
+    assert 'invalid id' in result.errors[0].message
+
+
+def test_filter_by_subclass_id(schema: Schema):
+    result = schema.execute('{ vehicles { id name } }')
+    holden = result.data['vehicles'][0]
+    assert holden['id'] == to_global_id('Car', '1')
+    result = schema.execute('{ vehicles(where: {id: {eq: "%s"}}) { name } }' % holden['id'])
+    assert not result.errors
+    assert result.data == {'vehicles': [{'name': 'Holden'}]}
+
+
+def test_composite_ids(schema: Schema):
+    currencies = _ids(schema, '{ currencies { denominations { id name } } }')['currencies']
+    denominations = currencies[0]['denominations']
+    assert denominations[0]['id'] == to_global_id('Denomination', '["AUD", 1]')
+
+    result = schema.execute('''{
+        currencies { denominations: filterDenominations(where: {id: {in: ["%s"]}}) { name } }
+    }''' % denominations[1]['id'])
+    assert not result.errors
+    assert result.data == {'currencies': [{'denominations': [{'name': 'Two Dollars'}]}]}
@@ -0,0 +1,52 @@
+from graphene import Schema
+
+from autogqla.testing import StatementCounter
+
+
+def test_group_by_across_many_to_one_relationships(schema: Schema):
+    with StatementCounter() as counter:
+        result = schema.execute(''' {
+            byCountry: placesGroupBy(by: [SUBURB__STATE__COUNTRY_ID]) { key count }
+            byState: placesGroupBy(by: [SUBURB__STATE__NAME], where: {suburb: {name: {ne: "Sydney"}}}) { key count }
+        }''')
+    assert not result.errors
+    assert result.data == {
+        'byCountry': [{'key': ['1'], 'count': 2}, {'key': ['2'], 'count': 1}],
+        'byState': [{'key': ['New York'], 'count': 1}, {'key': ['Victoria'], 'count': 1}],
+    }
+    assert counter.count == 2
+
+
+def test_group_by_aggregates_and_having(schema: Schema):
+    result = schema.execute(''' {
+        coinsGroupBy(by: [DENOMINATION__NAME], having: {count: {gt: 1}}) {
+            key
+            count
+            min(field: YEAR)
+            max(field: YEAR)
+            ... on CoinGroup { avg(field: AGE) }
+        }
+    }''')
+    assert not result.errors
+    assert result.data == {
+        'coinsGroupBy': [{'key': ['One Dollar'], 'count': 2, 'min': 1984, 'max': 2000, 'avg': 28}],
+    }
+
+
+def test_group_by_date_bucket(schema: Schema):
+    result = schema.execute('{ coinsGroupBy(by: [MINTED_AT_BY_MONTH, DENOMINATION__NAME]) { key count } }')
+    assert not result.errors
+    assert result.data == {'coinsGroupBy': [
+        {'key': [None, 'Two Dollars'], 'count': 1},
+        {'key': ['1984-05-01T00:00:00', 'One Dollar'], 'count': 1},
+        {'key': ['2000-05-01T00:00:00', 'One Dollar'], 'count': 1},
+    ]}
+
+    result = schema.execute('{ coinsGroupBy(by: [MINTED_AT_BY_YEAR], where: {mintedAt: {isNull: false}}) { key } }')
+    assert result.data == {'coinsGroupBy': [{'key': ['1984-01-01T00:00:00']}, {'key': ['2000-01-01T00:00:00']}]}
+
+
+def test_group_by_empty_filter(schema: Schema):
+    result = schema.execute('{ placesGroupBy(by: [NAME], where: {name: {eq: "a", ne: "a"}}) { key count } }')
+    assert not result.errors
+    assert result.data == {'placesGroupBy': []}
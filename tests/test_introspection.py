@@ -0,0 +1,66 @@
+import json
+
+from graphene import Schema
+from graphql import parse
+from graphql.utils.introspection_query import introspection_query
+
+from autogqla.introspection import IntrospectionCache, is_introspection_document
+from autogqla.testing import StatementCounter
+
+
+def test_is_introspection_document():
+    assert is_introspection_document(parse(introspection_query))
+    assert is_introspection_document(parse('{ __typename __type(name: "Country") { name } }'))
+    assert is_introspection_document(parse('query { ...Types } fragment Types on Query { __schema { types { name } } }'))
+    assert not is_introspection_document(parse('{ __typename countries { name } }'))
+    assert not is_introspection_document(parse('query { ...Countries } fragment Countries on Query { countries { name } }'))
+    assert not is_introspection_document(parse('mutation { __typename }'))
+    assert not is_introspection_document(parse('query A { __typename } query B { countries { name } }'), 'B')
+
+
+def test_introspection_is_cached(schema: Schema):
+    def fail():
+        raise AssertionError('introspection opened a session')
+
+    first = schema.introspect()
+    schema.set_session_factory(fail)
+    assert schema.introspect() is first
+    assert json.loads(first.body) == {'data': first.data}
+    assert first.etag.startswith('"') and len(first.etag) == 42
+
+    with StatementCounter() as counter:
+        result = schema.execute(introspection_query)
+    assert not result.errors
+    assert result.data == first.data
+    assert counter.count == 0
+
+
+def test_introspection_variables_are_keyed(schema: Schema):
+    query = 'query ($name: String!) { __type(name: $name) { name } }'
+    country = schema.execute(query, variable_values={'name': 'Country'})
+    state = schema.execute(query, variable_values={'name': 'State'})
+    assert country.data == {'__type': {'name': 'Country'}}
+    assert state.data == {'__type': {'name': 'State'}}
+    assert schema.introspect(query, {'name': 'State'}).etag != schema.introspect(query, {'name': 'Country'}).etag
+
+
+def test_other_documents_are_not_cached(schema: Schema):
+    assert schema.introspect('{ __typename countries { name } }') is None
+    result = schema.execute('{ __typename countries { name } }')
+    assert not result.errors
+    assert result.data['__typename'] == 'Query'
+    assert result.data['countries'][0] == {'name': 'Australia'}
+    assert schema.introspect('{ __type(name: 1) { name } }') is None
+    assert schema.execute_json({'query': '{ __typename }'}) == {'data': {'__typename': 'Query'}}
+
+
+def test_cache_is_bounded(schema: Schema):
+    cache = IntrospectionCache(max_size=2)
+    query = 'query ($name: String!) { __type(name: $name) { name } }'
+    for name in ('Country', 'State', 'Place'):
+        assert cache.get(schema, query, {'name': name}).data == {'__type': {'name': name}}
+    for index in range(3):
+        assert cache.get(schema, '{ __typename countries { name } }', {'index': index}) is None
+    assert len(cache._results) == 2
+    assert len(cache._documents) == 2
+    assert [key[2] for key in cache._results] == ['{"name": "State"}', '{"name": "Place"}']
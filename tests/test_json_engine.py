@@ -0,0 +1,128 @@
+import pytest
+from graphene import Schema
+from sqlalchemy import event
+
+from tests.model import Country, State
+
+
+@pytest.fixture
+def statements(session_maker):
+    executed = []
+
+    def before_cursor_execute(_conn, _cursor, statement, *_):
+        executed.append(statement)
+
+    engine = session_maker.kw['bind']
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.mark.parametrize('query, variables', [
+    ('''{
+        countries {
+            id
+            internalId
+            name
+            states {
+                __typename
+                name
+                suburbs {
+                    name
+                    state {
+                        name
+                        country {
+                            name
+                        }
+                    }
+                }
+            }
+        }
+    }''', None),
+    ('''query ($name: String) {
+        all: countries {
+            ...Country
+        }
+        filtered: countries(where: {or: [{name: {eq: $name}}, {states: {name: {eq: "New York"}}}]}) {
+            ...Country
+        }
+        none: states(where: {name: {eq: "Victoria", ne: "Victoria"}}) {
+            name
+        }
+    }
+
+    fragment Country on Country {
+        name
+        ... on Country {
+            states {
+                name
+            }
+        }
+    }''', {'name': 'Australia'}),
+    ('''{
+        currencies {
+            internalId
+            denominations {
+                name
+                coins {
+                    year
+                }
+            }
+        }
+        coins {
+            year
+            denomination {
+                name
+                currency {
+                    name
+                }
+            }
+        }
+    }''', None),
+    ('''{
+        states(where: {suburbs: {name: {ne: "Sydney"}}}) {
+            name
+            suburbs {
+                filterPlaces(where: {or: [{name: {startsWith: "Central"}}, {suburb: {name: {eq: "Sydney"}}}]}) {
+                    name
+                }
+            }
+        }
+    }''', None),
+])
+def test_json_engine_matches_loader_engine(schema: Schema, statements, query, variables):
+    expected = schema.execute(query, variable_values=variables)
+    assert not expected.errors
+
+    statements.clear()
+    result = schema.execute(query, variable_values=variables, engine='json')
+    assert not result.errors
+    assert result.data == expected.data
+    assert len(statements) == 1
+
+
+@pytest.mark.parametrize('query', [
+    '{ paginateCountries(first: 1) { edges { node { name } } } }',
+    '{ countries { name paginateStates(first: 1) { edges { node { name } } } } }',
+    '{ countries { name @include(if: true) } }',
+    'mutation { deletePlaces(where: {name: {eq: "nothing"}}) { affected } }',
+    '{ countries { unknown } }',
+])
+def test_json_engine_falls_back(schema: Schema, query):
+    expected = schema.execute(query)
+    result = schema.execute(query, engine='json')
+    assert result.data == expected.data
+    assert [error.message for error in result.errors or ()] == [error.message for error in expected.errors or ()]
+
+
+def test_json_engine_orders_children_like_the_loader(schema: Schema, monkeypatch):
+    monkeypatch.setattr(Country.states.property, 'order_by', [State.__table__.c.name.desc()])
+    query = '{ countries { states { name } } }'
+
+    expected = schema.execute(query)
+    result = schema.execute(query, engine='json')
+    assert not result.errors
+    assert result.data == expected.data
+    names = [state['name'] for state in result.data['countries'][0]['states']]
+    assert len(names) > 1
+    assert names == sorted(names, reverse=True)
@@ -0,0 +1,96 @@
+import pytest
+from graphene import Schema
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from autogqla.base import BaseModel
+from autogqla.json_paths import index_statements, json_condition
+from autogqla.testing import StatementCounter
+from tests.model import Category
+
+QUERY = '{ categories(where: %s) { name } }'
+
+
+def _names(schema, where):
+    result = schema.execute(QUERY % where)
+    assert not result.errors, result.errors
+    return [category['name'] for category in result.data['categories']]
+
+
+def test_json_path_comparisons(schema: Schema):
+    assert _names(schema, '{details: {path: "origin.country", eq: "US"}}') == ['American']
+    assert _names(schema, '{details: {path: "rating", gt: 3}}') == ['Coins', 'Dollars']
+    assert _names(schema, '{details: {path: "rating", in: [2, 3]}}') == ['Australian', 'Cents']
+    assert _names(schema, '{details: {path: "labels.0", eq: "gold"}}') == ['Dollars']
+    assert _names(schema, '{details: {path: "rating", isNull: true}}') == ['Banknotes', 'American']
+
+
+def test_json_conditions_on_several_paths(schema: Schema):
+    where = '{and: [{details: {path: "origin.country", eq: "AU"}}, {details: {path: "rating", le: 3}}]}'
+    assert _names(schema, where) == ['Australian']
+
+
+def test_json_contains_and_has_key(schema: Schema):
+    assert _names(schema, '{details: {contains: {origin: {country: "AU"}, labels: ["metal"]}}}') == [
+        'Coins', 'Australian',
+    ]
+    assert _names(schema, '{details: {path: "labels", contains: ["gold"]}}') == ['Dollars']
+    assert _names(schema, '{details: {hasKey: "labels"}}') == ['Coins', 'Australian', 'American', 'Dollars']
+    assert _names(schema, '{details: {path: "origin", hasKey: "country"}}') == [
+        'Coins', 'Australian', 'American', 'Dollars',
+    ]
+
+
+def test_json_filter_is_compiled_into_sql(schema: Schema):
+    with StatementCounter() as counter:
+        _names(schema, '{details: {path: "origin.country", eq: "US"}}')
+    assert counter.count == 1
+    assert 'JSON_EXTRACT(category.details' in counter.statements[0]
+
+
+def test_json_filter_requires_path_for_comparisons(schema: Schema):
+    result = schema.execute(QUERY % '{details: {eq: 1}}')
+    assert result.errors
+
+
+def test_json_path_order_by(schema: Schema):
+    result = schema.execute(''' {
+        paginateCategories(first: 2, orderBy: [DETAILS__RATING_DESC], where: {details: {path: "rating", isNull: false}}) {
+            edges { cursor node { name } }
+            pageInfo { endCursor }
+        }
+    }''')
+    assert not result.errors
+    connection = result.data['paginateCategories']
+    assert [edge['node']['name'] for edge in connection['edges']] == ['Dollars', 'Coins']
+
+    result = schema.execute(''' {
+        paginateCategories(first: 2, after: "%s", orderBy: [DETAILS__RATING_DESC]) {
+            edges { node { name } }
+        }
+    }''' % connection['pageInfo']['endCursor'])
+    assert not result.errors
+    assert [edge['node']['name'] for edge in result.data['paginateCategories']['edges']] == ['Australian', 'Cents']
+
+
+def test_postgresql_operators():
+    column = Category.__table__.c.details
+    condition = json_condition(column, {'path': 'origin', 'contains': {'country': 'AU'}, 'has_key': 'country'})
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+    assert '@>' in sql and '?' in sql and '#>' in sql
+    condition = json_condition(column, {'path': 'rating', 'gt': 3}, {'rating': float})
+    assert '#>>' in str(condition.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize('dialect, expected', [
+    (sqlite.dialect(), 'CREATE INDEX ix_category_details__rating ON category ((JSON_EXTRACT(details, \'$."rating"\')))'),
+    (postgresql.dialect(), 'CREATE INDEX ix_category_details__rating ON category ((CAST(details #>> \'{rating}\' AS FLOAT)))'),
+])
+def test_index_statements(dialect, expected):
+    resolver = BaseModel.resolver_collection.for_model(Category)
+    statements = index_statements(resolver, dialect)
+    assert statements[0] == expected
+    assert len(statements) == 2
+
+    statements = index_statements(resolver, mysql.dialect())
+    assert statements[0].startswith('ALTER TABLE category ADD COLUMN details__rating DOUBLE GENERATED ALWAYS AS')
+    assert statements[1] == 'CREATE INDEX ix_category_details__rating ON category (details__rating)'
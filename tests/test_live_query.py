@@ -0,0 +1,62 @@
+import asyncio
+
+from autogqla import Schema
+from autogqla.live_query import json_patch
+from tests.model import Country, Place
+
+
+def test_json_patch():
+    assert json_patch({'a': [1, 2], 'b': 1}, {'a': [1], 'b': 2, 'c': 3}) == [
+        {'op': 'remove', 'path': '/a/1'},
+        {'op': 'replace', 'path': '/b', 'value': 2},
+        {'op': 'add', 'path': '/c', 'value': 3},
+    ]
+
+
+def test_live_query_refreshes_on_commit(schema: Schema, session_maker):
+    updates = []
+    live_query = schema.live_query(''' query ($name: String) {
+        countries(where: {name: {eq: $name}}) {
+            name
+        }
+        states {
+            name
+        }
+    }''', variables={'name': 'Australia'}, callback=updates.append)
+    assert live_query.data == {
+        'countries': [{'name': 'Australia'}],
+        'states': [{'name': 'Victoria'}, {'name': 'New South Wales'}, {'name': 'New York'}],
+    }
+    assert 'country' in live_query.dependencies['countries']
+    assert 'country' not in live_query.dependencies['states']
+
+    session = session_maker()
+    session.query(Place).filter(Place.name == 'Central Park').update({'address': 'Manhattan, New York City'})
+    session.commit()
+    live_query.manager.join()
+    assert updates == []
+
+    australia = session.query(Country).filter(Country.name == 'Australia').one()
+    australia.name = 'Commonwealth of Australia'
+    session.commit()
+    # refreshes run on the manager's thread, once the commit is complete
+    live_query.manager.join()
+    australia.name = 'Australia'
+    session.commit()
+    session.query(Place).filter(Place.name == 'Central Park').update(
+        {'address': 'Manhattan, New York City, United States'},
+    )
+    session.commit()
+    session.close()
+    live_query.manager.join()
+    live_query.close()
+
+    assert [update.patch for update in updates] == [
+        [{'op': 'remove', 'path': '/countries/0'}],
+        [{'op': 'add', 'path': '/countries/0', 'value': {'name': 'Australia'}}],
+    ]
+
+    async def collect():
+        return [update.patch async for update in live_query]
+
+    assert asyncio.run(collect()) == [update.patch for update in updates]
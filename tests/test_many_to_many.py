@@ -0,0 +1,98 @@
+from graphene import Schema
+
+from autogqla.fields.connections.base_loader import association_pairs, foreign_key_pairs
+from autogqla.testing import StatementCounter
+from tests.model import Place, Tag, place_tag
+
+
+def test_association_pairs():
+    assert association_pairs(Place.tags.prop) == [(Place.__table__.c.id, place_tag.c.place_id)]
+    assert association_pairs(Place.suburb.prop) is None
+    assert foreign_key_pairs(Tag.places.prop) is None
+
+
+def test_many_to_many(schema: Schema):
+    with StatementCounter() as counter:
+        result = schema.execute('{ places { name tags { name } } }')
+    assert not result.errors
+    assert result.data == {'places': [
+        {'name': 'Queen Victoria Market', 'tags': [{'name': 'landmark'}, {'name': 'heritage'}, {'name': 'market'}]},
+        {'name': 'Sydney Opera House', 'tags': [{'name': 'landmark'}, {'name': 'heritage'}]},
+        {'name': 'Central Park', 'tags': [{'name': 'landmark'}, {'name': 'park'}]},
+    ]}
+    # the places, then the tags of every place through the association table
+    assert counter.count == 2
+    assert 'JOIN place_tag' in counter.statements[1]
+    assert 'JOIN place ' not in counter.statements[1]
+
+
+def test_many_to_many_shares_instances(schema: Schema):
+    landmarks = []
+
+    class CollectLandmarks:
+        def resolve(self, next_, root, info, **arguments):
+            if info.parent_type.name == 'Tag' and root.name == 'landmark':
+                landmarks.append(root)
+            return next_(root, info, **arguments)
+
+    result = schema.execute('{ places { tags { name } } }', middleware=[CollectLandmarks()])
+    assert not result.errors
+    # the landmark tag of each of the three places is the same instance
+    assert len(landmarks) == 3
+    assert all(landmark is landmarks[0] for landmark in landmarks)
+
+
+def test_many_to_many_filter(schema: Schema):
+    result = schema.execute('{ tags { name places: filterPlaces(where: {name: {startsWith: "S"}}) { name } } }')
+    assert not result.errors
+    assert result.data == {'tags': [
+        {'name': 'landmark', 'places': [{'name': 'Sydney Opera House'}]},
+        {'name': 'heritage', 'places': [{'name': 'Sydney Opera House'}]},
+        {'name': 'market', 'places': []},
+        {'name': 'park', 'places': []},
+    ]}
+
+
+def test_many_to_many_paginate_per_parent(schema: Schema):
+    with StatementCounter() as counter:
+        result = schema.execute(''' {
+            tags {
+                name
+                places: paginatePlaces(first: 1, orderBy: [NAME_DESC]) {
+                    edges { node { name } }
+                    pageInfo { hasNextPage }
+                }
+            }
+        }''')
+    assert not result.errors
+    assert [
+        (tag['name'], [edge['node']['name'] for edge in tag['places']['edges']], tag['places']['pageInfo']['hasNextPage'])
+        for tag in result.data['tags']
+    ] == [
+        ('landmark', ['Sydney Opera House'], True),
+        ('heritage', ['Sydney Opera House'], True),
+        ('market', ['Queen Victoria Market'], False),
+        ('park', ['Central Park'], False),
+    ]
+    # a single page query for all the tags
+    assert counter.count == 2
+
+
+def test_many_to_many_paginate_last(schema: Schema):
+    result = schema.execute(''' {
+        places {
+            tags: paginateTags(last: 2, orderBy: [NAME_ASC]) {
+                edges { node { name } }
+                pageInfo { hasPreviousPage }
+            }
+        }
+    }''')
+    assert not result.errors
+    assert [
+        ([edge['node']['name'] for edge in place['tags']['edges']], place['tags']['pageInfo']['hasPreviousPage'])
+        for place in result.data['places']
+    ] == [
+        (['landmark', 'market'], True),
+        (['heritage', 'landmark'], False),
+        (['landmark', 'park'], False),
+    ]
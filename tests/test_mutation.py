@@ -0,0 +1,118 @@
+from graphene import Schema
+from sqlalchemy import event
+
+
+def test_create_update_delete(schema: Schema):
+    result = schema.execute(''' mutation {
+        createPlaces(values: [{name: "Flinders Street Station"}, {name: "Bondi Beach", address: "Bondi NSW 2026"}]) {
+            affected
+        }
+    }''')
+    assert not result.errors
+    assert result.data == {'createPlaces': {'affected': 2}}
+
+    result = schema.execute(''' mutation {
+        updatePlaces(where: {suburbId: {isNull: true}}, set: {address: "Unknown"}) {
+            affected
+            returning {
+                name
+                address
+            }
+        }
+    }''')
+    assert not result.errors
+    assert result.data == {
+        'updatePlaces': {
+            'affected': 2,
+            'returning': [
+                {'name': 'Flinders Street Station', 'address': 'Unknown'},
+                {'name': 'Bondi Beach', 'address': 'Unknown'},
+            ]
+        }
+    }
+
+    result = schema.execute(''' mutation {
+        deletePlaces(where: {suburbId: {isNull: true}}) {
+            affected
+            returning {
+                name
+            }
+        }
+    }''')
+    assert not result.errors
+    assert result.data == {
+        'deletePlaces': {
+            'affected': 2,
+            'returning': [
+                {'name': 'Flinders Street Station'},
+                {'name': 'Bondi Beach'},
+            ]
+        }
+    }
+
+
+def test_create_returning(schema: Schema):
+    result = schema.execute(''' mutation {
+        createPlaces(values: [{name: "Federation Square"}]) {
+            affected
+            returning {
+                name
+                address
+            }
+        }
+    }''')
+    assert not result.errors
+    assert result.data == {
+        'createPlaces': {
+            'affected': 1,
+            'returning': [
+                {'name': 'Federation Square', 'address': None},
+            ]
+        }
+    }
+
+    result = schema.execute(''' mutation {
+        deletePlaces(where: {name: {eq: "Federation Square"}}) {
+            affected
+        }
+    }''')
+    assert not result.errors
+    assert result.data == {'deletePlaces': {'affected': 1}}
+
+
+def test_update_with_relationship_filter(schema: Schema):
+    result = schema.execute(''' mutation {
+        updatePlaces(where: {suburb: {name: {eq: "Melbourne"}}}, set: {address: "Queen St, Melbourne VIC 3000"}) {
+            affected
+            returning {
+                name
+            }
+        }
+    }''')
+    assert not result.errors
+    assert result.data == {
+        'updatePlaces': {
+            'affected': 1,
+            'returning': [
+                {'name': 'Queen Victoria Market'},
+            ]
+        }
+    }
+
+
+def test_only_mutations_commit(schema: Schema, session_maker):
+    commits = []
+
+    def commit(connection):
+        commits.append(connection)
+
+    engine = session_maker.kw['bind']
+    event.listen(engine, 'commit', commit)
+    try:
+        assert not schema.execute('{ countries { name } }').errors
+        assert commits == []
+        result = schema.execute('mutation { deletePlaces(where: {name: {eq: "Nowhere"}}) { affected } }')
+        assert not result.errors
+        assert len(commits) == 1
+    finally:
+        event.remove(engine, 'commit', commit)
@@ -0,0 +1,71 @@
+from graphene import Schema
+
+from autogqla.testing import StatementCounter
+
+QUERY = ''' {
+    vehicles%s {
+        __typename
+        name
+        ... on Car { doors }
+        ... on Boat { length }
+    }
+}'''
+
+
+def test_polymorphic_root(schema: Schema):
+    with StatementCounter() as counter:
+        result = schema.execute(QUERY % '')
+    assert not result.errors
+    assert result.data == {'vehicles': [
+        {'__typename': 'Car', 'name': 'Holden', 'doors': 4},
+        {'__typename': 'Boat', 'name': 'Ferry', 'length': 40},
+        {'__typename': 'Vehicle', 'name': 'Tram'},
+        {'__typename': 'Car', 'name': 'Jeep', 'doors': 2},
+    ]}
+    # the vehicles, then the columns of each subclass
+    assert counter.count == 3
+
+
+def test_polymorphic_relationship(schema: Schema):
+    with StatementCounter() as counter:
+        result = schema.execute(''' {
+            countries {
+                name
+                vehicles {
+                    name
+                    ... on Car { doors }
+                    ... on Boat { length }
+                }
+            }
+        }''')
+    assert not result.errors
+    assert result.data['countries'][1] == {'name': 'United States', 'vehicles': [{'name': 'Jeep', 'doors': 2}]}
+    assert counter.count == 4
+
+
+def test_filter_on_subclass_fields(schema: Schema):
+    result = schema.execute(QUERY % '(where: {or: [{doors: {gt: 3}}, {length: {ge: 40}}]})')
+    assert not result.errors
+    assert [vehicle['name'] for vehicle in result.data['vehicles']] == ['Holden', 'Ferry']
+
+    result = schema.execute(QUERY % '(where: {doors: {lt: 3}, name: {startsWith: "J"}})')
+    assert not result.errors
+    assert result.data == {'vehicles': [{'__typename': 'Car', 'name': 'Jeep', 'doors': 2}]}
+
+
+def test_filter_on_single_table_subclass_fields(schema: Schema):
+    result = schema.execute(QUERY % '(where: {length: {isNull: true}})')
+    assert not result.errors
+    assert result.data == {'vehicles': []}
+
+    result = schema.execute(QUERY % '(where: {length: {isNull: false}})')
+    assert not result.errors
+    assert [vehicle['name'] for vehicle in result.data['vehicles']] == ['Ferry']
+
+
+def test_subclass_interfaces(schema: Schema):
+    interface = schema.get_type('VehicleInterface')
+    assert {field for field in interface.fields} >= {'id', 'name', 'kind', 'country'}
+    assert interface in schema.get_type('Car').interfaces
+    assert {'doors', 'length'} <= set(schema.get_type('VehicleWhereFilter').fields)
+    assert schema.get_type('Country').fields['vehicles'].type.of_type.of_type.of_type is interface
@@ -0,0 +1,131 @@
+import pytest
+from graphene import Schema
+from sqlalchemy import event
+
+from autogqla import prefetch
+from autogqla.fields.connections.relationship_loader import RelationshipLoader
+
+QUERY = '''
+{
+    countries {
+        name
+        ...States
+    }
+    paginateCountries(first: 1) {
+        edges {
+            node {
+                name
+                states {
+                    name
+                }
+            }
+        }
+    }
+}
+
+fragment States on Country {
+    states {
+        name
+        suburbs {
+            name
+            state {
+                name
+            }
+        }
+    }
+}
+'''
+
+
+@pytest.fixture
+def statements(session_maker):
+    executed = []
+
+    def before_cursor_execute(_conn, _cursor, statement, *_):
+        executed.append(statement)
+
+    engine = session_maker.kw['bind']
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+class RootMiddleware:
+    """Records the number of statements executed by the time each root field has been resolved."""
+
+    def __init__(self, statements):
+        self.statements = statements
+        self.counts = {}
+
+    def resolve(self, next_, root, info, **arguments):
+        result = next_(root, info, **arguments)
+        if root is None:
+            self.counts[info.field_name] = len(self.statements)
+        return result
+
+
+def execute(schema: Schema, statements):
+    middleware = RootMiddleware(statements)
+    result = schema.execute(QUERY, middleware=[middleware])
+    assert not result.errors
+    return result.data, middleware.counts
+
+
+def test_prefetch_loads_tree_in_root_resolver(schema: Schema, statements):
+    data, counts = execute(schema, statements)
+    assert data['countries'][0]['states'] == [
+        {'name': 'Victoria', 'suburbs': [{'name': 'Melbourne', 'state': {'name': 'Victoria'}}]},
+        {'name': 'New South Wales', 'suburbs': [{'name': 'Sydney', 'state': {'name': 'New South Wales'}}]},
+    ]
+    assert data['countries'][1]['states'] == [
+        {'name': 'New York', 'suburbs': [{'name': 'Manhattan', 'state': {'name': 'New York'}}]},
+    ]
+    # countries, states and suburbs (the suburbs' states are already in the identity map)
+    assert counts['countries'] == 3
+    # the paginated countries, whose states have already been loaded
+    assert counts['paginateCountries'] == 4
+    assert len(statements) == 4
+
+
+def test_prefetch_matches_nested_resolution(schema: Schema, statements, monkeypatch):
+    prefetched, _ = execute(schema, statements)
+    monkeypatch.setattr(prefetch, 'enabled', False)
+    statements.clear()
+    resolved, counts = execute(schema, statements)
+    assert counts['countries'] == 1
+    assert resolved == prefetched
+    assert len(statements) == 4
+
+
+def test_prefetch_follows_directives(schema: Schema, statements):
+    query = '''query ($states: Boolean!) {
+        countries { name states @include(if: $states) { name suburbs { name } } }
+    }'''
+    result = schema.execute(query, variable_values={'states': False})
+    assert not result.errors
+    assert result.data == {'countries': [{'name': 'Australia'}, {'name': 'United States'}]}
+    assert len(statements) == 1
+
+    statements.clear()
+    result = schema.execute('{ countries { name ... on Country @skip(if: true) { states { name } } } }')
+    assert not result.errors
+    assert len(statements) == 1
+
+
+def test_prefetch_errors_are_not_hidden(schema: Schema, monkeypatch):
+    def fail(*_args, **_kwargs):
+        raise Exception('prefetch failed')
+
+    monkeypatch.setattr(RelationshipLoader, '_make_query', fail)
+    result = schema.execute('{ countries { name states { name } } }')
+    # reported against the root field, whose resolver prefetched the states
+    assert [(error.message, error.path) for error in result.errors] == [('prefetch failed', ['countries'])]
+
+
+def test_prefetch_splits_batches(schema: Schema, statements, monkeypatch):
+    monkeypatch.setattr(RelationshipLoader, 'max_batch_size', 1)
+    result = schema.execute('{ countries { name states { name } } }')
+    assert not result.errors
+    # the countries, then the states of each country on its own
+    assert len(statements) == 3
+    assert all(statement.count('?') == 1 for statement in statements[1:])
@@ -0,0 +1,70 @@
+import json
+
+from graphene import Schema
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from autogqla import prefetch, profiling
+from autogqla.profiling import Profiler
+
+QUERY = ''' {
+    countries {
+        name
+        states {
+            name
+        }
+    }
+}'''
+
+
+def test_profiler_records_trace(schema: Schema, monkeypatch):
+    monkeypatch.setattr(prefetch, 'enabled', False)
+    profiler = Profiler()
+    schema.set_profiler(profiler)
+    result = schema.execute(QUERY)
+    assert not result.errors
+
+    [trace] = profiler.traces
+    events = {}
+    for item in trace.events:
+        events.setdefault(item['cat'], []).append(item)
+
+    assert [item['name'] for item in events['request']] == ['execute']
+    assert {item['name'] for item in events['resolve']} >= {'countries', 'countries.0.states', 'countries.1.name'}
+    [loader] = events['loader']
+    assert loader['name'] == 'Country.states'
+    assert loader['args'] == {'parents': 2, 'keys': 2}
+    assert [item['args']['path'] for item in events['sql']] == ['countries', None]
+    assert 0 < trace.sql_time < trace.duration
+    # the statement listeners only exist for the time of a trace
+    assert not event.contains(Engine, 'before_cursor_execute', profiling._before_cursor_execute)
+    assert trace.graphene_time > 0
+
+    chrome_trace = json.loads(json.dumps(profiler.chrome_trace()))
+    assert len(chrome_trace['traceEvents']) == len(trace.events)
+    assert all(item['ph'] == 'X' and item['dur'] >= 0 for item in chrome_trace['traceEvents'])
+
+    histograms = profiler.field_histograms()
+    assert histograms['Query.countries']['count'] == 1
+    assert histograms['Country.states']['count'] == 2
+    assert histograms['State.name']['count'] == 3
+    assert sum(histograms['State.name']['buckets'].values()) == 3
+
+
+def test_profiler_sampling(schema: Schema):
+    profiler = Profiler(sample_rate=0)
+    schema.set_profiler(profiler)
+    for _ in range(5):
+        assert not schema.execute(QUERY).errors
+    assert not profiler.traces
+    assert not profiler.histograms
+
+
+def test_profiler_records_batched_operations(schema: Schema):
+    profiler = Profiler()
+    schema.set_profiler(profiler)
+    results = schema.execute_batch([{'query': QUERY}, {'query': '{ states { name } }'}])
+    assert not any(result.errors for result in results)
+
+    [trace] = profiler.traces
+    assert {'countries', 'states'} <= {item['name'] for item in trace.events if item['cat'] == 'resolve'}
@@ -0,0 +1,115 @@
+import threading
+
+import graphene
+import pytest
+
+from autogqla import Registry, Schema, create
+from autogqla.base import default_registry
+from autogqla.objects.helpers import make_relationship_field, make_relationship_resolver
+from autogqla.spec import ModelSpec, FieldsSpec
+from tests.model import Base, Category, Coin
+
+
+def _schema(registry: Registry, session_maker, model, field_name):
+    query = type('Query', (graphene.ObjectType,), {
+        field_name: make_relationship_field(model, registry=registry),
+        f'resolve_{field_name}': make_relationship_resolver(model, registry=registry),
+    })
+    schema = Schema(query=query, registry=registry)
+    schema.set_session_factory(session_maker)
+    return schema
+
+
+def test_create_returns_registry():
+    assert create(Base) is default_registry
+    assert default_registry.models['Place'].__spec__.model.__name__ == 'Place'
+
+
+def test_rebuild_unchanged():
+    registry = default_registry.rebuild(Base)
+    assert registry.rebuilt == set()
+    assert registry.models['Place'] is default_registry.models['Place']
+    assert registry.resolver_collection.for_model(Coin) is default_registry.resolver_collection.for_model(Coin)
+
+
+def test_rebuild_affected_models(schema, session_maker):
+    spec = ModelSpec(model=Category, fields=FieldsSpec(exclude=['details']))
+    registry = default_registry.rebuild(Base, specs={Category: spec})
+    # nothing else refers to categories
+    assert registry.rebuilt == {'Category'}
+    assert registry.models['Category'] is not default_registry.models['Category']
+    assert registry.models['Coin'] is default_registry.models['Coin']
+
+    new_schema = _schema(registry, session_maker, Category, 'sections')
+    result = new_schema.execute('{ sections(where: {name: {eq: "Coins"}}) { name children { name } } }')
+    assert not result.errors
+    assert result.data == {'sections': [
+        {'name': 'Coins', 'children': [{'name': 'Australian'}, {'name': 'American'}]},
+    ]}
+    assert 'details' not in new_schema.get_type('Category').fields
+
+    # the schema of the previous registry is unchanged
+    result = schema.execute('{ categories(where: {name: {eq: "Banknotes"}}) { name details } }')
+    assert not result.errors
+    assert 'details' in schema.get_type('Category').fields
+
+
+def test_rebuild_dependents(session_maker):
+    registry = default_registry.rebuild(Base, specs={Coin: ModelSpec(model=Coin)})
+    # the currencies and denominations refer to coins through their relationships
+    assert registry.rebuilt == {'Currency', 'Denomination', 'Coin'}
+    assert registry.models['Place'] is default_registry.models['Place']
+
+    # shared types read the session of the schema executing them
+    result = _schema(registry, session_maker, Coin, 'coins').execute('{ coins { denomination { currency { name } } } }')
+    assert not result.errors
+    assert result.data['coins'][0]['denomination']['currency']['name']
+
+
+def test_rebuild_in_background(schema):
+    future = default_registry.rebuild_in_background(Base, specs={Category: ModelSpec(model=Category)})
+    # the previous schema serves while the registry is built
+    assert not schema.execute('{ categories { name } }').errors
+    registry = future.result(timeout=30)
+    assert registry.rebuilt == {'Category'}
+
+
+def test_registries_are_independent(session_maker):
+    registry = Registry()
+    with pytest.raises(KeyError):
+        registry.resolver_collection.for_model(Category)
+    assert registry.base_model is not default_registry.base_model
+
+
+def test_registries_execute_concurrently(schema, session_maker):
+    registry = default_registry.rebuild(Base, specs={Coin: ModelSpec(model=Coin)})
+    other_schema = _schema(registry, session_maker, Coin, 'coins')
+    first_paused = threading.Event()
+    other_done = threading.Event()
+    results = {}
+
+    class WaitForOther:
+        # holds the first schema's execution between its root and nested fields while the other schema executes
+        def resolve(self, next_, root, info, **arguments):
+            if info.field_name == 'currency':
+                first_paused.set()
+                other_done.wait(timeout=10)
+            return next_(root, info, **arguments)
+
+    def execute_first():
+        query = '{ coins { denomination { currency { name } } } }'
+        results['first'] = schema.execute(query, middleware=[WaitForOther()])
+
+    def execute_other():
+        results['other'] = other_schema.execute('{ coins { denomination { currency { name } } } }')
+        other_done.set()
+
+    first = threading.Thread(target=execute_first)
+    first.start()
+    assert first_paused.wait(timeout=10)
+    execute_other()
+    first.join(timeout=10)
+
+    assert not results['first'].errors
+    assert not results['other'].errors
+    assert results['first'].data == results['other'].data
@@ -317,4 +317,85 @@ def test_relationship_paginate_states_last_3(schema: Schema):
                 },
             ]
         }
-    }
\ No newline at end of file
+    }
+
+
+def test_relationship_many_to_one(schema: Schema):
+    result = schema.execute(''' {
+        states {
+            name
+            country {
+                name
+            }
+        }
+    }''')
+    assert not result.errors
+    assert result.data == {
+        'states': [
+            {'name': 'Victoria', 'country': {'name': 'Australia'}},
+            {'name': 'New South Wales', 'country': {'name': 'Australia'}},
+            {'name': 'New York', 'country': {'name': 'United States'}},
+        ]
+    }
+
+
+def test_relationship_non_id_and_composite_keys(schema: Schema):
+    result = schema.execute(''' {
+        currencies {
+            name
+            denominations {
+                name
+                coins {
+                    year
+                }
+            }
+        }
+        coins {
+            year
+            denomination {
+                name
+                currency {
+                    name
+                }
+            }
+        }
+    }''')
+    assert not result.errors
+    assert result.data == {
+        'currencies': [
+            {
+                'name': 'Australian Dollar',
+                'denominations': [
+                    {'name': 'One Dollar', 'coins': [{'year': 1984}, {'year': 2000}]},
+                    {'name': 'Two Dollars', 'coins': [{'year': 1988}]},
+                ]
+            },
+        ],
+        'coins': [
+            {'year': 1984, 'denomination': {'name': 'One Dollar', 'currency': {'name': 'Australian Dollar'}}},
+            {'year': 2000, 'denomination': {'name': 'One Dollar', 'currency': {'name': 'Australian Dollar'}}},
+            {'year': 1988, 'denomination': {'name': 'Two Dollars', 'currency': {'name': 'Australian Dollar'}}},
+        ]
+    }
+
+
+def test_relationship_paginate_composite_key(schema: Schema):
+    query = '''query ($after: String) {
+        currencies {
+            paginateDenominations(first: 1, after: $after) {
+                edges { cursor node { name } }
+                pageInfo { hasNextPage }
+            }
+        }
+    }'''
+    result = schema.execute(query)
+    assert not result.errors
+    page = result.data['currencies'][0]['paginateDenominations']
+    assert [edge['node']['name'] for edge in page['edges']] == ['One Dollar']
+    assert page['pageInfo']['hasNextPage']
+
+    result = schema.execute(query, variable_values={'after': page['edges'][0]['cursor']})
+    assert not result.errors
+    page = result.data['currencies'][0]['paginateDenominations']
+    assert [edge['node']['name'] for edge in page['edges']] == ['Two Dollars']
+    assert not page['pageInfo']['hasNextPage']
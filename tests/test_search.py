@@ -0,0 +1,82 @@
+import pytest
+from graphene import Schema
+
+from autogqla.spec import ModelSpec, FieldsSpec, SearchSpec
+from autogqla.spec_resolver import ModelSpecResolver, ResolverCollection
+from tests.model import Place
+
+
+def test_search(schema: Schema):
+    result = schema.execute(''' {
+        states {
+            name
+            suburbs {
+                places: filterPlaces(where: {address: {search: "new york"}}) {
+                    name
+                }
+            }
+        }
+    }''')
+    assert not result.errors
+    assert result.data == {
+        'states': [
+            {'name': 'Victoria', 'suburbs': [{'places': []}]},
+            {'name': 'New South Wales', 'suburbs': [{'places': []}]},
+            {'name': 'New York', 'suburbs': [{'places': [{'name': 'Central Park'}]}]},
+        ]
+    }
+
+
+def test_search_index_is_synced(schema: Schema, session_maker):
+    session = session_maker()
+    place = session.query(Place).filter(Place.name == 'Central Park').one()
+    place.name = 'Bryant Park'
+    session.commit()
+
+    query = ''' {
+        states(where: {suburbs: {places: {name: {search: "park"}}}}) {
+            name
+            suburbs {
+                places {
+                    name
+                }
+            }
+        }
+    }'''
+    result = schema.execute(query)
+    place.name = 'Central Park'
+    session.commit()
+    session.close()
+
+    assert not result.errors
+    assert result.data == {
+        'states': [
+            {'name': 'New York', 'suburbs': [{'places': [{'name': 'Bryant Park'}]}]},
+        ]
+    }
+
+
+def test_search_index_follows_mutations(schema: Schema):
+    query = '{ places(where: {address: {search: "%s"}}) { name } }'
+
+    result = schema.execute('mutation { createPlaces(values: [{name: "Bondi Beach", address: "Bondi NSW"}]) { affected } }')
+    assert not result.errors
+    assert schema.execute(query % 'bondi').data == {'places': [{'name': 'Bondi Beach'}]}
+
+    result = schema.execute('''mutation {
+        updatePlaces(where: {name: {eq: "Bondi Beach"}}, set: {address: "Campbell Parade"}) { affected }
+    }''')
+    assert not result.errors
+    assert schema.execute(query % 'bondi').data == {'places': []}
+    assert schema.execute(query % 'campbell').data == {'places': [{'name': 'Bondi Beach'}]}
+
+    result = schema.execute('mutation { deletePlaces(where: {name: {eq: "Bondi Beach"}}) { affected } }')
+    assert not result.errors
+    assert schema.execute(query % 'campbell').data == {'places': []}
+
+
+def test_search_requires_string_fields():
+    spec = ModelSpec(model=Place, fields=FieldsSpec(search=SearchSpec(include=['suburb_id'])))
+    resolver = ModelSpecResolver(model_spec=spec, node=type('Node', (), {}), collection=ResolverCollection())
+    with pytest.raises(Exception, match='requires a string field'):
+        resolver.resolve_attributes()
@@ -0,0 +1,58 @@
+import graphene
+import pytest
+
+from autogqla import Schema, serializer
+
+
+@pytest.mark.parametrize('query', [
+    '{ countries { id internalId name __typename } }',
+    '{ states { renamed: name ...StateFields } } fragment StateFields on State { id name }',
+    '{ countries { states { suburbs { places { name address } } } } }',
+    '{ countries { name states @include(if: false) { name } } }',
+])
+def test_serializer_matches_regular_execution(schema: Schema, monkeypatch, query):
+    regular = schema.execute(query)
+
+    serializer._compiled.clear()
+    serializer.install()
+    monkeypatch.setattr(schema, 'compiled_serializer', True)
+    compiled = schema.execute(query)
+    assert any(serializer._compiled.values())
+
+    assert not compiled.errors
+    assert compiled.to_dict() == regular.to_dict()
+
+
+def test_serializer_is_opt_in(schema: Schema):
+    serializer._compiled.clear()
+    assert not schema.execute('{ countries { name } }').errors
+    assert not serializer._compiled
+
+
+def test_serializer_is_scoped_to_autogqla_schemas(schema: Schema, monkeypatch):
+    serializer.install()
+    monkeypatch.setattr(schema, 'compiled_serializer', True)
+
+    class Item(graphene.ObjectType):
+        name = graphene.String()
+
+    class Query(graphene.ObjectType):
+        items = graphene.List(Item)
+
+        def resolve_items(self, _info):
+            return [Item(name='a')]
+
+    serializer._compiled.clear()
+    assert graphene.Schema(query=Query).execute('{ items { name } }').data == {'items': [{'name': 'a'}]}
+    assert not serializer._compiled
+
+
+def test_compiled_serializers_are_bounded(schema: Schema, monkeypatch):
+    serializer.install()
+    monkeypatch.setattr(schema, 'compiled_serializer', True)
+    monkeypatch.setattr(serializer, 'max_compiled', 2)
+
+    serializer._compiled.clear()
+    for query in ['{ countries { name } }', '{ countries { id } }', '{ countries { internalId } }']:
+        assert not schema.execute(query).errors
+    assert len(serializer._compiled) == 2
@@ -0,0 +1,61 @@
+import pytest
+from graphene import Schema
+from sqlalchemy import event
+
+from autogqla.strict import NPlusOneWarning
+
+
+def test_strict_mode_allows_batched_queries(schema: Schema, max_statements):
+    schema.set_strict_mode('raise')
+    with max_statements(3):
+        result = schema.execute('{ countries { name states { name suburbs { name } } } }')
+    assert not result.errors
+
+
+def test_strict_mode_raises_on_lazy_load(schema: Schema):
+    schema.set_strict_mode('raise')
+    result = schema.execute('{ places { name suburbName } }')
+    assert result.errors
+    assert all("'Place.suburb' is not available due to lazy='raise_on_sql'" == error.message for error in result.errors)
+
+
+def test_lazy_load_is_allowed_outside_strict_mode(schema: Schema, max_statements):
+    with pytest.raises(AssertionError, match='statements executed, expected at most 1'):
+        with max_statements(1):
+            result = schema.execute('{ places { name suburbName } }')
+    assert not result.errors
+    assert {'name': 'Central Park', 'suburbName': 'Manhattan'} in result.data['places']
+
+
+def test_strict_mode_warns_on_statements_per_row(schema: Schema):
+    schema.set_strict_mode('warn')
+    with pytest.warns(NPlusOneWarning, match=r'places\.\*\.neighbourCount \(\d+ statements for \d+ rows\)'):
+        result = schema.execute('{ places { name neighbourCount } }')
+    assert not result.errors
+
+
+def test_strict_mode_raises_on_statements_per_row(schema: Schema):
+    schema.set_strict_mode('raise')
+    with pytest.raises(Exception, match=r'N\+1.*places\.\*\.neighbourCount'):
+        schema.execute('{ places { name neighbourCount } }')
+
+
+def test_strict_mode_ends_the_transaction_before_raising(schema: Schema, session_maker):
+    rolled_back = []
+
+    def after_rollback(session):
+        rolled_back.append(session)
+
+    schema.set_strict_mode('raise')
+    event.listen(session_maker, 'after_rollback', after_rollback)
+    try:
+        with pytest.raises(Exception, match=r'N\+1'):
+            schema.execute('{ places { name neighbourCount } }')
+    finally:
+        event.remove(session_maker, 'after_rollback', after_rollback)
+    assert len(rolled_back) == 1
+
+
+def test_unknown_strict_mode(schema: Schema):
+    with pytest.raises(Exception, match='unknown strict mode'):
+        schema.set_strict_mode('strict')
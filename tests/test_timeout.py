@@ -0,0 +1,92 @@
+import pytest
+from graphene import Schema
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from autogqla import deadline
+from autogqla.deadline import set_deadline, clear_deadline, get_deadline
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(deadline, 'time', clock)
+    return clock
+
+
+def test_timeout_not_exceeded(schema: Schema, clock):
+    result = schema.execute(''' {
+        countries {
+            name
+            states {
+                name
+            }
+        }
+    }''', timeout=1)
+    assert not result.errors
+    assert result.data['countries'][0] == {
+        'name': 'Australia',
+        'states': [{'name': 'Victoria'}, {'name': 'New South Wales'}],
+    }
+
+
+def test_timeout_cancels_pending_loaders(schema: Schema, session_maker, clock):
+    statements = []
+
+    def before_cursor_execute(*_):
+        statements.append(None)
+        if len(statements) == 2:
+            # the root queries take longer than the whole request is allowed
+            clock.now += 5
+
+    engine = session_maker.kw['bind']
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        result = schema.execute(''' {
+            countries {
+                name
+            }
+            coins {
+                year
+                denomination {
+                    name
+                }
+            }
+        }''', timeout=1)
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    assert result.data == {
+        'countries': [{'name': 'Australia'}, {'name': 'United States'}],
+        'coins': [
+            {'year': 1984, 'denomination': None},
+            {'year': 2000, 'denomination': None},
+            {'year': 1988, 'denomination': None},
+        ],
+    }
+    assert [error.message for error in result.errors] == ['query timeout exceeded'] * 3
+    assert len(statements) == 2
+
+
+def test_timeout_interrupts_running_statement(session_maker):
+    session = session_maker()
+    try:
+        set_deadline(session, 0.05)
+        with pytest.raises(OperationalError, match='interrupted'):
+            session.execute(
+                'WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c'
+            ).scalar()
+        clear_deadline(session)
+        assert get_deadline(session) is None
+        assert session.execute('SELECT 1').scalar() == 1
+    finally:
+        session.close()
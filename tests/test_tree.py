@@ -0,0 +1,89 @@
+from graphene import Schema
+from sqlalchemy import Column, ForeignKey, String, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship, sessionmaker
+
+from autogqla.testing import StatementCounter
+from autogqla.tree import hierarchy, split_path, tree_query
+from tests.model import Category, Place
+
+
+def _names(nodes):
+    return [(node['node']['name'], node['depth'], node['path']) for node in nodes]
+
+
+def test_hierarchy():
+    tree = hierarchy(Category.children.prop)
+    assert tree == hierarchy(Category.parent.prop)
+    assert (tree.parent_column, tree.child_column) == (Category.__table__.c.id, Category.__table__.c.parent_id)
+    assert hierarchy(Place.suburb.prop) is None
+
+
+def test_descendants(schema: Schema):
+    with StatementCounter() as counter:
+        result = schema.execute('{ categories { name descendants { depth path node { name } } } }')
+    assert not result.errors
+    descendants = {category['name']: _names(category['descendants']) for category in result.data['categories']}
+    assert descendants['Coins'] == [
+        ('Australian', 1, [3]),
+        ('American', 1, [4]),
+        ('Dollars', 2, [3, 5]),
+        ('Cents', 2, [3, 6]),
+    ]
+    assert descendants['Australian'] == [('Dollars', 1, [5]), ('Cents', 1, [6])]
+    assert descendants['Banknotes'] == []
+    # the categories, then a single recursive query for all of their subtrees
+    assert counter.count == 2
+    assert 'WITH RECURSIVE' in counter.statements[1]
+
+
+def test_descendants_max_depth_and_where(schema: Schema):
+    result = schema.execute(''' {
+        categories(where: {name: {eq: "Coins"}}) {
+            descendants(maxDepth: 1, where: {name: {ne: "American"}}) { depth path node { name } }
+        }
+    }''')
+    assert not result.errors
+    assert _names(result.data['categories'][0]['descendants']) == [('Australian', 1, [3])]
+
+
+def test_ancestors(schema: Schema):
+    result = schema.execute(''' {
+        categories(where: {name: {in: ["Cents", "Coins"]}}) {
+            name
+            ancestors { depth path node { name } }
+        }
+    }''')
+    assert not result.errors
+    assert {category['name']: _names(category['ancestors']) for category in result.data['categories']} == {
+        'Coins': [],
+        'Cents': [('Australian', 1, [3]), ('Coins', 2, [3, 1])],
+    }
+
+
+def test_tree_fields_only_on_self_referential_models(schema: Schema):
+    assert {'descendants', 'ancestors'} <= set(schema.get_type('Category').fields)
+    assert 'descendants' not in schema.get_type('Place').fields
+
+
+def test_path_of_string_keys():
+    base = declarative_base()
+
+    class Folder(base):
+        __tablename__ = 'folder'
+
+        path = Column(String(100), primary_key=True)
+        parent_path = Column(String(100), ForeignKey('folder.path'))
+
+        children = relationship('Folder', remote_side=[parent_path], uselist=True)
+
+    engine = create_engine('sqlite://')
+    base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Folder(path='/', children=[Folder(path='/usr%', children=[Folder(path='/usr%/lib')])]))
+    session.flush()
+
+    tree = hierarchy(Folder.children.prop)
+    rows = tree_query(session, Folder, tree, False, ['/'], 10).all()
+    assert [split_path(path) for _, _, _, path in rows] == [['/usr%'], ['/usr%', '/usr%/lib']]
+    session.close()
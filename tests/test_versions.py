@@ -0,0 +1,78 @@
+import pytest
+from graphene import Schema
+
+from autogqla.testing import StatementCounter
+from autogqla.versions import TableVersions, VersionedResult
+from tests.model import Place
+
+QUERY = '{ countries { name states { name } } }'
+
+
+@pytest.fixture
+def versions(schema: Schema):
+    versions = TableVersions()
+    schema.set_versions(versions)
+    yield versions
+    versions.remove()
+
+
+def test_etag_matches_until_a_table_changes(schema: Schema, versions: TableVersions):
+    first = schema.execute(QUERY)
+    assert isinstance(first, VersionedResult) and first.etag and not first.not_modified
+    assert versions.dependencies[next(iter(versions.dependencies))] == {'country', 'state'}
+    assert schema.execute(QUERY).etag == first.etag
+
+    with StatementCounter() as counter:
+        result = schema.execute(QUERY, if_none_match=first.etag)
+    assert result.not_modified and result.data is None
+    assert counter.count == 0
+
+    # a change to an unrelated table keeps the ETag
+    result = schema.execute('mutation { createPlaces(values: [{name: "Park"}]) { affected } }')
+    assert not result.errors and not isinstance(result, VersionedResult)
+    assert schema.execute(QUERY, if_none_match=first.etag).not_modified
+    schema.execute('mutation { deletePlaces(where: {name: {eq: "Park"}}) { affected } }')
+
+    versions.bump(['state'])
+    result = schema.execute(QUERY, if_none_match=first.etag)
+    assert not result.not_modified
+    assert result.data['countries'][0]['name'] == 'Australia'
+    assert result.etag != first.etag
+
+
+def test_commits_bump_versions(schema: Schema, versions: TableVersions, session_maker):
+    query = '{ places(where: {name: {eq: "Bump"}}) { name } }'
+    etag = schema.execute(query).etag
+
+    session = session_maker()
+    session.execute(Place.__table__.insert().values(name='Rolled back'))
+    session.rollback()
+    assert schema.execute(query, if_none_match=etag).not_modified
+
+    schema.execute('mutation { createPlaces(values: [{name: "Bump"}]) { affected } }')
+    result = schema.execute(query, if_none_match=etag)
+    assert not result.not_modified
+    assert result.data == {'places': [{'name': 'Bump'}]}
+    schema.execute('mutation { deletePlaces(where: {name: {eq: "Bump"}}) { affected } }')
+
+
+def test_variables_are_part_of_the_etag(schema: Schema, versions: TableVersions):
+    query = 'query ($name: String) { countries(where: {name: {eq: $name}}) { name } }'
+    australia = schema.execute(query, variable_values={'name': 'Australia'})
+    united_states = schema.execute(query, variable_values={'name': 'United States'})
+    assert australia.etag != united_states.etag
+    assert not schema.execute(query, variable_values={'name': 'Australia'}, if_none_match=united_states.etag).not_modified
+
+
+def test_dependencies_are_bounded(schema: Schema, session_maker):
+    versions = TableVersions(max_documents=2)
+    # nothing is listened to until the versions are used
+    assert versions._changes.engines == set()
+    schema.set_versions(versions)
+    try:
+        for name in ('Australia', 'United States', 'Canada'):
+            assert schema.execute('{ countries(where: {name: {eq: "%s"}}) { name } }' % name).etag
+        assert versions._changes.engines == {session_maker.kw['bind']}
+        assert len(versions.dependencies) == 2
+    finally:
+        versions.remove()